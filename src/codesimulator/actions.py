@@ -1,217 +1,358 @@
 import asyncio
 import os
 import random
-import time
 import sys
-import json
-from typing import Optional
-
-import pyautogui
+import time
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
 
 from .app_switcher import AppSwitcher
+from .cancellation import CancellationToken
 from .config import AppConfig
+from .corpus import CodeCorpus, CorpusEntry
+from .corpus_io import FileStats, code_file_exists, count_file_stats
+from .format_cache import FormattedOutputCache
+from .injection_worker import InjectionWorker, InputEvent
+from .input_backend import InputInjector
+from .journal import ProgressJournal
+from .language_detect import LanguageDetector
 from .language_formatter import FormatterFactory
 from .logging_config import logger
 from .mouse import MouseController
+from .path_utils import ResolvedPaths, get_paths
+from .pipeline import PlannedLine, replay_prefix, typing_pipeline
+from .planner import SessionPlanner
+from .prefetch import FilePrefetcher, PreparedFile
+from .rate_limiter import InputRateLimiter
+from .scheduler import FOCUS, KEYBOARD, POINTER, ActionSource, IntervalSource, TypingSource
+from .settings import ConfigStore
+from .telemetry import ChunkStarted, FocusFailed, KeysInjected, Mistake, Switched, TelemetryBus
+from .tracing import FOCUS_TRACK, TYPING_TRACK, Tracer
+
+# Bytes per line assumed for files that have not been read yet
+AVERAGE_LINE_BYTES = 40
 
 
 class ActionSimulator:
     """Simulates keyboard and mouse actions for code typing simulation."""
 
-    def __init__(self, text_box, app=None):
+    def __init__(self, text_box, app=None, clock: Callable[[], float] = time.monotonic, input_backend=None,
+                 paths: Optional[ResolvedPaths] = None):
+        """
+        Initialize the simulator.
+
+        Args:
+            text_box: Console widget
+            app: Toga app, used to resolve resource paths
+            clock: Monotonic time source for every timed wait
+            input_backend: Replacement for pyautogui, e.g. the soak test's null backend
+            paths: Resources, corpus and cache directories; resolved for the app by default
+        """
         self.text_box = text_box
         self.app = app
+        # Console text and simulation events; the sinks attached to it decide where they go
+        self.telemetry = TelemetryBus(clock=clock)
+        # Timeline of a session, recorded when tracing is enabled
+        self.tracer = Tracer(self.telemetry.clock)
+        # Resources, corpus and cache directories, resolved once
+        self.paths = paths or get_paths(app)
+        # Shared by every component that waits, so a stop ends all waits within MAX_STOP_LATENCY
+        self.cancel_token = CancellationToken(clock=clock)
         self.loop_flag = False
-        self._configure_pyautogui()
-        self.app_config = AppConfig(app)
-        self.app_switcher = AppSwitcher(self.app_config)
+        self.app_config = AppConfig(app, self.paths.resource('applications.json'))
+        # Every injected event, from any component, passes this limiter
+        self.rate_limiter = InputRateLimiter(clock=clock, cancel_token=self.cancel_token)
+        self.injector = InputInjector(self.rate_limiter, self.cancel_token, input_backend)
+        self.app_switcher = AppSwitcher(self.app_config, self.rate_limiter, self.cancel_token)
+        # Optional separate process that injects typed lines, started with a session
+        self.injection_worker: Optional[InjectionWorker] = None
         self.formatter_factory = FormatterFactory()
-        self.formatter = None
-        self.mouse_controller = MouseController()
+        self.format_cache = FormattedOutputCache(self.paths.cache_dir('formatted'))
+        self.language_detector = LanguageDetector()
+        self.indent_model = None
+        self._format_task: Optional[asyncio.Task] = None
+        # Where typing of each file stopped, so a restart resumes instead of starting over
+        self.journal = ProgressJournal(os.path.join(self.paths.cache, 'progress.jsonl'))
+        self._typed_column = 0
+        # Prepares the next file in a worker thread while the current one is typed
+        self.prefetcher = FilePrefetcher(self.prepare_file)
+        # Lines typed between pauses; a session planner sizes chunks when a time budget is set
+        self.chunk_size = 50
+        self.planner: Optional[SessionPlanner] = None
+        self._plan_seed = 0.0
+        self.mouse_controller = MouseController(self.injector, tracer=self.tracer)
         self.simulation_mode = "Hybrid"  # default mode
 
-        self.config = self._load_config()
+        # config.json, validated once and swapped as a whole when the file changes
+        self.config_store = ConfigStore(self._get_config_path())
         self._setup_from_config()
 
-        # Get list of code files from 'resources/code'
-        self.code_files = self._get_code_files()
-        self.current_code_index = 0
+        # Index of code files below 'resources/code', scanned on first use
+        self.corpus = self._create_corpus()
+
+    @property
+    def loop_flag(self) -> bool:
+        """True while a simulation runs; setting it to False cancels the run's token."""
+        return not self.cancel_token.cancelled
 
-        self.original_indentations = {}
+    @loop_flag.setter
+    def loop_flag(self, running: bool):
+        if running:
+            self.cancel_token.reset()
+        else:
+            self.cancel_token.cancel()
 
     def _setup_from_config(self):
-        try:
-            code_config = self.config.get('code', {})
-            self.language = code_config.get('language', 'python')
-            self.indent_size = code_config.get('indent_size', 4)
-            self.max_line_length = code_config.get('max_line_length', 80)
-            typing_config = self.config.get('typing_speed', {})
-            self.typing_speed = {
-                'min': typing_config.get('min', 0.03),
-                'max': typing_config.get('max', 0.07),
-                'line_break': tuple(typing_config.get('line_break', [0.5, 1.0])),
-                'mistake_rate': typing_config.get('mistake_rate', 0.07)
-            }
-            logger.info("Successfully configured simulation settings")
-        except Exception as e:
-            logger.error(f"Error setting up configuration: {e}")
-            self._setup_default_config()
-
-    def _setup_default_config(self):
-        logger.warning("Using default configuration settings")
-        self.language = 'python'
-        self.indent_size = 4
-        self.max_line_length = 80
+        config = self.config_store.config
+        self.settings = config
+        self.language = config.code.language
+        self.indent_size = config.code.indent_size
+        self.max_line_length = config.code.max_line_length
+        self.auto_indent = config.code.auto_indent
+        self.format_code = config.code.format_code
+        self.corpus_selection = config.corpus.selection
+        if getattr(self, 'corpus', None):
+            self.corpus.selection = self.corpus_selection
+        self.budget_minutes = config.session.budget_minutes
+        self.use_worker_process = config.injection.use_worker_process
+        self.trace_sessions = config.tracing.enabled
         self.typing_speed = {
-            'min': 0.03,
-            'max': 0.07,
-            'line_break': (0.5, 1.0),
-            'mistake_rate': 0.07,
+            'min': config.typing_speed.min,
+            'max': config.typing_speed.max,
+            'line_break': config.typing_speed.line_break,
+            'mistake_rate': config.typing_speed.mistake_rate,
         }
+        logger.info("Successfully configured simulation settings")
+
+    def apply_config_changes(self) -> bool:
+        """
+        Put a reloaded or saved configuration into effect.
+
+        Called between chunks, so a new typing speed applies from the next
+        chunk while settings read per file apply from the next file.
+
+        Returns:
+            True if the settings changed
+        """
+        if self.config_store.config is self.settings:
+            return False
+        self._setup_from_config()
+        logger.info("Applied configuration changes")
+        return True
 
     def _get_config_path(self) -> str:
-        from .path_utils import get_resource_path
-        config_path = get_resource_path(self.app, 'config.json')
+        config_path = self.paths.resource('config.json')
         if not os.path.exists(config_path):
             logger.error(f"Config file not found at {config_path}")
             raise FileNotFoundError(f"Config file not found at {config_path}")
         return config_path
 
-    def _get_code_files(self) -> list:
-        """Return a list of .txt files from the 'resources/code' directory."""
-        from .path_utils import get_resource_path
-        code_dir = get_resource_path(self.app, 'code')
-        if os.path.isdir(code_dir):
-            files = [os.path.join(code_dir, f) for f in os.listdir(code_dir) if f.endswith(".txt")]
-            if not files:
-                logger.warning(f"No .txt files found in {code_dir}")
-            return files
-        else:
+    def _create_corpus(self) -> CodeCorpus:
+        """Create the lazily scanned index of the 'resources/code' directory."""
+        code_dir = self.paths.code
+        if not os.path.isdir(code_dir):
             logger.warning(f"Code directory not found: {code_dir}")
-            return []
-
-    def _load_config(self) -> dict:
-        try:
-            with open(self._get_config_path(), 'r') as f:
-                config = json.load(f)
-                logger.info("Successfully loaded configuration")
-                return config
-        except Exception as e:
-            logger.error(f"Error loading config: {e}")
-            raise
-
-    def load_config(self):
-        try:
-            config_path = os.path.join(os.path.dirname(__file__), 'resources', 'config.json')
-            logger.info(f"Loading config from: {config_path}")
-            with open(config_path, "r") as f:
-                config = json.load(f)
-                code_config = config.get('code', {})
-                self.language = code_config.get("language", "unknown")
-                self.indent_size = code_config.get("indent_size", 4)
-                self.max_line_length = code_config.get("max_line_length", 80)
-        except Exception as e:
-            logger.error(f"Error loading config: {e}")
-            self.language = "unknown"
-            self.indent_size = 4
-            self.max_line_length = 80
+        return CodeCorpus(code_dir, selection=self.corpus_selection)
 
     async def simulate_command_tab(self):
         """Simulate pressing Command+Tab to switch applications."""
         try:
             if sys.platform == 'darwin':
-                pyautogui.hotkey('command', 'tab')
+                await self.injector.hotkey('command', 'tab')
             elif sys.platform == 'win32':
-                pyautogui.hotkey('alt', 'tab')
+                await self.injector.hotkey('alt', 'tab')
             else:  # Linux
-                pyautogui.hotkey('alt', 'tab')
+                await self.injector.hotkey('alt', 'tab')
 
             logger.info("Pressed Command+Tab / Alt+Tab")
-            await asyncio.sleep(0.5)
+            await self.cancel_token.sleep(0.5)
         except Exception as e:
             logger.error(f"Error simulating Command+Tab: {e}")
 
-    def _configure_pyautogui(self):
+    async def preload_backend(self):
+        """Import the input backend in a worker thread, so the first keystroke does not wait for it."""
         try:
-            import pyautogui
-            pyautogui.FAILSAFE = True
-            pyautogui.PAUSE = 0.1
-            logger.info(f"PyAutoGUI initialized. Screen size: {pyautogui.size()}")
+            await asyncio.to_thread(self.injector.load)
+            await asyncio.to_thread(self.injector.size)
         except Exception as e:
             logger.error(f"Failed to initialize PyAutoGUI: {e}")
-            self.text_box.value += f"⚠️ Warning: Failed to initialize PyAutoGUI: {e}\n"
+            self.telemetry.message(f"⚠️ Warning: Failed to initialize PyAutoGUI: {e}\n")
+
+    def start_session(self):
+        """Start a new session, with a planner if a time budget is configured."""
+        self.apply_config_changes()
+        if self.budget_minutes and self.budget_minutes > 0:
+            self.planner = SessionPlanner(self.budget_minutes * 60, clock=self.telemetry.clock)
+            self.planner.start()
+            # Candidate order of the session's plans, fixed for the session in the random selection modes
+            self._plan_seed = random.random()
+        else:
+            self.planner = None
+        self._update_injection_worker()
+        if self.trace_sessions:
+            self._start_trace()
+
+    def _start_trace(self):
+        """Record the session to a new trace file next to the log."""
+        path = os.path.join(self.paths.log_dir, f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        try:
+            self.tracer.start(path)
+        except OSError as e:
+            logger.error(f"Could not start trace at {path}: {e}")
 
+    def end_session(self):
+        """Finish what start_session began; the trace file is completed."""
+        self.tracer.stop()
 
+    def _update_injection_worker(self):
+        """Start or stop the injection worker process to match the configuration."""
+        try:
+            if self.use_worker_process and not (self.injection_worker and self.injection_worker.running):
+                self.injection_worker = InjectionWorker(self.injector.pause, self.cancel_token)
+                self.injection_worker.start()
+            elif not self.use_worker_process and self.injection_worker:
+                self.injection_worker.close()
+                self.injection_worker = None
+        except Exception as e:
+            logger.error(f"Error starting input injection worker, typing in process: {e}")
+            self.injection_worker = None
+
+    def close(self):
+        """Release resources that outlive a simulation run."""
+        if self.injection_worker:
+            self.injection_worker.close()
+            self.injection_worker = None
+        if self._format_task:
+            self._format_task.cancel()
+            self._format_task = None
+        self.tracer.stop()
+        self.app_config.close()
+
+    @property
+    def session_expired(self) -> bool:
+        """True once the session's time budget is used up."""
+        return self.planner is not None and self.planner.expired
+
+    def _next_chunk_size(self) -> int:
+        return self.planner.chunk_size() if self.planner else self.chunk_size
+
+    async def get_next_code_file(self) -> Optional[str]:
+        """
+        Return the next code file, from the session plan when a time budget is set.
 
-    def get_next_code_file(self) -> Optional[str]:
-        """Return the next code file in sequence (cycling through available files)."""
-        if self.code_files:
-            file_path = self.code_files[self.current_code_index]
-            self.current_code_index = (self.current_code_index + 1) % len(self.code_files)
-            return file_path
-        return None
+        Runs in a worker thread: the first call scans the whole corpus, archives
+        included, and later calls may re-list changed directories.
+        """
+        return await self.tracer.to_thread("next_code_file", self._next_code_file)
+
+    async def peek_next_code_file(self) -> Optional[str]:
+        """Return the file get_next_code_file will return next, without consuming it."""
+        return await self.tracer.to_thread("peek_next_code_file", self._peek_next_code_file)
+
+    def _next_code_file(self) -> Optional[str]:
+        if self.planner:
+            planned = self.planner.next_file(self._plan_candidates(), self._estimate_entry)
+            return planned.path if planned else None
+        return self.corpus.next_file()
+
+    def _peek_next_code_file(self) -> Optional[str]:
+        if self.planner:
+            planned = self.planner.peek_file(self._plan_candidates(), self._estimate_entry)
+            return planned.path if planned else None
+        return self.corpus.peek_next()
+
+    def _plan_candidates(self) -> List[CorpusEntry]:
+        """Corpus files in the order the session planner prefers them."""
+        entries = self.corpus.entries()
+        if self.corpus_selection != "sequential":
+            random.Random(self._plan_seed).shuffle(entries)
+        return entries
+
+    def _estimate_entry(self, entry: CorpusEntry) -> Tuple[float, int]:
+        """Estimate the typing seconds and lines of a file from its size, without reading it."""
+        entry = self.corpus.current(entry.path) or entry
+        lines = max(1, entry.size // AVERAGE_LINE_BYTES)
+        return self._estimate_typing_time(FileStats(entry.size, lines, 0))["total_time_seconds"], lines
+
+    def prepare_file(self, file_path: str) -> PreparedFile:
+        """
+        Detect the language, count and pre-format a file. Blocking; runs in a worker thread.
 
-    def _split_file_into_chunks(self, file_path: str, chunk_size: int = 50) -> list:
-        """Split the file into chunks of at most 'chunk_size' lines."""
-        with open(file_path, "r") as f:
-            lines = f.readlines()
-        if len(lines) <= chunk_size:
-            return [lines]
-        chunks = [lines[i:i + chunk_size] for i in range(0, len(lines), chunk_size)]
-        logger.info(f"Split file {file_path} into {len(chunks)} chunks")
-        return chunks
+        Args:
+            file_path: Corpus path of the file
 
-    async def calculate_typing_time(self, file_path: str) -> dict:
+        Returns:
+            PreparedFile with everything simulate_typing and calculate_typing_time need
+        """
+        with self.tracer.span("prepare_file", file=os.path.basename(file_path)):
+            language = self.language_detector.detect(file_path, self.language)
+            stats = count_file_stats(file_path)
+            typed_path = file_path
+            if self.format_code:
+                typed_path = self.format_cache.get_formatted_path(file_path, language, self.indent_size)
+        return PreparedFile(file_path, language, stats, typed_path, typed_path != file_path)
+
+    def prefetch_file(self, file_path: Optional[str]):
+        """Start preparing a file in the background."""
+        self.prefetcher.prefetch(file_path)
+
+    async def get_prepared_file(self, file_path: str) -> PreparedFile:
+        """Return a prepared file, from a finished prefetch when there is one."""
+        return await self.prefetcher.get(file_path)
+
+    async def calculate_typing_time(self, file_path: str, stats: Optional[FileStats] = None) -> dict:
         try:
-            with open(file_path, "r") as file:
-                lines = file.readlines()
-            total_chars = sum(len(line.rstrip()) for line in lines)
-            total_lines = len(lines)
-            empty_lines = sum(1 for line in lines if not line.strip())
-            non_empty_lines = total_lines - empty_lines
-
-            avg_char_time = (self.typing_speed["min"] + self.typing_speed["max"]) / 2
-            char_typing_time = total_chars * avg_char_time
-
-            expected_mistakes = int(total_chars * self.typing_speed["mistake_rate"])
-            mistake_time = expected_mistakes * (0.2 + 0.1)
-
-            avg_line_break = sum(self.typing_speed["line_break"]) / 2
-            line_break_time = non_empty_lines * avg_line_break
-            empty_line_time = empty_lines * (avg_line_break * 0.5)
-
-            total_time = char_typing_time + mistake_time + line_break_time + empty_line_time
-
-            timing_details = {
-                "total_time_seconds": round(total_time, 2),
-                "total_time_formatted": self._format_time(total_time),
-                "breakdown": {
-                    "characters": {"count": total_chars, "time_seconds": round(char_typing_time, 2)},
-                    "lines": {"total": total_lines, "empty": empty_lines, "non_empty": non_empty_lines,
-                              "time_seconds": round(line_break_time + empty_line_time, 2)},
-                    "expected_mistakes": {"count": expected_mistakes, "time_seconds": round(mistake_time, 2)},
-                    "typing_speed": {"chars_per_second": round(1 / avg_char_time, 2),
-                                     "avg_pause_between_lines": round(avg_line_break, 2)},
-                },
-            }
+            if stats is None:
+                stats = await self.tracer.to_thread("count_file_stats", count_file_stats, file_path)
+            timing_details = self._estimate_typing_time(stats)
             logger.info(f"Estimated typing time: {timing_details['total_time_formatted']}")
-            self.text_box.value += (
+            self.telemetry.message(
                 f"Estimated typing time: {timing_details['total_time_formatted']}\n"
-                f"Total characters: {total_chars}\n"
-                f"Total lines: {total_lines}\n"
-                f"Expected mistakes: {expected_mistakes}\n"
+                f"Total characters: {stats.total_chars}\n"
+                f"Total lines: {stats.total_lines}\n"
+                f"Expected mistakes: {timing_details['breakdown']['expected_mistakes']['count']}\n"
             )
             return timing_details
 
         except FileNotFoundError:
             logger.error(f"File not found: {file_path}")
-            self.text_box.value += f"Error: File not found: {file_path}\n"
+            self.telemetry.message(f"Error: File not found: {file_path}\n")
             return None
         except Exception as e:
             logger.error(f"Error calculating typing time: {e}")
-            self.text_box.value += f"Error calculating typing time: {e}\n"
+            self.telemetry.message(f"Error calculating typing time: {e}\n")
             return None
 
+    def _estimate_typing_time(self, stats: FileStats) -> dict:
+        """Estimate how long typing a file takes at the configured speed."""
+        total_chars, total_lines, empty_lines = stats
+        non_empty_lines = total_lines - empty_lines
+
+        avg_char_time = (self.typing_speed["min"] + self.typing_speed["max"]) / 2
+        char_typing_time = total_chars * avg_char_time
+
+        expected_mistakes = int(total_chars * self.typing_speed["mistake_rate"])
+        mistake_time = expected_mistakes * (0.2 + 0.1)
+
+        avg_line_break = sum(self.typing_speed["line_break"]) / 2
+        line_break_time = non_empty_lines * avg_line_break
+        empty_line_time = empty_lines * (avg_line_break * 0.5)
+
+        total_time = char_typing_time + mistake_time + line_break_time + empty_line_time
+
+        timing_details = {
+            "total_time_seconds": round(total_time, 2),
+            "total_time_formatted": self._format_time(total_time),
+            "breakdown": {
+                "characters": {"count": total_chars, "time_seconds": round(char_typing_time, 2)},
+                "lines": {"total": total_lines, "empty": empty_lines, "non_empty": non_empty_lines,
+                          "time_seconds": round(line_break_time + empty_line_time, 2)},
+                "expected_mistakes": {"count": expected_mistakes, "time_seconds": round(mistake_time, 2)},
+                "typing_speed": {"chars_per_second": round(1 / avg_char_time, 2),
+                                 "avg_pause_between_lines": round(avg_line_break, 2)},
+            },
+        }
+        return timing_details
+
     def _format_time(self, seconds: float) -> str:
         hours = int(seconds // 3600)
         minutes = int((seconds % 3600) // 60)
@@ -223,184 +364,326 @@ class ActionSimulator:
         else:
             return f"{remaining_seconds}s"
 
-    # Replace the simulate_typing method in actions.py (around line 210):
+    async def simulate_typing(self, file_path: Optional[str] = None, prepared: Optional[PreparedFile] = None):
+        """
+        Simulate typing code from a file.
 
-    async def simulate_typing(self, file_path: Optional[str] = None):
-        """Simulate typing code from a file."""
+        Args:
+            file_path: Corpus path of the file to type
+            prepared: Result of prepare_file for this file, if it was prefetched
+        """
         logger.debug(f"simulate_typing called with file_path: {file_path}")
 
         if self.simulation_mode == "Tab Switching Only":
-            self.text_box.value += "Tab switching only mode selected. Skipping typing simulation...\n"
+            self.telemetry.message("Tab switching only mode selected. Skipping typing simulation...\n")
             return
         elif self.simulation_mode in ["Typing Only", "Hybrid"]:
-            # Validate file path
-            if not file_path:
-                logger.error("No file path provided for typing simulation")
-                self.text_box.value += "❌ Error: No file path provided for typing simulation.\n"
-                return
+            steps = self.typing_steps(file_path, prepared)
+            try:
+                async for delay in steps:
+                    await self.cancel_token.sleep(delay)
+            finally:
+                await steps.aclose()
+        else:
+            self.telemetry.message("Unknown simulation mode selected.\n")
 
-            if not os.path.exists(file_path):
-                logger.error(f"File not found: {file_path}")
-                self.text_box.value += f"❌ Error: File not found: {file_path}\n"
-                return
+    async def typing_steps(self, file_path: Optional[str],
+                           prepared: Optional[PreparedFile] = None) -> AsyncIterator[float]:
+        """
+        Type a file one line at a time, yielding the pause before the next line.
 
-            logger.info(f"Simulating typing with file: {file_path}")
-            self.text_box.value += f"Typing from file: {os.path.basename(file_path)}\n"
+        Leaving the pauses to the caller lets the ActionScheduler run other
+        sources in between. Closing the iterator early records the position in
+        the progress journal.
 
-            # Split file into chunks and type
-            chunks = self._split_file_into_chunks(file_path, chunk_size=50)
-            for i, chunk in enumerate(chunks):
-                if not self.loop_flag:
-                    break
-                chunk_text = "".join(chunk)
-                await self._simulate_code_typing_from_lines(chunk_text, i)
-                await asyncio.sleep(random.uniform(*self.typing_speed["line_break"]))
-        else:
-            self.text_box.value += "Unknown simulation mode selected.\n"
-
-    async def _simulate_code_typing_from_lines(self, text: str, chunk_index: int):
-        lines = text.splitlines(keepends=True)
-        original_indents = {i: len(line) - len(line.lstrip()) for i, line in enumerate(lines)}
-        self.text_box.value += f"Typing chunk {chunk_index + 1}...\n"
-        for i, line in enumerate(lines):
-            if not self.loop_flag:
-                break
-            line = " " * original_indents.get(i, 0) + line.strip()
-            if not line:
-                pyautogui.press("enter")
-                await asyncio.sleep(random.uniform(*self.typing_speed["line_break"]))
-                continue
-            await self._type_line_with_simulation(line, i)
-            await asyncio.sleep(random.uniform(*self.typing_speed["line_break"]))
-
-    async def _type_line_with_simulation(self, line: str, line_num: int):
-        if self.formatter:
-            line = self.formatter.format_line(line)
-        for char in line:
-            if not self.loop_flag:
-                break
-            if random.random() < self.typing_speed["mistake_rate"]:
-                await self._simulate_typing_mistake(char)
-            self._type_character(char)
-            await asyncio.sleep(random.uniform(self.typing_speed["min"], self.typing_speed["max"]))
-        pyautogui.press("enter")
-        logger.info(f"Typed line: {line}")
-
-    async def _simulate_typing_mistake(self, correct_char: str):
-        wrong_char = random.choice("abcdefghijklmnopqrstuvwxyz")
-        pyautogui.write(wrong_char)
-        await asyncio.sleep(0.2)
-        pyautogui.press("backspace")
-        await asyncio.sleep(0.1)
-
-    def _type_character(self, char: str):
-        if char == "\t":
-            pyautogui.press("tab")
-        elif char == "\n":
-            pyautogui.press("enter")
-        else:
-            pyautogui.write(char)
+        Args:
+            file_path: Corpus path of the file to type
+            prepared: Result of prepare_file for this file, if it was prefetched
+        """
+        # Validate file path
+        if not file_path:
+            logger.error("No file path provided for typing simulation")
+            self.telemetry.message("❌ Error: No file path provided for typing simulation.\n")
+            return
 
-    def switch_window(self):
-        app = self.app_switcher.get_random_running_app()
-        if app:
-            if self.app_switcher.focus_application(app):
-                self.text_box.value += f"Switched to {app['name']}\n"
-                logger.info(f"Switched to {app['name']}")
-            else:
-                self.text_box.value += f"Failed to switch to {app['name']}\n"
-                logger.error(f"Failed to switch to {app['name']}")
+        if not code_file_exists(file_path):
+            logger.error(f"File not found: {file_path}")
+            self.telemetry.message(f"❌ Error: File not found: {file_path}\n")
+            return
+
+        logger.info(f"Simulating typing with file: {file_path}")
+        self.telemetry.message(f"Typing from file: {os.path.basename(file_path)}\n")
+
+        if prepared and prepared.path != file_path:
+            prepared = None
+
+        # Resolve the formatter per file; the configured language is only the fallback
+        if prepared:
+            language = prepared.language
         else:
-            self.text_box.value += "No configured applications running\n"
-            logger.warning("No configured applications running")
+            language = self.language_detector.detect(file_path, self.language)
+        logger.info(f"Using {language} formatting for {os.path.basename(file_path)}")
 
-    async def _simulate_random_actions(self):
-        while self.loop_flag:
-            actions = [
-                self._random_cursor_move,
-                self._random_scroll,
-                self._middle_click,
-                self._window_switch_action,
-            ]
-            for action in actions:
+        # Model the target editor's auto-indent so only indentation deltas are typed
+        if self.auto_indent:
+            self.indent_model = self.formatter_factory.create_formatter(language, self.indent_size)
+        else:
+            self.indent_model = None
+
+        # Read the pre-formatted file if it is cached; otherwise format on the fly
+        # while the cache is filled in the background for the next cycle.
+        # An unfinished inline-formatted run keeps reading the source, since
+        # recorded offsets refer to the stream that was being typed
+        typed_path, formatter = file_path, None
+        resume_inline = self.format_code and self.journal.position(ProgressJournal.stream_id(file_path))
+        if resume_inline:
+            formatter = self.formatter_factory.create_formatter(language, self.indent_size)
+        elif self.format_code and prepared and prepared.preformatted:
+            typed_path = prepared.typed_path
+        elif self.format_code:
+            cached_path = await self.tracer.to_thread(
+                "format_cache.lookup", self.format_cache.lookup, file_path, language, self.indent_size
+            )
+            if cached_path:
+                typed_path = cached_path
+            else:
+                formatter = self.formatter_factory.create_formatter(language, self.indent_size)
+                self._format_task = asyncio.create_task(self.tracer.to_thread(
+                    "format_file", self.format_cache.get_formatted_path, file_path, language, self.indent_size
+                ))
+                self._format_task.add_done_callback(self._format_done)
+
+        if self.planner:
+            if self.planner.expired:
+                await self._finish_format_task(cancel=True)
+                return
+            stats = prepared.stats if prepared else await self.tracer.to_thread(
+                "count_file_stats", count_file_stats, file_path)
+            timing = self._estimate_typing_time(stats)
+            self.planner.begin_file(timing["total_time_seconds"], stats.total_lines, file_path)
+
+        stream_id = ProgressJournal.stream_id(typed_path)
+        resume = self.journal.position(stream_id)
+        start_offset, start_line = 0, 0
+        if resume:
+            start_offset, start_line = resume.offset, resume.line
+            self.telemetry.message(f"Resuming at line {resume.line + 1}\n")
+            logger.info(f"Resuming {file_path} at line {resume.line + 1}, column {resume.column}")
+            await self.tracer.to_thread("replay_prefix", replay_prefix, typed_path, start_offset,
+                                        formatter, self.indent_model)
+
+        # Stream read -> format -> plan, typing each line as it is planned
+        plans = typing_pipeline(typed_path, self._next_chunk_size, formatter, self.indent_model,
+                                start_offset=start_offset, start_line=start_line)
+        # (offset, line) of the line being typed; self._typed_column counts its typed characters
+        position = (start_offset, start_line)
+        self._typed_column = resume.column if resume else 0
+        finished = False
+        chunk_open = False
+        try:
+            async for planned in plans:
                 if not self.loop_flag:
                     break
-                await action()
-            await asyncio.sleep(random.uniform(0.3, 0.7))
-
-    async def _random_cursor_move(self):
-        x = random.randint(100, 1000)
-        y = random.randint(100, 1000)
-        pyautogui.moveTo(x, y, duration=0.5)
-        logger.info(f"Moved cursor to ({x}, {y})")
+                if planned.chunk_start:
+                    self.apply_config_changes()
+                    self.journal.record(stream_id, planned.offset, planned.number, self._typed_column)
+                    if planned.chunk > 0:
+                        yield random.uniform(*self.typing_speed["line_break"])
+                        if not self.loop_flag:
+                            break
+                    self.telemetry.message(f"Typing chunk {planned.chunk + 1}...\n")
+                    if chunk_open:
+                        self.tracer.end(TYPING_TRACK)
+                    self.tracer.begin(f"chunk {planned.chunk + 1}", TYPING_TRACK, line=planned.number + 1)
+                    chunk_open = True
+                    self.telemetry.publish(ChunkStarted(os.path.basename(file_path), planned.chunk, planned.number))
+                await self._inject_line(planned, self._typed_column)
+                if self.loop_flag:
+                    position = (planned.next_offset, planned.number + 1)
+                    self._typed_column = 0
+                    if self.planner:
+                        self.planner.line_typed()
+                yield random.uniform(*self.typing_speed["line_break"])
+            else:
+                # A stream cut short by the session plan resumes next session
+                finished = self.loop_flag and not (self.planner and self.planner.cut_short)
+        finally:
+            if chunk_open:
+                self.tracer.end(TYPING_TRACK)
+            await plans.aclose()
+            await self._finish_format_task(cancel=not finished)
+            # Also runs on stop and cancellation, so the journal holds the exact character
+            if finished:
+                self.journal.complete(stream_id)
+            else:
+                self.journal.record(stream_id, *position, self._typed_column)
 
-    async def _random_scroll(self):
-        scroll_amount = random.randint(-100, 100)
-        pyautogui.scroll(scroll_amount)
-        logger.info(f"Scrolled {scroll_amount}")
-        await asyncio.sleep(0.5)
-        pyautogui.move(100, 50, duration=0.5)
-        logger.info("Moved mouse relatively by (100, 50).")
-        await asyncio.sleep(0.5)
-        pyautogui.move(-50, -25, duration=0.5)
-        logger.info("Moved mouse relatively by (-50, -25).")
-        await asyncio.sleep(0.5)
+    @staticmethod
+    def _format_done(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Error formatting file into the cache: {task.exception()}")
 
-    async def _middle_click(self):
-        if random.random() < 0.3:
-            pyautogui.click(button="middle")
-            logger.info("Middle clicked")
-
-    async def _window_switch_action(self):
-        if random.random() < 0.2:
-            self.switch_window()
-            await asyncio.sleep(0.5)
+    async def _finish_format_task(self, cancel: bool = False):
+        """
+        Wait for the background formatting of the typed file, or stop waiting for it.
 
-    async def _cleanup_simulation(self):
-        await asyncio.sleep(0.5)
+        Args:
+            cancel: Drop the result instead of waiting, as when typing was stopped
+        """
+        task, self._format_task = self._format_task, None
+        if task is None:
+            return
+        if cancel:
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
 
-    def _handle_simulation_end(self):
-        self.loop_flag = False
-        self.mouse_controller.stop()
-        self.text_box.value += "Simulation ended\n"
-        logger.info("Simulation ended")
+    async def _inject_line(self, planned: PlannedLine, column: int = 0):
+        """
+        Type one planned line, starting with any dedent keystrokes.
 
-    async def simulate_mouse_and_command_tab(self, duration=10):
+        Args:
+            planned: Line to type
+            column: Characters of the line already typed before a restart
         """
-        Simulate mouse movements and Command+Tab key combination for window switching.
+        events = []
+        if not column:
+            events.extend(InputEvent("press", "backspace", 0.0) for _ in range(planned.backspaces))
+        text = planned.text[column:]
+        events.extend(self._line_events(text))
+        started = self.telemetry.clock()
+        with self.tracer.span("line", TYPING_TRACK, line=planned.number + 1, events=len(events)):
+            await self._play_events(events)
+        elapsed = self.telemetry.clock() - started
+        self.telemetry.publish(KeysInjected(planned.number, len(events), len(text), elapsed))
+        # Mistyped characters are the only writes that do not advance the line
+        mistakes = sum(1 for event in events if event.op == "write" and not event.advance)
+        if mistakes:
+            self.telemetry.publish(Mistake(planned.number, mistakes))
+        if planned.text:
+            logger.info(f"Typed line: {planned.text}")
+
+    def _line_events(self, line: str) -> List[InputEvent]:
+        """
+        Precompute the keystrokes of a line, mistakes and the final enter included.
 
         Args:
-            duration (int): The approximate duration in seconds for the simulation
+            line: Text to type
+
+        Returns:
+            Events whose advance fields sum to len(line)
         """
-        if not self.loop_flag:
-            return
+        events = []
+        for char in line:
+            if random.random() < self.typing_speed["mistake_rate"]:
+                events.append(InputEvent("write", random.choice("abcdefghijklmnopqrstuvwxyz"), 0.2))
+                events.append(InputEvent("press", "backspace", 0.1))
+            delay = random.uniform(self.typing_speed["min"], self.typing_speed["max"])
+            if char == "\t":
+                events.append(InputEvent("press", "tab", delay, 1))
+            elif char == "\n":
+                events.append(InputEvent("press", "enter", delay, 1))
+            else:
+                events.append(InputEvent("write", char, delay, 1))
+        events.append(InputEvent("press", "enter", 0.0))
+        return events
 
-        self.text_box.value += "🖱️ Simulating mouse movements and Command+Tab...\n"
-        logger.info("Starting mouse and Command+Tab simulation")
+    async def _play_events(self, events: List[InputEvent]):
+        """
+        Inject a line's events, in the worker process when one is running.
 
-        start_time = time.time()
+        self._typed_column follows the typed characters, so a stop in the
+        middle of the line leaves it open at the exact character.
+        """
+        if self.injection_worker and self.injection_worker.running:
+            self.tracer.counter("injection_ring", events=len(events))
+            await self.rate_limiter.acquire("key", sum(len(event.arg) if event.op == "write" else 1
+                                                       for event in events))
+            try:
+                await self.injection_worker.run_batch(events)
+            finally:
+                executed = events[:self.injection_worker.executed]
+                self._typed_column += sum(event.advance for event in executed)
+            self.cancel_token.check()
+            return
+        for event in events:
+            if event.op == "press":
+                await self.injector.press(event.arg)
+            else:
+                await self.injector.write(event.arg)
+            self._typed_column += event.advance
+            if event.delay:
+                await self.cancel_token.sleep(event.delay)
+
+    async def switch_window(self):
+        """Focus a random configured application."""
+        with self.tracer.span("switch_window", FOCUS_TRACK):
+            await self._switch_window()
+
+    async def _switch_window(self):
+        # Window lookups and the rate-limited focus change block, so they run in a worker thread
+        app = await self.tracer.to_thread("get_random_running_app", self.app_switcher.get_random_running_app)
+        started = self.telemetry.clock()
+        switched = bool(app) and await self.tracer.to_thread(
+            "focus_application", self.app_switcher.focus_application, app)
+        if app:
+            if switched:
+                self.telemetry.message(f"Switched to {app['name']}\n")
+                self.telemetry.publish(Switched(app['name'], self.telemetry.clock() - started))
+                logger.info(f"Switched to {app['name']}")
+            else:
+                self.telemetry.message(f"Failed to switch to {app['name']}\n")
+                self.telemetry.publish(FocusFailed(app["name"], "focus change failed"))
+                logger.error(f"Failed to switch to {app['name']}")
+        else:
+            self.telemetry.message("No configured applications running\n")
+            self.telemetry.publish(FocusFailed("", "no configured application running"))
+            logger.warning("No configured applications running")
 
-        try:
-            # Enable mouse controller for random movements
-            self.mouse_controller.start(min_interval=1.0, max_interval=3.0)
+    def create_sources(self, next_steps: Callable[[], Awaitable[Optional[AsyncIterator[float]]]]) -> List[ActionSource]:
+        """
+        Build the action sources for the current simulation mode.
 
-            # Perform a sequence of mouse movements and command+tab presses
-            while self.loop_flag and (time.time() - start_time < duration):
-                # Random mouse movements
-                for _ in range(random.randint(1, 3)):
-                    if not self.loop_flag:
-                        break
-                    await self._random_cursor_move()
-                    await asyncio.sleep(random.uniform(0.5, 1.5))
+        Args:
+            next_steps: Returns the typing steps of the next file, see TypingSource
 
-                # Occasional Command+Tab
-                if random.random() < 0.7:  # 70% chance to do Command+Tab
-                    await self.simulate_command_tab()
+        Returns:
+            Sources to run together on an ActionScheduler
+        """
+        mode = self.simulation_mode
+        sources: List[ActionSource] = []
+        if mode == "Typing Only":
+            sources.append(TypingSource(next_steps))
+        elif mode == "Hybrid":
+            # Window switches and idle breaks come between files, not between two lines of one
+            sources.append(TypingSource(next_steps, file_devices=(FOCUS,)))
+        if mode == "Tab Switching Only":
+            sources.append(IntervalSource("focus", (KEYBOARD, FOCUS), self.switch_window, (2.0, 4.0)))
+        elif mode == "Hybrid":
+            sources.extend([
+                IntervalSource("focus", (KEYBOARD, FOCUS), self.switch_window, (60.0, 180.0), min_interval=30.0),
+                IntervalSource("mouse", (POINTER,), self.mouse_controller.move_random, (5.0, 15.0)),
+                IntervalSource("scroll", (POINTER,), self._random_scroll, (20.0, 60.0)),
+                IntervalSource("idle", (KEYBOARD, POINTER, FOCUS), self._idle, (120.0, 300.0)),
+            ])
+        elif mode == "Mouse and Command+Tab":
+            sources.extend([
+                IntervalSource("mouse", (POINTER,), self.mouse_controller.move_random, (0.5, 1.5)),
+                IntervalSource("command_tab", (KEYBOARD, FOCUS), self.simulate_command_tab, (3.0, 8.0)),
+                IntervalSource("middle_click", (POINTER,), self._middle_click, (10.0, 30.0)),
+            ])
+        return sources
 
-                # Add a small pause
-                await asyncio.sleep(random.uniform(1.0, 2.0))
+    async def _random_scroll(self):
+        scroll_amount = random.randint(-100, 100)
+        await self.injector.scroll(scroll_amount)
+        logger.info(f"Scrolled {scroll_amount}")
 
-        finally:
-            # Make sure to stop the mouse controller
-            self.mouse_controller.stop()
-            logger.info("Mouse and Command+Tab simulation completed")
\ No newline at end of file
+    async def _middle_click(self):
+        await self.injector.click(button="middle")
+        logger.info("Middle clicked")
+
+    async def _idle(self):
+        """Hold every input device for a short break."""
+        pause = random.uniform(5.0, 20.0)
+        logger.info(f"Idling for {pause:.1f}s")
+        await self.cancel_token.sleep(pause)
@@ -1,22 +1,34 @@
 import asyncio
 import os
-import json
 import tempfile
 import platform
 import random
 import subprocess
 import sys
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import toga
 from toga.style import Pack
 from toga.style.pack import COLUMN, ROW, CENTER, LEFT, RIGHT
 from toga.colors import rgb, rgba
 from .actions import ActionSimulator
+from .corpus import CODE_EXTENSIONS, SELECTION_MODES
+from .corpus_io import COMPRESSED_OPENERS, code_file_exists
 from .key_handler import GlobalKeyHandler
-from .logging_config import get_log_path, setup_file_logging, logger
+from .scheduler import ActionScheduler
+from .settings import SimulatorConfig
+from .telemetry import ConsoleSink, LogSink, TraceSink, trim_console
+from .tracing import TYPING_TRACK
+from .logging_config import setup_file_logging, logger
 from .path_utils import log_environment_info, get_log_path
 
-log_environment_info()
+# Metrics, profiling, the log viewer and the watchdog load when first used
+if TYPE_CHECKING:
+    from .log_viewer import LogFilter, LogReader
+    from .metrics import MetricsServer
+    from .profiling import ProfileSession
+
+# Records shown by View Application Logs
+LOG_TAIL_RECORDS = 500
 
 
 class CodeSimulator(toga.App):
@@ -27,6 +39,11 @@ class CodeSimulator(toga.App):
         )
 
         self.selected_file = None
+        self._current_file = None
+        self._reported_empty_corpus = False
+        self.profiler: Optional["ProfileSession"] = None
+        self.log_reader: Optional["LogReader"] = None
+        self.log_follow_task: Optional[asyncio.Task] = None
         self.current_view = "simulation"  # Default view
 
     def shutdown(self):
@@ -39,6 +56,11 @@ class CodeSimulator(toga.App):
         # Stop any running simulations
         if self.action_simulator.loop_flag:
             self.action_simulator.loop_flag = False
+        self.action_simulator.close()
+        if self.profiler and self.profiler.running:
+            self.profiler.stop()
+        if self.log_follow_task:
+            self.log_follow_task.cancel()
 
         # Clean up the key handler
         if hasattr(self, 'key_handler'):
@@ -89,6 +111,48 @@ class CodeSimulator(toga.App):
         except Exception as e:
             self.console.value = f"Error viewing console logs: {e}"
 
+    async def start_profiling(self, widget):
+        """Profile the running app for the chosen number of seconds, or until stopped."""
+        if self.profiler and self.profiler.running:
+            return
+        try:
+            from .profiling import ProfileSession
+            self.profiler = ProfileSession(self.profile_mode_input.value,
+                                           os.path.dirname(get_log_path()))
+            self.profiler.start()
+        except Exception as e:
+            logger.error(f"Error starting profiler: {e}")
+            self.console.value += f"❌ Could not start profiling: {e}\n"
+            self.profiler = None
+            return
+        seconds = int(self.profile_seconds_input.value or 0)
+        self.start_profile_button.enabled = False
+        self.stop_profile_button.enabled = True
+        self.console.value += f"⏱️ Profiling ({self.profiler.mode})"
+        self.console.value += f" for {seconds} seconds...\n" if seconds else " until stopped...\n"
+        if seconds:
+            session = self.profiler
+            self.loop.call_later(seconds, lambda: self.loop.create_task(self.stop_profiling(None, session)))
+
+    async def stop_profiling(self, widget, session: Optional["ProfileSession"] = None):
+        """Stop the profiler and show the summary; session limits a timed stop to the run it belongs to."""
+        profiler = self.profiler
+        if not profiler or not profiler.running or (session is not None and session is not profiler):
+            return
+        try:
+            profiler.stop()
+            report = await asyncio.to_thread(profiler.write_report)
+            self.console.value += report.summary
+            self.console.value += f"📄 Report: {report.path}\n"
+            if report.stats_path:
+                self.console.value += f"📄 cProfile stats: {report.stats_path}\n"
+        except Exception as e:
+            logger.error(f"Error writing profile report: {e}")
+            self.console.value += f"❌ Error writing profile report: {e}\n"
+        finally:
+            self.start_profile_button.enabled = True
+            self.stop_profile_button.enabled = False
+
     async def view_logs(self, widget):
         setup_file_logging()
         log_path = get_log_path()
@@ -126,44 +190,90 @@ class CodeSimulator(toga.App):
 
             return
 
-        file_size = os.path.getsize(log_path)
+        from .log_viewer import LogReader, rotation_set
+        files = rotation_set(log_path)
+        file_size = sum(os.path.getsize(path) for path in files)
         last_modified = os.path.getmtime(log_path)
         import datetime
         mod_time = datetime.datetime.fromtimestamp(last_modified).strftime('%Y-%m-%d %H:%M:%S')
 
-        self.console.value += f"Log file size: {file_size} bytes\n"
-        self.console.value += f"Last modified: {mod_time}\n\n"
+        self.console.value += f"Log files: {len(files)}, {file_size} bytes\n"
+        self.console.value += f"Last modified: {mod_time}\n"
 
         try:
-            with open(log_path, 'r') as f:
-                if file_size > 10000:
-                    self.console.value += f"Log file is large. Showing last portion...\n\n"
-                    f.seek(max(0, file_size - 10000))
-                    f.readline()
-                    content = f.read()
-                else:
-                    content = f.read()
-
-            self.console.value += "Log Content:\n"
+            if self.log_reader is None or self.log_reader.path != log_path:
+                self.log_reader = LogReader(log_path)
+            log_filter = self.log_filter()
+            time_range = await asyncio.to_thread(self.log_reader.time_range)
+            records = await asyncio.to_thread(self.log_reader.tail, LOG_TAIL_RECORDS, log_filter)
+            if time_range:
+                self.console.value += f"Records from {time_range[0]} to {time_range[1]}\n"
+
+            self.console.value += f"\nLog Content (last {len(records)} matching records):\n"
             self.console.value += "===========\n\n"
-            self.console.value += content
+            self.console.value = trim_console(self.console.value + "".join(
+                record.text + "\n" for record in records))
 
         except Exception as e:
             self.console.value += f"❌ Error reading log file: {e}\n"
 
+    def log_filter(self) -> "LogFilter":
+        """Filter chosen in the Logs view."""
+        from .log_viewer import LogFilter
+        return LogFilter(self.log_level_input.value, self.log_text_input.value or None)
+
+    async def toggle_log_follow(self, widget):
+        """Start or stop following the log with the current filter."""
+        if self.log_follow_task:
+            self.log_follow_task.cancel()
+            self.log_follow_task = None
+        if self.log_follow_input.value:
+            self.log_follow_task = self.loop.create_task(self.follow_logs(self.log_filter()))
+
+    async def change_log_filter(self, widget):
+        if self.log_follow_task:
+            await self.toggle_log_follow(widget)
+
+    async def follow_logs(self, log_filter: "LogFilter"):
+        """Append new matching log records to the console until cancelled."""
+        from .log_viewer import FOLLOW_INTERVAL, LogFollower
+        setup_file_logging()
+        follower = LogFollower(get_log_path(), log_filter)
+        self.console.value += "👀 Following the log...\n"
+        while True:
+            await asyncio.sleep(FOLLOW_INTERVAL)
+            try:
+                records = await asyncio.to_thread(follower.poll)
+            except Exception as e:
+                logger.error(f"Error following log file: {e}")
+                continue
+            if records:
+                self.console.value = trim_console(self.console.value + "".join(
+                    record.text + "\n" for record in records))
+
     def startup(self):
-        from .logging_config import setup_file_logging
         setup_file_logging()
 
         self.setup_ui()
         self.setup_components()
 
-        # Start the global key handler to listen for keyboard shortcuts
+        # Slow, non-essential work waits until the window is up
+        self.loop.create_task(self._finish_startup())
+        self.config_watch_task = self.loop.create_task(self.action_simulator.config_store.watch())
+        self.telemetry_task = self.loop.create_task(self.action_simulator.telemetry.run())
+        self.loop_lag_task = self.loop.create_task(self.metrics.monitor_loop_lag())
+        self.update_memory_watchdog()
+
+        logger.info("Application started successfully.")
+
+    async def _finish_startup(self):
+        """Log the environment, hook the keyboard shortcuts and load the input backend in the background."""
+        await asyncio.to_thread(log_environment_info)
         if hasattr(self, 'key_handler'):
             self.key_handler.start()
             logger.info("Started global key handler for keyboard shortcuts")
-
-        logger.info("Application started successfully.")
+        await self.update_metrics_server()
+        await self.action_simulator.preload_backend()
 
     def setup_colors(self):
         self.colors = {
@@ -489,7 +599,7 @@ class CodeSimulator(toga.App):
         ))
 
         language_label = toga.Label(
-            "Language:",
+            "Default Language:",
             style=Pack(
                 width=150,
                 color=self.colors['text']
@@ -497,7 +607,7 @@ class CodeSimulator(toga.App):
         )
 
         self.language_input = toga.Selection(
-            items=["python", "java", "php"],
+            items=["python", "java", "php", "yaml"],
             value="python",
             style=Pack(
                 flex=1,
@@ -569,6 +679,232 @@ class CodeSimulator(toga.App):
         max_line_box.add(self.max_line_input)
         code_section.add(max_line_box)
 
+        # Editor auto-indent
+        auto_indent_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 10, 0),
+            alignment=CENTER
+        ))
+
+        auto_indent_label = toga.Label(
+            "Editor Auto-Indent:",
+            style=Pack(
+                width=150,
+                color=self.colors['text']
+            )
+        )
+
+        self.auto_indent_input = toga.Switch(
+            "Type only indentation changes",
+            value=False,
+            style=Pack(
+                flex=1,
+                padding=(5, 5)
+            )
+        )
+
+        auto_indent_box.add(auto_indent_label)
+        auto_indent_box.add(self.auto_indent_input)
+        code_section.add(auto_indent_box)
+
+        # Pre-formatting
+        format_code_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 10, 0),
+            alignment=CENTER
+        ))
+
+        format_code_label = toga.Label(
+            "Pre-format Code:",
+            style=Pack(
+                width=150,
+                color=self.colors['text']
+            )
+        )
+
+        self.format_code_input = toga.Switch(
+            "Format files with the language formatter",
+            value=False,
+            style=Pack(
+                flex=1,
+                padding=(5, 5)
+            )
+        )
+
+        format_code_box.add(format_code_label)
+        format_code_box.add(self.format_code_input)
+        code_section.add(format_code_box)
+
+        # Corpus file order
+        selection_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 10, 0),
+            alignment=CENTER
+        ))
+
+        selection_label = toga.Label(
+            "File Order:",
+            style=Pack(
+                width=150,
+                color=self.colors['text']
+            )
+        )
+
+        self.selection_input = toga.Selection(
+            items=list(SELECTION_MODES),
+            value="sequential",
+            style=Pack(
+                flex=1,
+                padding=(5, 5)
+            )
+        )
+
+        selection_box.add(selection_label)
+        selection_box.add(self.selection_input)
+        code_section.add(selection_box)
+
+        # Session time budget
+        budget_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 10, 0),
+            alignment=CENTER
+        ))
+
+        budget_label = toga.Label(
+            "Session Budget (min):",
+            style=Pack(
+                width=150,
+                color=self.colors['text']
+            )
+        )
+
+        self.budget_input = toga.NumberInput(
+            min_value=0,
+            max_value=1440,
+            step=1,
+            value=0,
+            style=Pack(
+                flex=1,
+                padding=(5, 5)
+            )
+        )
+
+        budget_box.add(budget_label)
+        budget_box.add(self.budget_input)
+        code_section.add(budget_box)
+
+        # Keystroke injection process
+        worker_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 10, 0),
+            alignment=CENTER
+        ))
+
+        worker_label = toga.Label(
+            "Injection Process:",
+            style=Pack(
+                width=150,
+                color=self.colors['text']
+            )
+        )
+
+        self.worker_process_input = toga.Switch(
+            "Inject keystrokes from a separate process",
+            value=False,
+            style=Pack(
+                flex=1,
+                padding=(5, 5)
+            )
+        )
+
+        worker_box.add(worker_label)
+        worker_box.add(self.worker_process_input)
+        code_section.add(worker_box)
+
+        # Prometheus metrics endpoint
+        metrics_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 10, 0),
+            alignment=CENTER
+        ))
+
+        metrics_label = toga.Label(
+            "Metrics Endpoint:",
+            style=Pack(
+                width=150,
+                color=self.colors['text']
+            )
+        )
+
+        self.metrics_input = toga.Switch(
+            "Serve metrics on localhost",
+            value=False,
+            style=Pack(
+                flex=1,
+                padding=(5, 5)
+            )
+        )
+
+        metrics_box.add(metrics_label)
+        metrics_box.add(self.metrics_input)
+        code_section.add(metrics_box)
+
+        # Session timeline trace
+        trace_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 10, 0),
+            alignment=CENTER
+        ))
+
+        trace_label = toga.Label(
+            "Session Trace:",
+            style=Pack(
+                width=150,
+                color=self.colors['text']
+            )
+        )
+
+        self.trace_input = toga.Switch(
+            "Write a timeline trace next to the log",
+            value=False,
+            style=Pack(
+                flex=1,
+                padding=(5, 5)
+            )
+        )
+
+        trace_box.add(trace_label)
+        trace_box.add(self.trace_input)
+        code_section.add(trace_box)
+
+        # Memory growth warning for long sessions
+        watchdog_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 10, 0),
+            alignment=CENTER
+        ))
+
+        watchdog_label = toga.Label(
+            "Memory Watchdog:",
+            style=Pack(
+                width=150,
+                color=self.colors['text']
+            )
+        )
+
+        self.watchdog_input = toga.Switch(
+            "Warn when memory keeps growing",
+            value=False,
+            style=Pack(
+                flex=1,
+                padding=(5, 5)
+            )
+        )
+
+        watchdog_box.add(watchdog_label)
+        watchdog_box.add(self.watchdog_input)
+        code_section.add(watchdog_box)
+
         settings_box.add(code_section)
 
         # Divider
@@ -730,6 +1066,8 @@ class CodeSimulator(toga.App):
 
     def create_logs_view(self):
         """Create the logs and debugging view."""
+        from .log_viewer import LEVELS
+        from .profiling import PROFILE_MODES
         logs_view = toga.Box(style=Pack(
             direction=COLUMN,
             background_color=self.colors['background'],
@@ -807,6 +1145,136 @@ class CodeSimulator(toga.App):
         buttons_box.add(console_logs_button)
         content_card.add(buttons_box)
 
+        # Profiling controls
+        profile_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 15, 0),
+            alignment=CENTER
+        ))
+
+        profile_label = toga.Label(
+            "Profiler:",
+            style=Pack(
+                color=self.colors['text'],
+                padding=(0, 10, 0, 0)
+            )
+        )
+
+        self.profile_mode_input = toga.Selection(
+            items=list(PROFILE_MODES),
+            value="sampling",
+            style=Pack(
+                width=120,
+                padding=(5, 5)
+            )
+        )
+
+        profile_seconds_label = toga.Label(
+            "Seconds (0 = until stopped):",
+            style=Pack(
+                color=self.colors['text'],
+                padding=(0, 5, 0, 10)
+            )
+        )
+
+        self.profile_seconds_input = toga.NumberInput(
+            min_value=0,
+            max_value=3600,
+            step=5,
+            value=30,
+            style=Pack(
+                width=80,
+                padding=(5, 5)
+            )
+        )
+
+        self.start_profile_button = toga.Button(
+            "Start Profiling",
+            on_press=self.start_profiling,
+            style=Pack(
+                padding=(10, 15),
+                background_color=self.colors['secondary'],
+                color=self.colors['toolbar_text'],
+            )
+        )
+
+        self.stop_profile_button = toga.Button(
+            "Stop Profiling",
+            on_press=self.stop_profiling,
+            enabled=False,
+            style=Pack(
+                padding=(10, 15),
+                background_color=self.colors['danger'],
+                color=self.colors['toolbar_text'],
+            )
+        )
+
+        profile_box.add(profile_label)
+        profile_box.add(self.profile_mode_input)
+        profile_box.add(profile_seconds_label)
+        profile_box.add(self.profile_seconds_input)
+        profile_box.add(self.start_profile_button)
+        profile_box.add(self.stop_profile_button)
+        content_card.add(profile_box)
+
+        # Log filter and follow controls
+        log_filter_box = toga.Box(style=Pack(
+            direction=ROW,
+            padding=(0, 0, 15, 0),
+            alignment=CENTER
+        ))
+
+        log_level_label = toga.Label(
+            "Level:",
+            style=Pack(
+                color=self.colors['text'],
+                padding=(0, 10, 0, 0)
+            )
+        )
+
+        self.log_level_input = toga.Selection(
+            items=["ALL", *LEVELS],
+            value="ALL",
+            on_change=self.change_log_filter,
+            style=Pack(
+                width=120,
+                padding=(5, 5)
+            )
+        )
+
+        log_text_label = toga.Label(
+            "Contains:",
+            style=Pack(
+                color=self.colors['text'],
+                padding=(0, 5, 0, 10)
+            )
+        )
+
+        self.log_text_input = toga.TextInput(
+            placeholder="Text to search for",
+            on_change=self.change_log_filter,
+            style=Pack(
+                flex=1,
+                padding=(5, 5)
+            )
+        )
+
+        self.log_follow_input = toga.Switch(
+            "Follow",
+            value=False,
+            on_change=self.toggle_log_follow,
+            style=Pack(
+                padding=(5, 5)
+            )
+        )
+
+        log_filter_box.add(log_level_label)
+        log_filter_box.add(self.log_level_input)
+        log_filter_box.add(log_text_label)
+        log_filter_box.add(self.log_text_input)
+        log_filter_box.add(self.log_follow_input)
+        content_card.add(log_filter_box)
+
         # Divider
         content_card.add(toga.Divider(style=Pack(
             padding=(10, 0)
@@ -975,11 +1443,12 @@ class CodeSimulator(toga.App):
                 "Mouse and Command+Tab: Simulates mouse movements and Command+Tab switching"
             ]),
             ("File Selection", [
-                "Use the 'Choose File' button to select a .txt file for typing simulation",
-                "If no file is selected, default files from resources/code directory will be used"
+                "Use the 'Choose File' button to select a code file for typing simulation",
+                "If no file is selected, files from the resources/code directory and its subfolders will be used"
             ]),
             ("Configuration", [
                 "Adjust typing speed, language formatting, and other settings in the Configuration tab",
+                "Enable Editor Auto-Indent when the target editor indents new lines by itself",
                 "Application targets for switching can be configured in applications.json"
             ]),
             ("Keyboard Shortcuts", [
@@ -1021,27 +1490,30 @@ class CodeSimulator(toga.App):
 
         return about_view
 
-    def load_configuration_values(self):
-        """Load configuration values from config.json."""
+    def load_configuration_values(self, config: Optional[SimulatorConfig] = None):
+        """Show the shared configuration in the configuration view."""
         try:
-            # Get configuration path
-            config_path = self.action_simulator._get_config_path()
-
-            # Read configuration file
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            if config is None:
+                config = self.action_simulator.config_store.config
 
             # Set code configuration values
-            code_config = config.get('code', {})
-            self.language_input.value = code_config.get('language', 'python')
-            self.indent_input.value = code_config.get('indent_size', 4)
-            self.max_line_input.value = code_config.get('max_line_length', 80)
+            self.language_input.value = config.code.language
+            self.indent_input.value = config.code.indent_size
+            self.max_line_input.value = config.code.max_line_length
+            self.auto_indent_input.value = config.code.auto_indent
+            self.format_code_input.value = config.code.format_code
+
+            self.selection_input.value = config.corpus.selection
+            self.budget_input.value = config.session.budget_minutes
+            self.worker_process_input.value = config.injection.use_worker_process
+            self.metrics_input.value = config.metrics.enabled
+            self.trace_input.value = config.tracing.enabled
+            self.watchdog_input.value = config.watchdog.enabled
 
             # Set typing speed configuration values
-            typing_config = config.get('typing_speed', {})
-            self.min_speed_input.value = typing_config.get('min', 0.03)
-            self.max_speed_input.value = typing_config.get('max', 0.07)
-            self.mistake_input.value = typing_config.get('mistake_rate', 0.07)
+            self.min_speed_input.value = config.typing_speed.min
+            self.max_speed_input.value = config.typing_speed.max
+            self.mistake_input.value = config.typing_speed.mistake_rate
 
             logger.info("Configuration values loaded successfully")
         except Exception as e:
@@ -1049,42 +1521,36 @@ class CodeSimulator(toga.App):
             self.console.value = f"Error loading configuration: {e}\n"
 
     async def save_configuration_direct(self, widget):
-        """Save configuration values directly to config.json."""
+        """Validate the configuration view and save it to config.json."""
         try:
-            # Get configuration path
-            config_path = self.action_simulator._get_config_path()
-
-            # Read current configuration
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-
-            # Update code configuration
-            if 'code' not in config:
-                config['code'] = {}
-
-            config['code']['language'] = self.language_input.value
-            config['code']['indent_size'] = self.indent_input.value
-            config['code']['max_line_length'] = self.max_line_input.value
-
-            # Update typing speed configuration
-            if 'typing_speed' not in config:
-                config['typing_speed'] = {}
-
-            config['typing_speed']['min'] = self.min_speed_input.value
-            config['typing_speed']['max'] = self.max_speed_input.value
-            config['typing_speed']['mistake_rate'] = self.mistake_input.value
-
-            # Preserve line_break if it exists
-            if 'line_break' not in config['typing_speed']:
-                config['typing_speed']['line_break'] = [0.5, 1.0]
+            store = self.action_simulator.config_store
+            config = store.config.to_dict()
+
+            config['code'].update(
+                language=self.language_input.value,
+                indent_size=self.indent_input.value,
+                max_line_length=self.max_line_input.value,
+                auto_indent=self.auto_indent_input.value,
+                format_code=self.format_code_input.value,
+            )
+            config['corpus']['selection'] = self.selection_input.value
+            config['session']['budget_minutes'] = self.budget_input.value or 0
+            config['injection']['use_worker_process'] = self.worker_process_input.value
+            config['metrics']['enabled'] = self.metrics_input.value
+            config['tracing']['enabled'] = self.trace_input.value
+            config['watchdog']['enabled'] = self.watchdog_input.value
+            config['typing_speed'].update(
+                min=self.min_speed_input.value,
+                max=self.max_speed_input.value,
+                mistake_rate=self.mistake_input.value,
+            )
 
-            # Write updated configuration
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=4)
+            # Validates every value, so an invalid entry never reaches the file
+            store.save(SimulatorConfig.from_dict(config))
 
-            # Reload configuration in action simulator
-            self.action_simulator.config = self.action_simulator._load_config()
-            self.action_simulator._setup_from_config()
+            # A running simulation picks the change up at its next chunk
+            if not self.action_simulator.loop_flag:
+                self.action_simulator.apply_config_changes()
 
             # Show success message
             self.console.value = "✅ Configuration saved and reloaded successfully.\n"
@@ -1097,19 +1563,66 @@ class CodeSimulator(toga.App):
 
     def setup_components(self):
         """Set up the application components."""
+        from .metrics import SimulatorMetrics
         self.action_simulator = ActionSimulator(self.console, self)
+        # Simulation output reaches the console, the log and the counters through the telemetry bus
+        telemetry = self.action_simulator.telemetry
+        telemetry.subscribe(ConsoleSink(self.console, self.status_label))
+        telemetry.subscribe(LogSink())
+        self.metrics = SimulatorMetrics(self.action_simulator)
+        telemetry.subscribe(self.metrics)
+        telemetry.subscribe(TraceSink(self.action_simulator.tracer))
+        # Local Prometheus endpoint, started when enabled in the configuration
+        self.metrics_server: Optional["MetricsServer"] = None
+        # Memory growth check for long sessions, also opt-in
+        self.watchdog_task: Optional[asyncio.Task] = None
         self.key_handler = GlobalKeyHandler(self, self.action_simulator)
         self.simulation_task = None
 
         # Now that ActionSimulator is initialized, we can load configuration values
         self.load_configuration_values()
+        # Keep the configuration view in step with edits made to config.json
+        self.action_simulator.config_store.subscribe(self.load_configuration_values)
+        self.action_simulator.config_store.subscribe(
+            lambda config: self.loop.create_task(self.update_metrics_server(config))
+        )
+        self.action_simulator.config_store.subscribe(self.update_memory_watchdog)
+
+    def update_memory_watchdog(self, config: Optional[SimulatorConfig] = None):
+        """Start or stop the memory watchdog to match the configuration."""
+        settings = (config or self.action_simulator.config_store.config).watchdog
+        if self.watchdog_task:
+            self.watchdog_task.cancel()
+            self.watchdog_task = None
+        if settings.enabled:
+            from .watchdog import MemoryWatchdog
+            watchdog = MemoryWatchdog(int(settings.max_growth_mb * 2 ** 20), settings.interval_seconds,
+                                      self.action_simulator.telemetry)
+            self.watchdog_task = self.loop.create_task(watchdog.run())
+            logger.info(f"Memory watchdog enabled, limit {settings.max_growth_mb}MB of growth")
+
+    async def update_metrics_server(self, config: Optional[SimulatorConfig] = None):
+        """Start, restart or stop the metrics endpoint to match the configuration."""
+        settings = (config or self.action_simulator.config_store.config).metrics
+        server = self.metrics_server
+        try:
+            if server and (not settings.enabled or server.port != settings.port):
+                self.metrics_server = None
+                await server.close()
+            if settings.enabled and not self.metrics_server:
+                from .metrics import MetricsServer
+                self.metrics_server = MetricsServer(self.metrics.registry, settings.port)
+                await self.metrics_server.start()
+        except OSError as e:
+            logger.error(f"Could not serve metrics on port {settings.port}: {e}")
+            self.metrics_server = None
 
     async def choose_file(self, widget):
         """Allow the user to select a code file."""
         try:
             dialog = toga.OpenFileDialog(
                 title="Select a Code File",
-                file_types=["txt"]
+                file_types=sorted(extension.lstrip('.') for extension in CODE_EXTENSIONS | set(COMPRESSED_OPENERS))
             )
             file_path = await self.main_window.dialog(dialog)
 
@@ -1140,17 +1653,22 @@ class CodeSimulator(toga.App):
 
     async def start_simulation(self, widget):
         """Start the simulation process."""
+        telemetry = self.action_simulator.telemetry
         if not self.action_simulator.loop_flag:
             try:
-                self.console.value = "🚀 Starting simulation...\n"
+                telemetry.message("🚀 Starting simulation...\n", replace=True)
                 self.update_button_states(running=True)
                 self.action_simulator.loop_flag = True
-                self.status_label.text = "Simulation running"
+                telemetry.status("Simulation running")
 
                 # Get the selected simulation mode
                 selected_mode = self.mode_selector.value
                 self.action_simulator.simulation_mode = selected_mode
-                self.console.value += f"▶️ Mode: {selected_mode}\n"
+                telemetry.message(f"▶️ Mode: {selected_mode}\n")
+
+                self.action_simulator.start_session()
+                if self.action_simulator.planner:
+                    telemetry.message(f"⏱️ Session budget: {self.action_simulator.budget_minutes} minutes\n")
 
                 # Determine which file to use based on the selected mode and whether a file was chosen
                 file_to_use = None
@@ -1158,84 +1676,113 @@ class CodeSimulator(toga.App):
                     if self.selected_file and os.path.exists(self.selected_file):
                         file_to_use = self.selected_file
                         filename = os.path.basename(file_to_use)
-                        self.console.value += f"📄 Using selected file: {filename}\n"
+                        telemetry.message(f"📄 Using selected file: {filename}\n")
                         logger.info(f"Using selected file: {file_to_use}")
                     else:
-                        self.console.value += "📄 No valid file selected. Using default code samples\n"
+                        telemetry.message("📄 No valid file selected. Using default code samples\n")
                         logger.info("No valid file selected, using default code samples")
                 else:
-                    self.console.value += "📄 File selection not applicable for this mode\n"
+                    telemetry.message("📄 File selection not applicable for this mode\n")
                     logger.info("File selection not applicable for this mode")
 
                 # Start the simulation task
                 if not self.simulation_task:
                     self.simulation_task = asyncio.create_task(self.run_continuous_simulation(file_to_use))
+                    # A stop from any thread cancels the task right away
+                    self.action_simulator.cancel_token.attach(self.simulation_task)
                 logger.info("Simulation started successfully.")
             except Exception as e:
                 logger.error(f"Error starting simulation: {e}")
                 await self.stop_simulation(widget)
 
     async def run_continuous_simulation(self, file_to_use: Optional[str]):
-        """Run the continuous simulation loop."""
+        """Run the sources of the selected mode together until the simulation stops."""
+        simulator = self.action_simulator
+        telemetry = simulator.telemetry
+        self._current_file = None
+        self._reported_empty_corpus = False
+        scheduler = ActionScheduler(telemetry=telemetry)
+        for source in simulator.create_sources(lambda: self._next_typing_steps(file_to_use)):
+            scheduler.add(source)
         try:
-            while self.action_simulator.loop_flag:
-                # Determine which file to use
-                if file_to_use and os.path.exists(file_to_use):
-                    next_file = file_to_use
-                    logger.debug(f"Using provided file: {next_file}")
+            await scheduler.run(lambda: simulator.loop_flag and not simulator.session_expired)
+
+            if simulator.loop_flag and simulator.session_expired:
+                if simulator.planner.out_of_files:
+                    telemetry.message("⏱️ No file fits in the session time left. Switching applications...\n")
                 else:
-                    next_file = self.action_simulator.get_next_code_file()
-                    logger.debug(f"Using default file: {next_file}")
-
-                if not next_file:
-                    self.console.value += "❌ No code files found to simulate typing.\n"
-                    await asyncio.sleep(2)
-                    continue
-
-                # Calculate typing time if applicable
-                if self.action_simulator.simulation_mode in ["Typing Only", "Hybrid"]:
-                    await self.action_simulator.calculate_typing_time(next_file)
-
-                # Execute the simulation based on the selected mode
-                if self.action_simulator.simulation_mode == "Typing Only":
-                    self.console.value += "⌨️ Simulating typing...\n"
-                    await self.action_simulator.simulate_typing(next_file)
-                elif self.action_simulator.simulation_mode == "Tab Switching Only":
-                    self.console.value += "🔄 Switching between applications...\n"
-                    self.action_simulator.switch_window()
-                    await asyncio.sleep(2)
-                elif self.action_simulator.simulation_mode == "Hybrid":
-                    self.console.value += "⌨️ Simulating typing...\n"
-                    await self.action_simulator.simulate_typing(next_file)
-                    self.console.value += "🔄 Switching between applications...\n"
-                    self.action_simulator.switch_window()
-                    await asyncio.sleep(2)
-                elif self.action_simulator.simulation_mode == "Mouse and Command+Tab":
-                    # Use the dedicated method for this simulation mode
-                    await self.action_simulator.simulate_mouse_and_command_tab(duration=15)  # Run for 15 seconds
-
-                filename = os.path.basename(next_file)
-                self.console.value += f"\n✅ Finished simulating file: {filename}\n"
-                self.console.value += "🔄 Cycle completed. Restarting...\n\n"
-                self.status_label.text = "Cycle completed"
-                await asyncio.sleep(2)
+                    telemetry.message("⏱️ Session budget used up. Switching applications...\n")
+                await simulator.switch_window()
+                await self.stop_simulation(None)
+                telemetry.status("Session budget reached")
         except asyncio.CancelledError:
-            self.console.value += "⏹️ Simulation task cancelled.\n"
-            self.status_label.text = "Simulation cancelled"
+            telemetry.message("⏹️ Simulation task cancelled.\n")
+            telemetry.status("Simulation cancelled")
         except Exception as e:
-            self.console.value += f"❌ Error during simulation: {str(e)}\n"
-            self.status_label.text = "Error in simulation"
+            telemetry.message(f"❌ Error during simulation: {str(e)}\n")
+            telemetry.status("Error in simulation")
             logger.error(f"Error in continuous simulation: {e}")
             await self.stop_simulation(None)
+        finally:
+            if self._current_file:
+                simulator.tracer.end(TYPING_TRACK)
+            simulator.end_session()
+
+    async def _next_typing_steps(self, file_to_use: Optional[str]):
+        """Pick the next file to type and return its typing steps, or None if there is none."""
+        simulator = self.action_simulator
+        telemetry = simulator.telemetry
+        if self._current_file:
+            filename = os.path.basename(self._current_file)
+            telemetry.message(f"\n✅ Finished simulating file: {filename}\n")
+            telemetry.message("🔄 Cycle completed. Restarting...\n\n")
+            telemetry.status("Cycle completed")
+            simulator.tracer.end(TYPING_TRACK)
+            self._current_file = None
+
+        # Determine which file to use
+        if file_to_use and code_file_exists(file_to_use):
+            next_file = file_to_use
+            logger.debug(f"Using provided file: {next_file}")
+        else:
+            next_file = await simulator.get_next_code_file()
+            logger.debug(f"Using default file: {next_file}")
+
+        if not next_file:
+            if simulator.session_expired:
+                # Nothing fits in the time left; the scheduler stops and the session ends
+                return None
+            if not self._reported_empty_corpus:
+                telemetry.message("❌ No code files found to simulate typing.\n")
+                self._reported_empty_corpus = True
+            return None
+        self._reported_empty_corpus = False
+
+        # Pick up the file prepared during the previous cycle, then start
+        # preparing the one after it while this one is typed
+        prepared = await simulator.get_prepared_file(next_file)
+        upcoming = next_file if next_file == file_to_use else await simulator.peek_next_code_file()
+        simulator.prefetch_file(upcoming)
+        await simulator.calculate_typing_time(next_file, prepared.stats)
+
+        self._current_file = next_file
+        simulator.tracer.begin(f"cycle {os.path.basename(next_file)}", TYPING_TRACK)
+        telemetry.message("⌨️ Simulating typing...\n")
+        return simulator.typing_steps(next_file, prepared)
 
     async def stop_simulation(self, widget):
         """Stop the simulation process."""
+        telemetry = self.action_simulator.telemetry
         if self.action_simulator.loop_flag:
             try:
-                self.console.value += "⏹️ Stopping simulation...\n"
+                telemetry.message("⏹️ Stopping simulation...\n")
                 self.action_simulator.loop_flag = False
+                self.action_simulator.prefetcher.clear()
+                self.action_simulator.rate_limiter.log_summary()
+                if self.action_simulator.injection_worker:
+                    self.action_simulator.injection_worker.log_summary()
                 self.update_button_states(running=False)
-                self.status_label.text = "Simulation stopped"
+                telemetry.status("Simulation stopped")
                 if self.simulation_task:
                     self.simulation_task.cancel()
                     self.simulation_task = None
@@ -11,23 +11,32 @@ class AppSwitcher:
     Supports focusing applications and retrieving running application lists.
     """
 
-    def __init__(self, config):
+    def __init__(self, config, rate_limiter=None, cancel_token=None):
         """
         Initialize AppSwitcher with configuration.
 
         Args:
             config: Configuration object that provides application settings
+            rate_limiter: Optional InputRateLimiter that focus changes wait on
+            cancel_token: Optional CancellationToken that terminates focus commands on stop
         """
         self.config = config
+        self.rate_limiter = rate_limiter
+        self.cancel_token = cancel_token
         self.platform = sys.platform
         self._quartz = None
         self._win32gui = None
         self._win32process = None
         self._display = None
-        self._setup_platform_handler()
+        # Platform modules load on first use; Quartz and Xlib are slow to import
+        self._platform_ready = False
+        # Focus changes since start, read by the metrics exporter
+        self.focus_stats = {"attempted": 0, "succeeded": 0}
 
     def _setup_platform_handler(self):
         """Set up the platform-specific handler based on the current operating system."""
+        if self._platform_ready:
+            return
         try:
             if self.platform == 'darwin':
                 self._setup_macos_handler()
@@ -35,6 +44,7 @@ class AppSwitcher:
                 self._setup_windows_handler()
             else:
                 self._setup_linux_handler()
+            self._platform_ready = True
         except Exception as e:
             logger.error(f"Failed to setup platform handler: {e}")
             raise RuntimeError(f"Platform setup failed: {e}")
@@ -95,6 +105,7 @@ class AppSwitcher:
         Returns:
             List of running application configurations
         """
+        self._setup_platform_handler()
         if self.platform == 'darwin':
             return self._get_running_applications_macos()
         elif self.platform == 'win32':
@@ -213,6 +224,12 @@ class AppSwitcher:
         running_apps = self.get_running_applications()
         return random.choice(running_apps) if running_apps else None
 
+    def _run(self, args: List[str]):
+        """Run a focus command, stoppable through the cancellation token if there is one."""
+        if self.cancel_token:
+            return self.cancel_token.run_process(args)
+        return subprocess.run(args, check=True, capture_output=True, text=True)
+
     def focus_application(self, app_info: Dict) -> bool:
         """
         Focus on a specific application.
@@ -227,17 +244,17 @@ class AppSwitcher:
             logger.error("Cannot focus: app_info is None or empty")
             return False
 
+        self.focus_stats["attempted"] += 1
         try:
+            self._setup_platform_handler()
+            if self.rate_limiter:
+                self.rate_limiter.acquire_blocking("focus")
+
             if self.platform == 'darwin':
                 app_name = app_info.get("name")
                 if not app_name:
                     raise ValueError("No application name provided")
-                subprocess.run(
-                    ['osascript', '-e', f'tell application "{app_name}" to activate'],
-                    check=True,
-                    capture_output=True,
-                    text=True
-                )
+                self._run(['osascript', '-e', f'tell application "{app_name}" to activate'])
 
             elif self.platform == 'win32':
                 window_class = app_info.get('window_class')
@@ -260,13 +277,9 @@ class AppSwitcher:
                 app_name = app_info.get("name")
                 if not app_name:
                     raise ValueError("No application name provided")
-                subprocess.run(
-                    ['wmctrl', '-a', app_name],
-                    check=True,
-                    capture_output=True,
-                    text=True
-                )
+                self._run(['wmctrl', '-a', app_name])
 
+            self.focus_stats["succeeded"] += 1
             return True
 
         except subprocess.CalledProcessError as e:
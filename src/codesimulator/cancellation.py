@@ -0,0 +1,105 @@
+import asyncio
+import subprocess
+import threading
+import time
+from typing import Callable, List, Optional, Sequence
+
+from .logging_config import logger
+
+# Worst-case time between a stop request and the end of any wait made through a token
+MAX_STOP_LATENCY = 0.05
+
+
+class CancellationToken:
+    """
+    Stop signal threaded through every action of a simulation.
+
+    Waits made through the token are split into slices no longer than
+    MAX_STOP_LATENCY, and blocking waits in worker threads wake as soon as
+    the token is cancelled, so a stop request takes effect within that bound
+    wherever the simulation happens to be. cancel() may be called from any
+    thread; attached asyncio tasks are cancelled on their own loop.
+    """
+
+    def __init__(self, slice_seconds: float = MAX_STOP_LATENCY, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the token.
+
+        Args:
+            slice_seconds: Longest uninterrupted wait
+            clock: Monotonic time source for sleep deadlines
+        """
+        self.slice_seconds = slice_seconds
+        self.clock = clock
+        self._event = threading.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        """Request a stop; safe to call from any thread, more than once."""
+        if self._event.is_set():
+            return
+        self._event.set()
+        for task in self._tasks:
+            if not task.done():
+                task.get_loop().call_soon_threadsafe(task.cancel)
+        self._tasks.clear()
+
+    def reset(self):
+        """Clear a previous stop so the token can serve a new run."""
+        self._event.clear()
+
+    def attach(self, task: asyncio.Task):
+        """Cancel a task together with the token."""
+        if self.cancelled:
+            task.cancel()
+        else:
+            self._tasks.append(task)
+
+    def check(self):
+        """Raise asyncio.CancelledError if a stop was requested."""
+        if self._event.is_set():
+            raise asyncio.CancelledError()
+
+    async def sleep(self, seconds: float):
+        """Sleep in slices, raising asyncio.CancelledError within one slice of a stop."""
+        deadline = self.clock() + seconds
+        while True:
+            self.check()
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, self.slice_seconds))
+
+    def wait(self, seconds: float):
+        """Blocking sleep for worker threads that wakes immediately on cancel, then raises."""
+        self._event.wait(seconds)
+        self.check()
+
+    def run_process(self, args: Sequence[str], timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run a command like subprocess.run(check=True, capture_output=True, text=True),
+        terminating it if the token is cancelled while it runs.
+        """
+        self.check()
+        process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while process.poll() is None:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise subprocess.TimeoutExpired(args, timeout)
+                self._event.wait(self.slice_seconds)
+                if self.cancelled:
+                    logger.debug(f"Stop requested, terminating {args[0]}")
+                    raise asyncio.CancelledError()
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        stdout, stderr = process.communicate()
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, args, stdout, stderr)
+        return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
@@ -1,10 +1,22 @@
+import atexit
+import copy
 import sys
 import json
 import os
+import tempfile
+import threading
+import time
+import weakref
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from .logging_config import logger
 
+# Seconds without edits before application lists are written
+WRITE_DELAY = 0.5
+
+# Longest time an edit stays unwritten while edits keep coming
+MAX_WRITE_DELAY = 5.0
+
 DEFAULT_APPS = {
     'darwin': {  # macOS
         'applications': [
@@ -66,12 +78,50 @@ DEFAULT_APPS = {
 }
 
 
+# Configurations with edits that may still be pending; weak, so that a
+# discarded configuration is neither kept alive nor written at exit
+_live_configs: "weakref.WeakSet[AppConfig]" = weakref.WeakSet()
+
+
+def _flush_live_configs():
+    for config in list(_live_configs):
+        config.flush()
+
+
+atexit.register(_flush_live_configs)
+
+
 class AppConfig:
-    def __init__(self, app=None):
+    """
+    Applications the simulator switches between, per platform, from applications.json.
+
+    Edits change the in-memory lists and are written behind: a burst of edits
+    within write_delay seconds becomes one write, made through a temporary
+    file and os.replace so the file is never left half-written. Pending edits
+    are flushed by close(), or at exit for configurations still in use.
+    """
+
+    def __init__(self, app=None, config_path: Optional[str] = None,
+                 write_delay: float = WRITE_DELAY, max_write_delay: float = MAX_WRITE_DELAY):
+        """
+        Initialize the configuration.
+
+        Args:
+            app: Optional Toga app instance, used to locate applications.json
+            config_path: Explicit path of applications.json
+            write_delay: Seconds without edits before pending edits are written
+            max_write_delay: Longest time an edit waits during continuous edits
+        """
         self.app = app
-        self.config_path = self._get_config_path()
+        self.config_path = config_path or self._get_config_path()
         self.platform = sys.platform
+        self.write_delay = write_delay
+        self.max_write_delay = max_write_delay
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty_since: Optional[float] = None
         self.apps = self._load_config()
+        _live_configs.add(self)
 
     def _get_config_path(self) -> str:
         """Get the path to the configuration file."""
@@ -79,7 +129,7 @@ class AppConfig:
         return get_resource_path(self.app, 'applications.json')
 
     def _load_config(self) -> Dict:
-        """Load the configuration file or create default if it doesn't exist."""
+        """Load the configuration file, or the defaults if it doesn't exist."""
         try:
             if os.path.exists(self.config_path):
                 with open(self.config_path, 'r') as f:
@@ -90,18 +140,12 @@ class AppConfig:
             # If config doesn't exist or platform not found, use defaults
             return self._create_default_config()
         except Exception as e:
-            logger.error(f"Error loading config3: {e}")
+            logger.error(f"Error loading application config: {e}")
             return self._create_default_config()
 
     def _create_default_config(self) -> Dict:
-        """Create and save default configuration."""
-        config = DEFAULT_APPS
-        try:
-            with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=4)
-        except Exception as e:
-            logger.error(f"Error saving default config: {e}")
-        return config
+        """Return a copy of the defaults; they are only written once edited."""
+        return copy.deepcopy(DEFAULT_APPS)
 
     def get_applications(self) -> List[Dict]:
         """Get the list of applications for the current platform."""
@@ -110,13 +154,10 @@ class AppConfig:
     def add_application(self, app_info: Dict) -> bool:
         """Add a new application to the configuration."""
         try:
-            if self.platform not in self.apps:
-                self.apps[self.platform] = {'applications': []}
-
-            self.apps[self.platform]['applications'].append(app_info)
-
-            with open(self.config_path, 'w') as f:
-                json.dump(self.apps, f, indent=4)
+            with self._lock:
+                apps = self.get_applications()
+                # Replace rather than mutate the list, so readers in other threads see a consistent list
+                self._set_platform_applications(self.platform, apps + [app_info])
             return True
         except Exception as e:
             logger.error(f"Error adding application: {e}")
@@ -125,15 +166,95 @@ class AppConfig:
     def remove_application(self, app_name: str) -> bool:
         """Remove an application from the configuration."""
         try:
-            if self.platform in self.apps:
-                apps = self.apps[self.platform]['applications']
-                self.apps[self.platform]['applications'] = [
-                    app for app in apps if app['name'] != app_name
-                ]
-
-                with open(self.config_path, 'w') as f:
-                    json.dump(self.apps, f, indent=4)
-                return True
+            with self._lock:
+                if self.platform in self.apps:
+                    apps = self.get_applications()
+                    self._set_platform_applications(
+                        self.platform, [app for app in apps if app['name'] != app_name]
+                    )
+                    return True
         except Exception as e:
             logger.error(f"Error removing application: {e}")
-        return False
\ No newline at end of file
+        return False
+
+    def set_applications(self, apps: List[Dict], platform: Optional[str] = None) -> bool:
+        """
+        Replace the application list of a platform in one edit.
+
+        Args:
+            apps: New application list
+            platform: sys.platform value of the list; defaults to the current platform
+        """
+        try:
+            with self._lock:
+                self._set_platform_applications(platform or self.platform, [dict(app) for app in apps])
+            return True
+        except Exception as e:
+            logger.error(f"Error setting applications: {e}")
+            return False
+
+    def _set_platform_applications(self, platform: str, apps: List[Dict]):
+        self.apps.setdefault(platform, {})['applications'] = apps
+        self._schedule_write()
+
+    def _schedule_write(self):
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        if self._timer is not None:
+            self._timer.cancel()
+        delay = min(self.write_delay, max(0.0, self._dirty_since + self.max_write_delay - now))
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    @property
+    def pending(self) -> bool:
+        """True while edits are waiting to be written."""
+        return self._dirty_since is not None
+
+    def flush(self) -> bool:
+        """
+        Write pending edits now.
+
+        Returns:
+            True if the file is up to date
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._dirty_since is None:
+                return True
+            data = json.dumps(self.apps, indent=4)
+            try:
+                self._write_atomic(data)
+            except Exception as e:
+                logger.error(f"Error saving application config: {e}")
+                return False
+            self._dirty_since = None
+            return True
+
+    def close(self) -> bool:
+        """
+        Write pending edits and stop flushing this configuration at exit.
+
+        Returns:
+            True if the file is up to date
+        """
+        _live_configs.discard(self)
+        return self.flush()
+
+    def _write_atomic(self, data: str):
+        directory = os.path.dirname(self.config_path) or "."
+        fd, temp_path = tempfile.mkstemp(prefix=".applications-", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
@@ -0,0 +1,289 @@
+import bisect
+import itertools
+import os
+import random
+import time
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from .corpus_io import MEMBER_SEPARATOR, is_archive, list_archive_members, logical_name
+from .language_detect import EXTENSION_LANGUAGES
+from .logging_config import logger
+
+CODE_EXTENSIONS = frozenset(['.txt', *EXTENSION_LANGUAGES])
+
+SELECTION_MODES = ("sequential", "shuffle", "weighted")
+
+
+def is_code_file(name: str) -> bool:
+    """Return True for code files, including compressed ones such as Main.java.gz."""
+    return os.path.splitext(logical_name(name))[1].lower() in CODE_EXTENSIONS
+
+
+class CorpusEntry(NamedTuple):
+    """Metadata kept for every indexed code file."""
+    path: str
+    size: int
+    mtime_ns: int
+
+
+class CodeCorpus:
+    """
+    Lazily built index of the code files below a directory.
+
+    Compressed files are indexed as they are, and zip or tar archives contribute
+    one entry per code file listed in their index, addressed as
+    "archive.zip!member". Nothing is scanned until the first file is requested. Afterwards only
+    directories whose mtime changed are re-listed, at most once per
+    refresh_interval, so new and removed files are picked up without walking
+    the whole tree again. Editing a file in place leaves its directory's mtime
+    alone, so picked files are stat'ed again and their metadata refreshed.
+    """
+
+    def __init__(self, root: str, selection: str = "sequential", refresh_interval: float = 5.0):
+        """
+        Initialize the corpus.
+
+        Args:
+            root: Directory to index recursively
+            selection: One of "sequential", "shuffle" or "weighted" (by file size)
+            refresh_interval: Minimum seconds between checks for changed directories
+        """
+        self.root = root
+        self.selection = selection
+        self.refresh_interval = refresh_interval
+        # directory -> mtime when it was listed, plus its files and subdirectories
+        self._dirs: Dict[str, int] = {}
+        self._dir_files: Dict[str, Set[str]] = {}
+        self._subdirs: Dict[str, Set[str]] = {}
+        self._files: Dict[str, CorpusEntry] = {}
+        # archive -> mtime when its members were listed, plus the member paths
+        self._archives: Dict[str, int] = {}
+        self._archive_members: Dict[str, Set[str]] = {}
+        self._order: List[str] = []
+        self._queued: Set[str] = set()
+        self._position = 0
+        self._upcoming: Optional[str] = None
+        self._cumulative_weights: Optional[List[int]] = None
+        self._weighted_paths: List[str] = []
+        self._last_refresh: Optional[float] = None
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._files)
+
+    def entries(self) -> List[CorpusEntry]:
+        """Return the metadata of all indexed files."""
+        self.refresh()
+        return list(self._files.values())
+
+    def refresh(self, force: bool = False):
+        """Re-list directories that changed since they were last scanned."""
+        now = time.monotonic()
+        if not force and self._last_refresh is not None and now - self._last_refresh < self.refresh_interval:
+            return
+        first_scan = self._last_refresh is None
+        self._last_refresh = now
+
+        try:
+            if first_scan:
+                self._scan_tree(self.root)
+                logger.info(f"Indexed {len(self._files)} code files in {self.root}")
+                if not self._files:
+                    logger.warning(f"No code files found in {self.root}")
+                return
+
+            for directory, mtime_ns in list(self._dirs.items()):
+                try:
+                    current = os.stat(directory).st_mtime_ns
+                except FileNotFoundError:
+                    self._forget_tree(directory)
+                    continue
+                if current != mtime_ns:
+                    self._scan_directory(directory, recursive_new=True)
+
+            # Archives rewritten in place do not touch their directory's mtime
+            for archive, mtime_ns in list(self._archives.items()):
+                try:
+                    changed = os.stat(archive).st_mtime_ns != mtime_ns
+                except FileNotFoundError:
+                    changed = True
+                if changed:
+                    self._scan_directory(os.path.dirname(archive), recursive_new=True)
+        except Exception as e:
+            logger.error(f"Error refreshing code corpus {self.root}: {e}")
+
+    def current(self, path: str) -> Optional[CorpusEntry]:
+        """
+        Return the metadata of an indexed file, re-read if the file changed in place.
+
+        Args:
+            path: Corpus path of the file
+
+        Returns:
+            CorpusEntry, or None if the file is not indexed or no longer exists
+        """
+        entry = self._files.get(path)
+        archive, separator, _ = path.partition(MEMBER_SEPARATOR)
+        if entry is None or (separator and archive in self._archives):
+            # Archive members change with their archive, which refresh() checks
+            return entry
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._remove_file(path)
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (entry.size, entry.mtime_ns):
+            entry = CorpusEntry(path, stat.st_size, stat.st_mtime_ns)
+            self._files[path] = entry
+            self._cumulative_weights = None
+        return entry
+
+    def next_file(self) -> Optional[str]:
+        """Return the next code file according to the selection mode."""
+        upcoming, self._upcoming = self._upcoming, None
+        path = upcoming if upcoming and upcoming in self._files else self._advance()
+        while path is not None and self.current(path) is None:
+            path = self._advance()
+        return path
+
+    def peek_next(self) -> Optional[str]:
+        """Return the file the next call to next_file will return, without consuming it."""
+        if self._upcoming is None or self._upcoming not in self._files:
+            self._upcoming = self._advance()
+        return self._upcoming
+
+    def _advance(self) -> Optional[str]:
+        """Pick the next file and move the selection forward."""
+        self.refresh()
+        if not self._files:
+            return None
+
+        if self.selection == "weighted":
+            return self._pick_weighted()
+
+        while True:
+            if self._position >= len(self._order):
+                self._position = 0
+                if self.selection == "shuffle":
+                    random.shuffle(self._order)
+            path = self._order[self._position]
+            if path in self._files:
+                self._position += 1
+                return path
+            # Drop files that disappeared since they were queued
+            self._queued.discard(path)
+            del self._order[self._position]
+
+    def _pick_weighted(self) -> str:
+        """Pick a random file with probability proportional to its size."""
+        if self._cumulative_weights is None:
+            self._weighted_paths = list(self._files)
+            self._cumulative_weights = list(itertools.accumulate(
+                max(1, self._files[path].size) for path in self._weighted_paths
+            ))
+        target = random.random() * self._cumulative_weights[-1]
+        return self._weighted_paths[bisect.bisect_right(self._cumulative_weights, target)]
+
+    def _scan_tree(self, root: str):
+        """Index a directory and everything below it."""
+        stack = [root]
+        while stack:
+            stack.extend(self._scan_directory(stack.pop()))
+
+    def _scan_directory(self, directory: str, recursive_new: bool = False) -> List[str]:
+        """
+        List a single directory and update the index.
+
+        Args:
+            directory: Directory to list
+            recursive_new: Scan subdirectories that were not indexed before
+
+        Returns:
+            Subdirectories that are not indexed yet
+        """
+        try:
+            with os.scandir(directory) as it:
+                listed = sorted(it, key=lambda entry: entry.name)
+            self._dirs[directory] = os.stat(directory).st_mtime_ns
+        except FileNotFoundError:
+            self._forget_tree(directory)
+            return []
+
+        files = set()
+        subdirs = set()
+        new_dirs = []
+        for entry in listed:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.add(entry.path)
+                if entry.path not in self._dirs:
+                    new_dirs.append(entry.path)
+            elif entry.is_file() and is_archive(entry.name):
+                # The archive itself is tracked so its members go away with it
+                files.add(entry.path)
+                files.update(self._index_archive(entry))
+            elif entry.is_file() and is_code_file(entry.name):
+                files.add(entry.path)
+                stat = entry.stat()
+                self._add_file(CorpusEntry(entry.path, stat.st_size, stat.st_mtime_ns))
+
+        for path in self._dir_files.get(directory, set()) - files:
+            self._remove_file(path)
+        for path in self._subdirs.get(directory, set()) - subdirs:
+            self._forget_tree(path)
+        self._dir_files[directory] = files
+        self._subdirs[directory] = subdirs
+
+        if recursive_new:
+            for new_dir in new_dirs:
+                self._scan_tree(new_dir)
+        return new_dirs
+
+    def _index_archive(self, entry: os.DirEntry) -> Set[str]:
+        """Index the code files inside an archive, re-reading its index only when it changed."""
+        stat = entry.stat()
+        if self._archives.get(entry.path) == stat.st_mtime_ns:
+            return self._archive_members[entry.path]
+
+        members = set()
+        try:
+            for name, size in list_archive_members(entry.path):
+                if is_code_file(name):
+                    path = f"{entry.path}{MEMBER_SEPARATOR}{name}"
+                    members.add(path)
+                    self._add_file(CorpusEntry(path, size, stat.st_mtime_ns))
+            logger.debug(f"Indexed {len(members)} code files in archive {entry.path}")
+        except Exception as e:
+            logger.error(f"Error reading archive {entry.path}: {e}")
+
+        for path in self._archive_members.get(entry.path, set()) - members:
+            self._remove_file(path)
+        self._archives[entry.path] = stat.st_mtime_ns
+        self._archive_members[entry.path] = members
+        return members
+
+    def _add_file(self, entry: CorpusEntry):
+        if entry.path not in self._queued:
+            self._queued.add(entry.path)
+            if self.selection == "shuffle" and self._order:
+                # Queue new files at a random spot that is still ahead in this pass
+                self._order.insert(random.randint(self._position, len(self._order)), entry.path)
+            else:
+                self._order.append(entry.path)
+        self._files[entry.path] = entry
+        self._cumulative_weights = None
+
+    def _remove_file(self, path: str):
+        self._files.pop(path, None)
+        self._cumulative_weights = None
+        if path in self._archives:
+            del self._archives[path]
+            for member in self._archive_members.pop(path, set()):
+                self._files.pop(member, None)
+
+    def _forget_tree(self, directory: str):
+        """Drop a removed directory and everything indexed below it."""
+        self._dirs.pop(directory, None)
+        for path in self._dir_files.pop(directory, set()):
+            self._remove_file(path)
+        for subdir in self._subdirs.pop(directory, set()):
+            self._forget_tree(subdir)
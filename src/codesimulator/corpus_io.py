@@ -0,0 +1,157 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import tarfile
+import zipfile
+from typing import BinaryIO, List, NamedTuple, Optional, TextIO, Tuple
+
+# Separates an archive path from the member inside it, e.g. "samples.zip!java/Main.java"
+MEMBER_SEPARATOR = "!"
+
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open,
+}
+
+ZIP_SUFFIXES = ('.zip',)
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+class FileStats(NamedTuple):
+    """Character and line counts used for typing-time estimates."""
+    total_chars: int
+    total_lines: int
+    empty_lines: int
+
+
+def is_archive(path: str) -> bool:
+    """Return True if the path is a zip or tar archive holding code files."""
+    lowered = path.lower()
+    return lowered.endswith(ZIP_SUFFIXES) or lowered.endswith(TAR_SUFFIXES)
+
+
+def split_member_path(path: str) -> Tuple[str, Optional[str]]:
+    """Split a corpus path into (file on disk, member inside an archive or None)."""
+    archive, separator, member = path.partition(MEMBER_SEPARATOR)
+    if separator and is_archive(archive):
+        return archive, member
+    return path, None
+
+
+def logical_name(path: str) -> str:
+    """Return the name a corpus path stands for, without archive or compression parts."""
+    name = split_member_path(path)[1] or path
+    root, extension = os.path.splitext(name)
+    if extension.lower() in COMPRESSED_OPENERS:
+        return root
+    return name
+
+
+def code_file_exists(path: str) -> bool:
+    """Return True if the file, or the archive holding the member, exists."""
+    return os.path.exists(split_member_path(path)[0])
+
+
+def stat_code_file(path: str) -> os.stat_result:
+    """Stat the file on disk behind a corpus path."""
+    return os.stat(split_member_path(path)[0])
+
+
+def list_archive_members(archive_path: str) -> List[Tuple[str, int]]:
+    """
+    List the regular files in an archive from its index, without extracting them.
+
+    Returns:
+        List of (member name, uncompressed size)
+    """
+    if archive_path.lower().endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive_path) as archive:
+            return [(info.filename, info.file_size) for info in archive.infolist() if not info.is_dir()]
+    with tarfile.open(archive_path, 'r:*') as archive:
+        return [(member.name, member.size) for member in archive if member.isfile()]
+
+
+def open_code_file(path: str) -> BinaryIO:
+    """
+    Open a corpus path as a binary stream.
+
+    Compressed files and archive members are decompressed while they are read,
+    so they are never materialized in memory or on disk.
+    """
+    file_path, member = split_member_path(path)
+    if member is not None:
+        if file_path.lower().endswith(ZIP_SUFFIXES):
+            with zipfile.ZipFile(file_path) as archive:
+                # The member keeps the underlying file open after the archive is closed
+                return archive.open(member)
+        archive = tarfile.open(file_path, 'r:*')
+        try:
+            return _ArchiveMember(archive.extractfile(member), archive)
+        except Exception:
+            archive.close()
+            raise
+
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(file_path)[1].lower())
+    if opener:
+        return opener(file_path, 'rb')
+    return open(file_path, 'rb')
+
+
+def open_code_text(path: str) -> TextIO:
+    """Open a corpus path as a text stream."""
+    return io.TextIOWrapper(open_code_file(path), encoding='utf-8', errors='replace')
+
+
+def count_file_stats(path: str) -> FileStats:
+    """Count characters (without trailing whitespace), lines and empty lines in one streaming pass."""
+    total_chars = 0
+    total_lines = 0
+    empty_lines = 0
+    with open_code_text(path) as f:
+        for line in f:
+            stripped = line.rstrip()
+            total_chars += len(stripped)
+            total_lines += 1
+            if not stripped:
+                empty_lines += 1
+    return FileStats(total_chars, total_lines, empty_lines)
+
+
+class _ArchiveMember(io.BufferedIOBase):
+    """Stream of a tar member that closes the archive together with itself."""
+
+    def __init__(self, stream, archive):
+        super().__init__()
+        self._stream = stream
+        self._archive = archive
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def read1(self, size=-1):
+        return self._stream.read(size)
+
+    def readline(self, size=-1):
+        return self._stream.readline(size)
+
+    def seekable(self):
+        return self._stream.seekable()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._stream.seek(offset, whence)
+
+    def tell(self):
+        return self._stream.tell()
+
+    def close(self):
+        if not self.closed:
+            self._stream.close()
+            self._archive.close()
+        super().close()
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .corpus_io import open_code_file, open_code_text, stat_code_file
+from .language_formatter import FORMATTER_VERSION, FormatterFactory
+from .logging_config import logger
+
+
+class FormattedOutputCache:
+    """
+    On-disk cache of whole files run through a language formatter.
+
+    Entries are keyed by (content hash, language, indent size, formatter version),
+    so a file is formatted once and every later cycle reads the stored output.
+    The least recently used entries are evicted once the cache grows beyond max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 64 * 1024 * 1024, max_digests: int = 4096):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the formatted files
+            max_bytes: Total size the cache is trimmed back to after each write
+            max_digests: Number of file identities whose content hash is kept
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_digests = max_digests
+        # (path, size, mtime) -> content hash, so unchanged files are not re-hashed
+        # (for archive members, size and mtime are those of the archive)
+        self._digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        # Prefetching and background formatting use the cache from worker threads
+        self._digests_lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def lookup(self, file_path: str, language: str, indent_size: int) -> Optional[str]:
+        """Return the path of the cached formatted file, or None if it was not formatted yet."""
+        try:
+            cached_path = os.path.join(self.cache_dir, f"{self._cache_key(file_path, language, indent_size)}.txt")
+            if os.path.exists(cached_path):
+                self._touch(cached_path)
+                return cached_path
+        except Exception as e:
+            logger.error(f"Error looking up formatted cache for {file_path}: {e}")
+        return None
+
+    def get_formatted_path(self, file_path: str, language: str, indent_size: int) -> str:
+        """
+        Return the path of the formatted version of a file, formatting it on a miss.
+
+        Args:
+            file_path: Source file to format
+            language: Formatter language
+            indent_size: Indentation width used by the formatter
+
+        Returns:
+            Path to the formatted file, or the source path if formatting failed
+        """
+        try:
+            key = self._cache_key(file_path, language, indent_size)
+            cached_path = os.path.join(self.cache_dir, f"{key}.txt")
+            if os.path.exists(cached_path):
+                self._touch(cached_path)
+                logger.debug(f"Formatted cache hit for {file_path}")
+                return cached_path
+
+            self._format_file(file_path, cached_path, language, indent_size)
+            logger.info(f"Pre-formatted {os.path.basename(file_path)} as {language}")
+            self._evict(keep=cached_path)
+            return cached_path
+        except Exception as e:
+            logger.error(f"Error pre-formatting {file_path}: {e}")
+            return file_path
+
+    def _cache_key(self, file_path: str, language: str, indent_size: int) -> str:
+        """Build the content-addressed key for a file and formatter configuration."""
+        stat = stat_code_file(file_path)
+        identity = (file_path, stat.st_size, stat.st_mtime_ns)
+        with self._digests_lock:
+            digest = self._digests.get(identity)
+            if digest is not None:
+                self._digests.move_to_end(identity)
+        if digest is None:
+            hasher = hashlib.sha256()
+            with open_code_file(file_path) as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    hasher.update(block)
+            digest = hasher.hexdigest()
+            with self._digests_lock:
+                self._digests[identity] = digest
+                if len(self._digests) > self.max_digests:
+                    self._digests.popitem(last=False)
+
+        key = f"{digest}:{language}:{indent_size}:{FORMATTER_VERSION}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _format_file(self, file_path: str, cached_path: str, language: str, indent_size: int):
+        """Format a whole file in one pass and atomically store the result."""
+        formatter = FormatterFactory.create_formatter(language, indent_size)
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with open_code_text(file_path) as source, os.fdopen(fd, 'w', encoding='utf-8') as target:
+                for line in source:
+                    target.write(formatter.format_line(line) + "\n")
+            os.replace(temp_path, cached_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _touch(self, cached_path: str):
+        """
+        Refresh the access time that drives LRU eviction.
+
+        The mtime is kept, so the entry still identifies the same typed stream
+        in the progress journal.
+        """
+        stat = os.stat(cached_path)
+        os.utime(cached_path, ns=(time.time_ns(), stat.st_mtime_ns))
+
+    def _evict(self, keep: str):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith('.txt'):
+                    stat = entry.stat()
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+                logger.debug(f"Evicted formatted cache entry {path}")
+            except OSError as e:
+                logger.error(f"Error evicting cache entry {path}: {e}")
@@ -0,0 +1,172 @@
+"""
+Import-time report for the startup path.
+
+Runs a module import in a fresh interpreter with ``-X importtime``, totals
+the self time per top-level package and checks the result against a budget:
+
+    python -m codesimulator.import_budget codesimulator.app --budget-ms 400
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Cumulative import time allowed per startup module, in milliseconds
+DEFAULT_BUDGETS_MS: Dict[str, float] = {
+    "codesimulator.actions": 400.0,
+    "codesimulator.app": 1000.0,
+}
+
+# Backends that must only load when first used, not while the app starts
+DEFERRED_MODULES = ("pyautogui", "Xlib", "Quartz", "AppKit", "pynput", "win32gui", "win32process")
+
+# Tools behind a user action or a configuration switch, kept out of the app's import
+DEFERRED_APP_MODULES = DEFERRED_MODULES + (
+    "cProfile", "pstats", "codesimulator.profiling", "codesimulator.log_viewer",
+    "codesimulator.metrics", "codesimulator.watchdog",
+)
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+class ImportReport(NamedTuple):
+    module: str
+    timings: List[ImportTiming]
+
+    @property
+    def total_ms(self) -> float:
+        """Cumulative import time of the measured module."""
+        for timing in self.timings:
+            if timing.module == self.module:
+                return timing.cumulative_us / 1000
+        return sum(timing.self_us for timing in self.timings) / 1000
+
+    def by_package(self) -> Dict[str, float]:
+        """Self time in milliseconds per top-level package, largest first."""
+        totals: Dict[str, float] = {}
+        for timing in self.timings:
+            package = timing.module.split(".")[0]
+            totals[package] = totals.get(package, 0.0) + timing.self_us / 1000
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def imported(self, module: str) -> bool:
+        """True if the module or one of its submodules was imported."""
+        return any(timing.module == module or timing.module.startswith(module + ".")
+                   for timing in self.timings)
+
+
+def parse_importtime(lines: Iterable[str]) -> List[ImportTiming]:
+    """
+    Parse ``-X importtime`` output.
+
+    Args:
+        lines: stderr lines of the interpreter
+
+    Returns:
+        One entry per imported module, in import order
+    """
+    timings = []
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # The header row
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(ImportTiming(stripped, int(fields[0]), int(fields[1]),
+                                    (len(name) - len(stripped) - 1) // 2))
+    return timings
+
+
+def measure_imports(module: str, python: Optional[str] = None, timeout: float = 60.0) -> ImportReport:
+    """
+    Import a module in a fresh interpreter and collect its import times.
+
+    Args:
+        module: Dotted module name to import
+        python: Interpreter to run; defaults to the current one
+        timeout: Seconds before the measurement is abandoned
+
+    Returns:
+        ImportReport for the module
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    env = dict(os.environ)
+    # Measure this source tree, whichever directory the command runs from
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src_dir, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, timeout=timeout,
+    )
+    if result.returncode:
+        raise RuntimeError(f"Importing {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+    return ImportReport(module, parse_importtime(result.stderr.splitlines()))
+
+
+def check_budget(report: ImportReport, budget_ms: Optional[float],
+                 deferred: Iterable[str] = DEFERRED_MODULES) -> List[str]:
+    """
+    Compare a report against a budget.
+
+    Args:
+        report: Result of measure_imports
+        budget_ms: Allowed cumulative import time in milliseconds, or None to only check deferred modules
+        deferred: Modules that must not be imported at all
+
+    Returns:
+        Descriptions of every violation; empty if the budget is met
+    """
+    problems = []
+    if budget_ms is not None and report.total_ms > budget_ms:
+        problems.append(f"{report.module} took {report.total_ms:.1f}ms to import, budget {budget_ms:.1f}ms")
+    for module in deferred:
+        if report.imported(module):
+            problems.append(f"{report.module} imports {module} at startup")
+    return problems
+
+
+def format_report(report: ImportReport, top: int = 10) -> str:
+    """Render the slowest packages of a report as text."""
+    lines = [f"{report.module}: {report.total_ms:.1f}ms"]
+    for package, ms in list(report.by_package().items())[:top]:
+        lines.append(f"  {package:<30} {ms:8.1f}ms")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the import time of startup modules against a budget.")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_BUDGETS_MS), help="Modules to measure")
+    parser.add_argument("--budget-ms", type=float, help="Budget for every module, instead of the defaults")
+    parser.add_argument("--top", type=int, default=10, help="Packages to list per module")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        try:
+            report = measure_imports(module)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"{module}: {e}")
+            failed = True
+            continue
+        print(format_report(report, args.top))
+        budget = args.budget_ms if args.budget_ms is not None else DEFAULT_BUDGETS_MS.get(module, 1000.0)
+        deferred = DEFERRED_APP_MODULES if module == "codesimulator.app" else DEFERRED_MODULES
+        for problem in check_budget(report, budget, deferred):
+            print(f"  OVER BUDGET: {problem}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
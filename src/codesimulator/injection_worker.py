@@ -0,0 +1,300 @@
+import asyncio
+import multiprocessing
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from .cancellation import CancellationToken
+from .logging_config import logger
+from .ring_buffer import Record, SharedRingBuffer
+
+# The worker reports how far a batch got after this many events
+PROGRESS_EVERY = 16
+
+# Seconds to wait for the worker to exit before it is terminated
+SHUTDOWN_TIMEOUT = 2.0
+
+
+class InputEvent(NamedTuple):
+    """One precomputed keystroke of a batch."""
+    op: str          # "press" or "write"
+    arg: str         # Key name or text
+    delay: float     # Seconds to wait after the event
+    advance: int = 0  # Characters of the typed line the event completes
+
+
+# Named keys a batch can press; FLAG_KEY records index this table
+KEY_NAMES = ("enter", "backspace", "tab", "space", "escape", "delete", "left", "right", "up", "down", "home", "end")
+FLAG_KEY = 1      # keycode is an index into KEY_NAMES, otherwise a character to write
+FLAG_ADVANCE = 2  # the event completes a character of the typed line
+
+# Records per ring; a longer list of events is sent as several batches
+RING_CAPACITY = 4096
+
+
+def encode_event(event: InputEvent) -> Record:
+    """Pack an event into a ring record (keycode, flags, delay in microseconds)."""
+    op, arg, delay, advance = event
+    if op == "press":
+        keycode, flags = KEY_NAMES.index(arg), FLAG_KEY
+    elif op == "write" and len(arg) == 1:
+        keycode, flags = ord(arg), 0
+    else:
+        raise ValueError(f"Event cannot be sent to the injection worker: {event}")
+    if advance:
+        flags |= FLAG_ADVANCE
+    return keycode, flags, int(round(delay * 1_000_000))
+
+
+def decode_event(record: Record) -> InputEvent:
+    """Inverse of encode_event."""
+    keycode, flags, delay_us = record
+    advance = 1 if flags & FLAG_ADVANCE else 0
+    if flags & FLAG_KEY:
+        return InputEvent("press", KEY_NAMES[keycode], delay_us / 1_000_000, advance)
+    return InputEvent("write", chr(keycode), delay_us / 1_000_000, advance)
+
+
+def serve(conn, actions: Dict[str, Callable[[str], None]], events: SharedRingBuffer,
+          telemetry: SharedRingBuffer, pause: float = 0.0, clock: Callable[[], float] = time.perf_counter):
+    """
+    Worker loop: run batches of events from the events ring until told to stop.
+
+    The pipe only carries small control messages. In: ("batch", id, count),
+    once count records are in the ring, ("cancel", id) and ("stop",). Out:
+    ("progress", id, done), ("done", id, done) and ("error", id, done, message),
+    where done counts the executed events. For every executed event a record
+    (index in batch, 0, lateness in microseconds) goes to the telemetry ring,
+    or is dropped if the parent has not drained it.
+
+    Args:
+        conn: Worker end of the pipe
+        actions: Operation name -> function injecting one event
+        events: Ring the parent fills with encoded events
+        telemetry: Ring this worker fills with timing records
+        pause: Extra seconds after every event, like pyautogui.PAUSE
+        clock: High-resolution time source
+    """
+    while True:
+        message = conn.recv()
+        if message[0] == "stop":
+            return
+        if message[0] != "batch":
+            # A cancel for a batch that has already finished
+            continue
+        _, batch_id, count = message
+        consumed = done = 0
+        interrupt = None
+        scheduled = clock()
+        try:
+            while consumed < count:
+                record = events.pop()
+                if record is None:
+                    raise RuntimeError(f"Batch {batch_id} has {consumed} of {count} events")
+                consumed += 1
+                op, arg, delay, _ = decode_event(record)
+                telemetry.push(done, 0, int(max(0.0, clock() - scheduled) * 1_000_000))
+                actions[op](arg)
+                done += 1
+                if done % PROGRESS_EVERY == 0:
+                    conn.send(("progress", batch_id, done))
+                # Wait on the pipe, so a cancel ends the wait at once; the deadline
+                # is kept across unrelated messages so delays do not stretch
+                scheduled = clock() + delay + pause
+                while interrupt is None:
+                    remaining = scheduled - clock()
+                    if remaining <= 0 or not conn.poll(remaining):
+                        break
+                    kind = conn.recv()[0]
+                    if kind in ("cancel", "stop"):
+                        interrupt = kind
+                if interrupt:
+                    break
+        except Exception as e:
+            events.skip(count - consumed)
+            conn.send(("error", batch_id, done, str(e)))
+            continue
+        # Leave the ring empty for the next batch
+        events.skip(count - consumed)
+        conn.send(("done", batch_id, done))
+        if interrupt == "stop":
+            return
+
+
+def _run_worker(conn, pause: float, events_name: str, telemetry_name: str):
+    """Process entry point; pyautogui is only imported in the worker."""
+    import pyautogui
+    pyautogui.FAILSAFE = True
+    pyautogui.PAUSE = 0
+    events = SharedRingBuffer.attach(events_name)
+    telemetry = SharedRingBuffer.attach(telemetry_name)
+    try:
+        serve(conn, {"press": pyautogui.press, "write": pyautogui.write}, events, telemetry, pause)
+    finally:
+        events.close()
+        telemetry.close()
+
+
+class InjectionWorker:
+    """
+    Injects keystroke batches from a separate process.
+
+    The UI, logging and file I/O share the simulator's process, so garbage
+    collection and redraws there show up as keystroke jitter. The worker
+    receives whole lines of precomputed events and times them on its own,
+    reporting how many events ran, so only batch boundaries touch the main
+    event loop. Events go out and timing telemetry comes back through shared
+    memory rings; the pipe only carries control messages.
+    """
+
+    def __init__(self, pause: float = 0.0, cancel_token: Optional[CancellationToken] = None,
+                 target: Callable = _run_worker, ring_capacity: int = RING_CAPACITY):
+        """
+        Initialize the worker; the process starts with start().
+
+        Args:
+            pause: Extra seconds after every event, like pyautogui.PAUSE
+            cancel_token: Token that cancels the running batch on stop
+            target: Process entry point taking (conn, pause, events_name, telemetry_name)
+            ring_capacity: Records per ring, a power of two
+        """
+        self.pause = pause
+        self.cancel_token = cancel_token or CancellationToken()
+        self.target = target
+        self.ring_capacity = ring_capacity
+        self.executed = 0
+        # Lateness of executed events against their schedule, from the telemetry ring
+        self.timing = {"events": 0, "late_seconds": 0.0, "max_late_seconds": 0.0}
+        self._conn = None
+        self._process: Optional[multiprocessing.Process] = None
+        self._events: Optional[SharedRingBuffer] = None
+        self._telemetry: Optional[SharedRingBuffer] = None
+        self._batch_id = 0
+        self._abort = False
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        """Start the worker process; spawned, so it shares no state with the UI process."""
+        if self.running:
+            return
+        self.close()
+        self._events = SharedRingBuffer.create(self.ring_capacity)
+        self._telemetry = SharedRingBuffer.create(self.ring_capacity)
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=self.target,
+            args=(child_conn, self.pause, self._events.name, self._telemetry.name),
+            name="input-injection", daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+        logger.info(f"Started input injection worker (pid {self._process.pid})")
+
+    async def run_batch(self, events: Sequence[InputEvent]) -> int:
+        """
+        Inject events in the worker and wait until they have run.
+
+        The number of executed events is kept in self.executed, also when the
+        batch is cut short by the cancellation token or task cancellation.
+
+        Returns:
+            Number of events executed
+        """
+        self.cancel_token.check()
+        if not self.running:
+            raise RuntimeError("Input injection worker is not running")
+        records = [encode_event(event) for event in events]
+        self.executed = 0
+        self._abort = False
+        reply = asyncio.ensure_future(asyncio.to_thread(self._run_records, records))
+        try:
+            return await asyncio.shield(reply)
+        except asyncio.CancelledError:
+            # The task was cancelled; stop the batch and wait for the final count
+            self._abort = True
+            await asyncio.gather(reply, return_exceptions=True)
+            raise
+
+    def _run_records(self, records: List[Record]) -> int:
+        # The events ring is empty between batches, so each slice fits
+        for start in range(0, len(records), self.ring_capacity):
+            chunk = records[start:start + self.ring_capacity]
+            self._batch_id += 1
+            self._events.push_many(chunk)
+            self._conn.send(("batch", self._batch_id, len(chunk)))
+            done = self._wait_for_batch(self._batch_id, start)
+            self.executed = start + done
+            if done < len(chunk):
+                break
+        return self.executed
+
+    def _wait_for_batch(self, batch_id: int, start: int = 0) -> int:
+        """
+        Wait for the worker to finish a slice, keeping self.executed current.
+
+        Args:
+            batch_id: Slice being waited for
+            start: Events of the batch executed before the slice
+
+        Returns:
+            Events of the slice executed
+        """
+        cancel_sent = False
+        while True:
+            if (self._abort or self.cancel_token.cancelled) and not cancel_sent:
+                self._conn.send(("cancel", batch_id))
+                cancel_sent = True
+            if not self._conn.poll(self.cancel_token.slice_seconds):
+                if not self.running:
+                    raise RuntimeError("Input injection worker exited")
+                continue
+            kind, reply_id, done, *error = self._conn.recv()
+            if reply_id != batch_id:
+                continue
+            self._drain_telemetry()
+            if kind == "error":
+                raise RuntimeError(f"Input injection failed: {error[0]}")
+            if kind == "progress":
+                self.executed = start + done
+            elif kind == "done":
+                return done
+
+    def _drain_telemetry(self):
+        for _, _, late_us in self._telemetry.pop_many():
+            late = late_us / 1_000_000
+            self.timing["events"] += 1
+            self.timing["late_seconds"] += late
+            self.timing["max_late_seconds"] = max(self.timing["max_late_seconds"], late)
+
+    def log_summary(self):
+        """Log how closely the worker kept to the planned keystroke timing."""
+        events = self.timing["events"]
+        if events:
+            logger.info(
+                f"Injection worker: {events} events, mean lateness "
+                f"{self.timing['late_seconds'] / events * 1000:.2f}ms, "
+                f"max {self.timing['max_late_seconds'] * 1000:.2f}ms"
+            )
+
+    def close(self):
+        """Stop the worker process and free the rings."""
+        if self._process is not None:
+            try:
+                self._conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
+            self._process.join(SHUTDOWN_TIMEOUT)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._conn.close()
+            logger.info("Stopped input injection worker")
+            self._process = None
+            self._conn = None
+        for ring in (self._events, self._telemetry):
+            if ring is not None:
+                ring.close()
+        self._events = self._telemetry = None
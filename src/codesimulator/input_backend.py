@@ -0,0 +1,120 @@
+import threading
+from typing import Optional, Tuple
+
+from .cancellation import CancellationToken
+from .logging_config import logger
+from .rate_limiter import InputRateLimiter
+
+# Seconds pyautogui pauses after each event
+DEFAULT_PAUSE = 0.1
+
+_pyautogui = None
+_load_lock = threading.Lock()
+
+
+def load_pyautogui():
+    """
+    Import and configure pyautogui on first use.
+
+    pyautogui pulls in its screenshot and tweening dependencies and the
+    platform input APIs, which is a large part of startup time, so it is not
+    imported until input is about to be injected.
+    """
+    global _pyautogui
+    if _pyautogui is None:
+        with _load_lock:
+            if _pyautogui is None:
+                import pyautogui
+                pyautogui.FAILSAFE = True
+                pyautogui.PAUSE = DEFAULT_PAUSE
+                logger.info("PyAutoGUI initialized")
+                _pyautogui = pyautogui
+    return _pyautogui
+
+
+class InputInjector:
+    """
+    Single entry point for synthetic keyboard and mouse input.
+
+    Every event passes the shared InputRateLimiter before it reaches pyautogui,
+    so all producers together stay within the configured rates.
+    """
+
+    def __init__(self, rate_limiter: Optional[InputRateLimiter] = None,
+                 cancel_token: Optional[CancellationToken] = None, backend=None):
+        """
+        Initialize the injector.
+
+        Args:
+            rate_limiter: Limiter shared by every component that injects input
+            cancel_token: Token that ends pauses between events on stop
+            backend: Object with pyautogui's input functions, used instead of pyautogui
+        """
+        self.cancel_token = cancel_token or CancellationToken()
+        self.rate_limiter = rate_limiter or InputRateLimiter(cancel_token=self.cancel_token)
+        self._size: Optional[Tuple[int, int]] = None
+        self._backend = backend
+
+    def backend(self):
+        """The input backend, pyautogui unless another one was given."""
+        return self._backend if self._backend is not None else load_pyautogui()
+
+    def load(self):
+        """Import the input backend now rather than on the first event; blocking."""
+        self.backend()
+
+    @property
+    def pause(self) -> float:
+        """Seconds paused after each event; does not import the backend."""
+        if self._backend is not None:
+            return self._backend.PAUSE
+        return _pyautogui.PAUSE if _pyautogui is not None else DEFAULT_PAUSE
+
+    async def _pause(self):
+        # pyautogui's PAUSE is a blocking sleep after each call; it is skipped
+        # with _pause=False and taken here as a cancellable wait instead
+        pause = self.backend().PAUSE
+        if pause:
+            await self.cancel_token.sleep(pause)
+
+    async def press(self, key: str):
+        await self.rate_limiter.acquire("key")
+        self.backend().press(key, _pause=False)
+        await self._pause()
+
+    async def write(self, text: str):
+        await self.rate_limiter.acquire("key", len(text))
+        self.backend().write(text, _pause=False)
+        await self._pause()
+
+    async def hotkey(self, *keys: str):
+        await self.rate_limiter.acquire("hotkey")
+        self.backend().hotkey(*keys, _pause=False)
+        await self._pause()
+
+    async def move_to(self, x: float, y: float):
+        await self.rate_limiter.acquire("pointer")
+        # Glides are made of many small moves, so no pause after each
+        self.backend().moveTo(x, y, _pause=False)
+
+    async def click(self, button: str = "left"):
+        await self.rate_limiter.acquire("pointer")
+        self.backend().click(button=button, _pause=False)
+        await self._pause()
+
+    async def scroll(self, amount: int):
+        await self.rate_limiter.acquire("scroll")
+        self.backend().scroll(amount, _pause=False)
+        await self._pause()
+
+    def position(self) -> Tuple[int, int]:
+        """Current pointer position; a query, not rate limited."""
+        return self.backend().position()
+
+    def size(self) -> Tuple[int, int]:
+        """Screen size, queried once; a query, not rate limited."""
+        if self._size is None:
+            width, height = self.backend().size()
+            self._size = (width, height)
+            logger.info(f"Screen size: {self._size}")
+        return self._size
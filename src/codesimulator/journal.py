@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, NamedTuple, Optional
+
+from .corpus_io import stat_code_file
+from .logging_config import logger
+
+
+class ProgressRecord(NamedTuple):
+    """Where typing of a stream stopped: byte offset and number of the line, and characters typed of it."""
+    offset: int
+    line: int
+    column: int
+
+
+class ProgressJournal:
+    """
+    Append-only journal of typing progress, one JSON record per line.
+
+    Each record maps a stream id to the byte offset and number of the line being
+    typed, so a restarted session can seek straight to it. The last record for a
+    stream wins, a "done" record forgets it, and the file is rewritten with only
+    the live positions once it grows beyond compact_after records. A record torn
+    by a crash is skipped on load.
+    """
+
+    def __init__(self, path: str, compact_after: int = 1000):
+        """
+        Initialize the journal and load the positions recorded so far.
+
+        Args:
+            path: Journal file
+            compact_after: Number of appended records that triggers a rewrite
+        """
+        self.path = path
+        self.compact_after = compact_after
+        self._positions: Dict[str, ProgressRecord] = {}
+        self._records = 0
+        self._load()
+
+    @staticmethod
+    def stream_id(file_path: str) -> str:
+        """Identify the typed stream by path, size and mtime, so edited files start over."""
+        stat = stat_code_file(file_path)
+        return hashlib.sha256(f"{file_path}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+
+    def position(self, stream_id: str) -> Optional[ProgressRecord]:
+        """Return where typing of a stream stopped, or None if it was never started or was finished."""
+        return self._positions.get(stream_id)
+
+    def record(self, stream_id: str, offset: int, line: int, column: int = 0):
+        """Append the current position of a stream."""
+        self._positions[stream_id] = ProgressRecord(offset, line, column)
+        self._append({"id": stream_id, "offset": offset, "line": line, "column": column})
+
+    def complete(self, stream_id: str):
+        """Forget a stream that was typed to the end."""
+        if self._positions.pop(stream_id, None) is not None:
+            self._append({"id": stream_id, "done": True})
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    self._records += 1
+                    try:
+                        entry = json.loads(line)
+                        if entry.get("done"):
+                            self._positions.pop(entry["id"], None)
+                        else:
+                            self._positions[entry["id"]] = ProgressRecord(
+                                entry["offset"], entry["line"], entry.get("column", 0)
+                            )
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning(f"Skipping damaged progress record in {self.path}")
+            logger.debug(f"Loaded {len(self._positions)} unfinished streams from {self.path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error loading progress journal {self.path}: {e}")
+
+    def _append(self, entry: dict):
+        try:
+            if self._records >= self.compact_after:
+                self._compact()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+            self._records += 1
+        except Exception as e:
+            logger.error(f"Error writing progress journal {self.path}: {e}")
+
+    def _compact(self):
+        """Rewrite the journal with one record per unfinished stream."""
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for stream_id, (offset, line, column) in self._positions.items():
+                    f.write(json.dumps({"id": stream_id, "offset": offset, "line": line, "column": column}) + "\n")
+            os.replace(temp_path, self.path)
+            self._records = len(self._positions)
+            logger.debug(f"Compacted progress journal to {self._records} records")
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
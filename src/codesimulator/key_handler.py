@@ -12,7 +12,9 @@ class GlobalKeyHandler:
         self.platform = sys.platform
         self.keyboard_listener = None
         self._listener_task = None
-        self._setup_platform_handler()
+        # The platform hooks import Quartz/AppKit or pynput and Xlib, so they are
+        # set up by start(), once the window is shown, not on the startup path
+        self._platform_ready = False
 
     def _setup_platform_handler(self):
         try:
@@ -188,7 +190,10 @@ class GlobalKeyHandler:
             logger.error(f"Error in key handler: {e}")
 
     def start(self):
-        """Start the global key handler if it's not already running"""
+        """Set up the platform hooks and start the global key handler if it's not already running"""
+        if not self._platform_ready:
+            self._platform_ready = True
+            self._setup_platform_handler()
         if not self._listener_task or self._listener_task.done():
             self._listener_task = asyncio.create_task(self.run())
             logger.info("Started global key handler task")
@@ -0,0 +1,116 @@
+import os
+import re
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .corpus_io import logical_name, open_code_file, split_member_path, stat_code_file
+from .logging_config import logger
+
+# Bytes read from the start of a file when neither extension nor shebang decide
+SNIFF_BYTES = 4096
+
+EXTENSION_LANGUAGES = {
+    '.py': 'python',
+    '.pyw': 'python',
+    '.java': 'java',
+    '.php': 'php',
+    '.phtml': 'php',
+    '.yml': 'yaml',
+    '.yaml': 'yaml',
+}
+
+SHEBANG_LANGUAGES = {
+    'python': 'python',
+    'php': 'php',
+}
+
+_SHEBANG = re.compile(rb"#!\s*(?:\S*/)?([a-z]+)[\d.]*(?:\s+([a-z]+)[\d.]*)?")
+
+# Each hint is counted once per match; the language with the most matches wins
+_LANGUAGE_HINTS = (
+    ('php', re.compile(rb"<\?php|^\s*\$[A-Za-z_]\w*\s*(?:=|->)", re.M), 3),
+    ('java', re.compile(
+        rb"^\s*(?:package\s+[\w.]+;|import\s+[\w.]+(?:\.\*)?;"
+        rb"|(?:public|private|protected)\s+(?:static\s+)?(?:final\s+)?(?:abstract\s+)?"
+        rb"(?:class|interface|enum|void|[A-Z]\w*)\b)", re.M), 2),
+    ('python', re.compile(
+        rb"^\s*(?:def\s+\w+\s*\(|class\s+\w+\s*[(:]|import\s+\w+|from\s+[\w.]+\s+import\b"
+        rb"|if\s+__name__\s*==)", re.M), 2),
+    # Python block headers such as else: and try: look like top-level keys
+    ('yaml', re.compile(rb"^(?:---\s*$|\s*-\s+[\w-]+:\s|(?!(?:else|try|finally|except):)[A-Za-z_][\w-]*:(?:\s|$))",
+                        re.M), 1),
+)
+
+
+class LanguageDetector:
+    """
+    Resolves the language of a code file from its extension, shebang or first bytes.
+
+    Results are cached by file identity (device, inode, size, mtime and archive
+    member), so a repeated lookup costs a single stat call.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize the detector.
+
+        Args:
+            max_entries: Number of file identities kept in the cache
+        """
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[int, int, int, int, Optional[str]], Optional[str]]" = OrderedDict()
+
+    def detect(self, file_path: str, default: str) -> str:
+        """
+        Return the language of a file.
+
+        Args:
+            file_path: Path to the code file
+            default: Language used when detection is inconclusive
+
+        Returns:
+            Detected language name, or default
+        """
+        try:
+            stat = stat_code_file(file_path)
+            member = split_member_path(file_path)[1]
+            identity = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, member)
+            if identity in self._cache:
+                self._cache.move_to_end(identity)
+                language = self._cache[identity]
+            else:
+                language = self._resolve(file_path)
+                self._cache[identity] = language
+                if len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+                logger.debug(f"Detected language {language or 'unknown'} for {file_path}")
+            return language or default
+        except Exception as e:
+            logger.error(f"Error detecting language of {file_path}: {e}")
+            return default
+
+    def _resolve(self, file_path: str) -> Optional[str]:
+        """Determine the language without consulting the cache."""
+        extension = os.path.splitext(logical_name(file_path))[1].lower()
+        if extension in EXTENSION_LANGUAGES:
+            return EXTENSION_LANGUAGES[extension]
+
+        with open_code_file(file_path) as f:
+            head = f.read(SNIFF_BYTES)
+        return sniff_language(head)
+
+
+def sniff_language(head: bytes) -> Optional[str]:
+    """Guess the language from the first bytes of a file using cheap heuristics."""
+    shebang = _SHEBANG.match(head)
+    if shebang:
+        for name in shebang.groups():
+            if name and name.decode() in SHEBANG_LANGUAGES:
+                return SHEBANG_LANGUAGES[name.decode()]
+
+    best, best_score = None, 0
+    for language, pattern, weight in _LANGUAGE_HINTS:
+        score = len(pattern.findall(head)) * weight
+        if score > best_score:
+            best, best_score = language, score
+    return best
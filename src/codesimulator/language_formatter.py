@@ -1,123 +1,303 @@
 import re
+from typing import NamedTuple, Optional, Pattern, Tuple
 from .logging_config import logger
 
+# Bump whenever formatter output changes so cached pre-formatted files are regenerated
+FORMATTER_VERSION = 2
+
+_INDENT = re.compile(r"[ \t]*")
+_LEADING_WORD = re.compile(r"[A-Za-z_]\w*")
+
+_OPERATOR_CHARS = r"=!<>&|+\-*/.%?:^~"
+
+
+def _build_tokenizer(line_comment: str, block_comments: bool, multiline_quotes: bool) -> Pattern:
+    """Compile the master pattern that splits a line into tokens in a single scan."""
+    alternatives = [r"(?P<ws>\s+)"]
+    if multiline_quotes:
+        alternatives.append(r"(?P<mlstart>\"\"\"|''')")
+    alternatives.append(r"(?P<str>\"(?:\\.|[^\"\\])*\"?|'(?:\\.|[^'\\])*'?)")
+    alternatives.append(rf"(?P<comment>(?:{line_comment}).*)")
+    if block_comments:
+        alternatives.append(r"(?P<block>/\*)")
+    alternatives += [
+        r"(?P<open>[(\[{])",
+        r"(?P<close>[)\]}])",
+        r"(?P<comma>,)",
+        rf"(?P<op>[{_OPERATOR_CHARS}]+)",
+        rf"(?P<word>[^\s\"'(\[{{)\]}},#{_OPERATOR_CHARS}]+)",
+        r"(?P<other>.)",
+    ]
+    return re.compile("|".join(alternatives))
+
+
+C_STYLE_TOKENS = _build_tokenizer("//", block_comments=True, multiline_quotes=False)
+JAVA_TOKENS = _build_tokenizer("//", block_comments=True, multiline_quotes=True)
+PHP_TOKENS = _build_tokenizer("//|#", block_comments=True, multiline_quotes=False)
+PYTHON_TOKENS = _build_tokenizer("#", block_comments=False, multiline_quotes=True)
+YAML_TOKENS = _build_tokenizer("#", block_comments=False, multiline_quotes=False)
+
+
+class ScannedLine(NamedTuple):
+    """A line split into its parts by a single tokenizer pass."""
+    indent: str
+    code: str
+    comment: str
+    depth_change: int
+    leading_closers: int
+    top_level_colon: bool
+    verbatim: bool
+
 
 class LanguageFormatter:
     """Base class for language-specific formatters."""
 
+    tokens = C_STYLE_TOKENS
+    # Insert a space after commas that are directly followed by code
+    comma_spacing = False
+    # Drop whitespace in front of closing parentheses
+    strip_before_close = False
+    # Operators that get exactly one space on each side
+    spaced_operators = frozenset()
+    # Keep the source indentation instead of deriving it from brackets
+    preserve_indent = False
+
+    # Trailing characters after which an auto-indenting editor indents the next line
+    block_openers = ("{", "(", "[")
+    # Leading characters the editor re-indents to the enclosing block as soon as they are typed
+    electric_closers = ("}", ")", "]")
+
     def __init__(self, indent_size=4):
         self.indent_size = indent_size
         self.indent_level = 0
         self.indent_style = " " * indent_size
+        # Column the editor places the caret at after the next Enter
+        self.editor_indent = 0
+        # Terminator of a string or comment that continues onto the next line
+        self._open_terminator: Optional[str] = None
 
     def format_line(self, line: str) -> str:
         """Format a single line of code.
 
-        This is a base method that should be overridden by subclasses.
+        Spacing rules are applied while the line is tokenized, so every character
+        is looked at once. Indentation is derived from bracket depth unless the
+        formatter preserves the source indentation.
         """
-        line = line.strip()
-
-        # Handle indentation
-        if line.endswith("{") or line.endswith("("):
-            indented_line = self.indent_style * self.indent_level + line
-            self.indent_level += 1
-        elif line.startswith("}") or line.startswith(")"):
-            self.indent_level = max(0, self.indent_level - 1)
-            indented_line = self.indent_style * self.indent_level + line
+        scanned = self._scan(line)
+        if scanned.verbatim:
+            # Continuation of a multi-line string or comment is kept as written
+            self.indent_level = max(0, self.indent_level + scanned.depth_change)
+            return line.rstrip("\r\n")
+
+        code = self._apply_line_rules(scanned)
+        if not code and not scanned.comment:
+            return ""
+
+        if self.preserve_indent:
+            indent = scanned.indent.expandtabs(self.indent_size)
+            self.indent_level = len(indent) // self.indent_size
         else:
-            indented_line = self.indent_style * self.indent_level + line
+            level = max(0, self.indent_level - scanned.leading_closers)
+            indent = self.indent_style * level
+            self.indent_level = max(0, self.indent_level + scanned.depth_change)
 
-        return indented_line
+        return indent + (code + scanned.comment).strip()
 
+    def _apply_line_rules(self, scanned: ScannedLine) -> str:
+        """Hook for whole-line rules that need the finished scan, e.g. a missing colon."""
+        return scanned.code
 
-class JavaFormatter(LanguageFormatter):
-    """Formatter for Java code."""
+    def _scan(self, line: str) -> ScannedLine:
+        """Tokenize a line once, applying the spacing rules on the way."""
+        body = line.rstrip("\r\n")
+        parts = []
+        pos = 0
+        verbatim = False
 
-    def format_line(self, line: str) -> str:
-        """Format a single line of Java code."""
-        line = super().format_line(line)  # Apply base formatting first
-
-        # Add Java-specific formatting rules here:
-        # Example: Add a space after commas in argument lists
-        line = re.sub(r"(?<=\w),(?=\w)", ", ", line)
-
-        # Example: Ensure class, method, and if/else/for blocks are indented correctly
-        if line.endswith("{"):
-            indented_line = self.indent_style * self.indent_level + line
-            self.indent_level += 1
-        elif line.startswith("}"):
-            self.indent_level = max(0, self.indent_level - 1)
-            indented_line = self.indent_style * self.indent_level + line
-        elif (
-                line.startswith("if")
-                or line.startswith("else")
-                or line.startswith("for")
-                or line.startswith("while")
-        ):
-            indented_line = self.indent_style * self.indent_level + line
-            self.indent_level += 1
+        if self._open_terminator:
+            end = body.find(self._open_terminator)
+            if end < 0:
+                return ScannedLine("", body, "", 0, 0, False, True)
+            pos = end + len(self._open_terminator)
+            parts.append(body[:pos])
+            self._open_terminator = None
+            verbatim = True
+            indent = ""
         else:
-            indented_line = self.indent_style * self.indent_level + line
+            indent = _INDENT.match(body).group()
+            pos = len(indent)
+
+        pending = ""
+        comment = ""
+        depth = 0
+        leading_closers = 0
+        code_seen = verbatim
+        skip_space = False
+        top_level_colon = False
+        length = len(body)
+
+        while pos < length:
+            match = self.tokens.match(body, pos)
+            kind = match.lastgroup
+            token = match.group()
+            pos = match.end()
+
+            if kind == "ws":
+                pending = "" if skip_space else token
+                continue
+            skip_space = False
+
+            if kind == "comment":
+                comment = pending + token
+                pending = ""
+                break
+
+            if kind in ("mlstart", "block"):
+                terminator = token if kind == "mlstart" else "*/"
+                end = body.find(terminator, pos)
+                if end < 0:
+                    parts.append(pending + body[match.start():])
+                    self._open_terminator = terminator
+                    break
+                token = body[match.start():end + len(terminator)]
+                pos = end + len(terminator)
+            elif kind == "open":
+                depth += 1
+            elif kind == "close":
+                if self.strip_before_close:
+                    pending = ""
+                if not code_seen:
+                    leading_closers += 1
+                depth -= 1
+            elif kind == "comma":
+                if self.comma_spacing and pos < length and not body[pos].isspace():
+                    token = ", "
+            elif kind == "op":
+                if ":" in token and depth == 0:
+                    top_level_colon = True
+                if token in self.spaced_operators:
+                    pending = ""
+                    token = f" {token} "
+                    skip_space = True
+
+            parts.append(pending + token)
+            pending = ""
+            code_seen = True
+
+        return ScannedLine(indent, "".join(parts).strip(), comment, depth, leading_closers,
+                           top_level_colon, verbatim)
 
-        return indented_line
+    def _opens_block(self, scanned: ScannedLine) -> bool:
+        """Return True if the editor indents the line following this one."""
+        return scanned.code.endswith(self.block_openers)
+
+    def _closes_block(self, scanned: ScannedLine) -> bool:
+        """Return True if the editor dedents this line once its first character is typed."""
+        return scanned.code.startswith(self.electric_closers)
+
+    def reset_editor_indent(self):
+        """Forget the modelled editor state, e.g. when typing into a fresh buffer."""
+        self.editor_indent = 0
+        self._open_terminator = None
+
+    def plan_indentation(self, line: str) -> Tuple[int, int]:
+        """Plan the keystrokes needed to indent a line in an auto-indenting editor.
+
+        After Enter, editors such as IntelliJ or Sublime Text already place the caret
+        at the indentation of the previous line (one level deeper after a block opener).
+        Only the difference to the wanted indentation has to be typed.
+
+        Args:
+            line: The line as it should appear in the editor, including leading whitespace
+
+        Returns:
+            Tuple of (backspaces, spaces): backspaces remove one indent level each,
+            spaces are typed afterwards to reach the wanted column.
+        """
+        expanded = line.expandtabs(self.indent_size)
+        stripped = expanded.lstrip()
+        if not stripped:
+            # Blank lines keep the editor's indentation for the next line
+            return 0, 0
+
+        scanned = self._scan(expanded)
+        opens = self._opens_block(scanned)
+
+        if not scanned.verbatim and self._closes_block(scanned):
+            # The editor moves the closer to the enclosing block itself
+            indent = self._previous_tab_stop(self.editor_indent)
+            self.editor_indent = indent + (self.indent_size if opens else 0)
+            return 0, 0
+
+        target = len(expanded) - len(stripped)
+        current = self.editor_indent
+        backspaces = 0
+        while current > target:
+            current = self._previous_tab_stop(current)
+            backspaces += 1
+
+        self.editor_indent = target + (self.indent_size if opens else 0)
+        return backspaces, target - current
+
+    def _previous_tab_stop(self, column: int) -> int:
+        """Return the column a single backspace in auto-indented whitespace moves to."""
+        if column <= 0:
+            return 0
+        return ((column - 1) // self.indent_size) * self.indent_size
+
+
+class JavaFormatter(LanguageFormatter):
+    """Formatter for Java code."""
+
+    tokens = JAVA_TOKENS
+    comma_spacing = True
 
 
 class PythonFormatter(LanguageFormatter):
     """Formatter for Python code."""
 
-    def format_line(self, line: str) -> str:
-        """Format a single line of Python code."""
-        line = super().format_line(line)  # Apply base formatting first
+    tokens = PYTHON_TOKENS
+    preserve_indent = True
+    block_openers = (":", "{", "(", "[")
+    block_keywords = frozenset(
+        ("if", "elif", "else", "for", "while", "try", "except", "finally", "def", "class")
+    )
 
-        # Add Python-specific formatting rules here:
-        # Example: Ensure colons are at the end of if/else/for/def lines
-        if re.match(
-                r"^(if|elif|else|for|while|try|except|finally|def|class)\b.*[^:]$", line
+    def _apply_line_rules(self, scanned: ScannedLine) -> str:
+        """Ensure colons are at the end of if/else/for/def lines."""
+        code = scanned.code
+        word = _LEADING_WORD.match(code)
+        if (
+                word
+                and word.group() in self.block_keywords
+                and scanned.depth_change == 0
+                and not scanned.top_level_colon
+                and not code.endswith("\\")
+                and self._open_terminator is None
         ):
-            line = line + ":"
-
-        return line
+            return code + ":"
+        return code
 
 
 class PHPFormatter(LanguageFormatter):
     """Formatter for PHP code."""
 
-    def format_line(self, line: str) -> str:
-        """Format a single line of PHP code."""
-        line = super().format_line(line)
-
-        # Add PHP-specific formatting rules here:
-        # Example: Add spaces around operators
-        line = re.sub(r"(\s*)(=|!=|==|<=|>=|<|>|\+|-|\*|\/|%|&&|\|\|)(\s*)", r" \1 ", line)
-
-        # Example: Add spaces after commas
-        line = re.sub(r"(,)(?=\S)", r"$1 ", line)
-
-        # Example: Remove spaces before closing parenthesis
-        line = re.sub(r"\s+\)", ")", line)
-
-        # Ensure class, method, and if/else/for blocks are indented correctly
-        if line.endswith("{"):
-            indented_line = self.indent_style * self.indent_level + line
-            self.indent_level += 1
-        elif line.startswith("}"):
-            self.indent_level = max(0, self.indent_level - 1)
-            indented_line = self.indent_style * self.indent_level + line
-        elif (
-                line.startswith("if")
-                or line.startswith("else")
-                or line.startswith("elseif")
-                or line.startswith("for")
-                or line.startswith("foreach")
-                or line.startswith("while")
-                or line.startswith("function")
-        ):
-            indented_line = self.indent_style * self.indent_level + line
-            self.indent_level += 1
-        else:
-            indented_line = self.indent_style * self.indent_level + line
+    tokens = PHP_TOKENS
+    comma_spacing = True
+    strip_before_close = True
+    # Unary and member operators such as -, ++ or -> are left untouched
+    spaced_operators = frozenset((
+        "=", "==", "===", "!=", "!==", "<>", "<=", ">=", "<=>", "&&", "||", "??",
+        "+=", "-=", "*=", "/=", ".=", "%=", "??=", "=>",
+    ))
+
+
+class YAMLFormatter(LanguageFormatter):
+    """Formatter for YAML documents; indentation is structural and kept as written."""
 
-        return indented_line
+    tokens = YAML_TOKENS
+    preserve_indent = True
+    block_openers = (":", "{", "[")
 
 
 # Add more formatters for other languages (e.g., CppFormatter, JavaScriptFormatter, etc.)
@@ -135,9 +315,11 @@ class FormatterFactory:
             return PythonFormatter(indent_size)
         elif language == "php":
             return PHPFormatter(indent_size)
+        elif language == "yaml":
+            return YAMLFormatter(indent_size)
         # Add cases for other languages here
         else:
             logger.warning(
                 f"No specific formatter found for {language}. Using default formatter."
             )
-            return LanguageFormatter(indent_size)
\ No newline at end of file
+            return LanguageFormatter(indent_size)
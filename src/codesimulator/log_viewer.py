@@ -0,0 +1,341 @@
+"""
+Reading the rotated log files without loading them.
+
+Queries memory-map the files of a rotation set (codesimulator.log,
+codesimulator.log.1, ...) and run the record pattern over the mapping, so
+only matching records become Python strings. A sparse index of timestamps
+and offsets lets time-bounded queries skip the older part of each file,
+and LogFollower polls for records appended since the last call, across
+rotations.
+"""
+import bisect
+import mmap
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+from .logging_config import logger
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Bytes between entries of the sparse timestamp index
+INDEX_STRIDE = 64 * 1024
+
+# Bytes scanned per step when reading a file backwards
+SCAN_WINDOW = 256 * 1024
+
+# Seconds between polls of a followed log
+FOLLOW_INTERVAL = 0.5
+
+# Records start with the asctime of logging_config's formatter, which sorts as text
+_TIMESTAMP = rb"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}"
+_HEADER = re.compile(rb"^" + _TIMESTAMP, re.MULTILINE)
+
+
+class LogRecord(NamedTuple):
+    timestamp: str      # As written, e.g. "2026-10-19 16:45:07,015"
+    level: str
+    text: str           # The whole record, continuation lines such as tracebacks included
+    path: str
+    offset: int
+
+
+def levels_from(minimum: Optional[str]) -> Tuple[str, ...]:
+    """Levels at or above minimum; all levels for None or an unknown name."""
+    if minimum not in LEVELS:
+        return LEVELS
+    return LEVELS[LEVELS.index(minimum):]
+
+
+def record_pattern(levels: Sequence[str] = LEVELS) -> Pattern[bytes]:
+    """Pattern matching whole records of the given levels, header line and continuation lines."""
+    alternatives = b"|".join(re.escape(level.encode()) for level in levels)
+    return re.compile(
+        rb"^(" + _TIMESTAMP + rb") - [^\n]*? - (" + alternatives + rb") - [^\n]*"
+        rb"(?:\n(?!" + _TIMESTAMP + rb")[^\n]*)*",
+        re.MULTILINE)
+
+
+class LogFilter:
+    """The records a query shows: those at or above a level that contain a text."""
+
+    def __init__(self, minimum_level: Optional[str] = None, text: Optional[str] = None):
+        """
+        Initialize the filter.
+
+        Args:
+            minimum_level: Lowest level shown, or None for all
+            text: Case-insensitive text the record must contain, or None
+        """
+        self.levels = levels_from(minimum_level)
+        self.pattern = record_pattern(self.levels)
+        self.needle = text.lower() if text else None
+        # Searches that rule out a whole block before the record pattern runs over it
+        self._markers = [f" - {level} - ".encode() for level in self.levels] if self.levels != LEVELS else []
+        self._search = re.compile(re.escape(text.encode()), re.IGNORECASE) if text and text.isascii() else None
+
+    def _may_match(self, data, start: int, end: int) -> bool:
+        if self._markers and not any(data.find(marker, start, end) >= 0 for marker in self._markers):
+            return False
+        return self._search is None or self._search.search(data, start, end) is not None
+
+    def records(self, data, path: str, start: int = 0, end: Optional[int] = None, base: int = 0,
+                since: Optional[bytes] = None) -> List[LogRecord]:
+        """
+        Matching records in data[start:end], which must start at a line.
+
+        Args:
+            data: Log text, bytes or a mapping
+            path: File the text is from
+            start: Offset the search starts at
+            end: Offset the search ends at, the end of data by default
+            base: File offset of data[0]
+            since: Earliest timestamp shown, in the log's format
+
+        Returns:
+            List of LogRecord, oldest first
+        """
+        end = len(data) if end is None else end
+        if not self._may_match(data, start, end):
+            return []
+        records = []
+        for match in self.pattern.finditer(data, start, end):
+            if since and match.group(1) < since:
+                continue
+            text = match.group(0).decode("utf-8", errors="replace").rstrip("\n")
+            if self.needle and self.needle not in text.lower():
+                continue
+            records.append(LogRecord(match.group(1).decode(), match.group(2).decode(), text, path,
+                                     base + match.start()))
+        return records
+
+
+def rotation_set(path: str) -> List[str]:
+    """The log file and its rotated backups that exist, oldest first."""
+    directory, name = os.path.split(path)
+    backups = re.compile(re.escape(name) + r"\.(\d+)$")
+    try:
+        entries = os.listdir(directory or ".")
+    except OSError:
+        return []
+    numbered = sorted(((int(match.group(1)), entry) for entry in entries
+                       if (match := backups.match(entry))), reverse=True)
+    files = [os.path.join(directory, entry) for _, entry in numbered]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+class _Mapped:
+    """A read-only mapping of one file, closed on exit so rotation can rename it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        stat = os.fstat(self.file.fileno())
+        self.inode = stat.st_ino
+        self.size = stat.st_size
+        # Empty files cannot be mapped; an empty bytes object reads the same
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+        return False
+
+
+class LogReader:
+    """
+    Filtered queries over a rotation set.
+
+    Sparse indexes are kept per file between queries and only extended as
+    the file grows, so repeated queries cost the scan of what they return.
+    """
+
+    def __init__(self, path: str, stride: int = INDEX_STRIDE, window: int = SCAN_WINDOW):
+        """
+        Initialize the reader.
+
+        Args:
+            path: Current log file; backups are found next to it
+            stride: Bytes between entries of the timestamp index
+            window: Bytes scanned per step when reading backwards
+        """
+        self.path = path
+        self.stride = stride
+        self.window = window
+        # Per file: inode, bytes indexed and (timestamp, offset) entries
+        self._indexes: Dict[str, Tuple[int, int, List[Tuple[bytes, int]]]] = {}
+
+    def _index(self, mapped: _Mapped) -> List[Tuple[bytes, int]]:
+        inode, indexed, entries = self._indexes.get(mapped.path, (mapped.inode, 0, []))
+        if inode != mapped.inode or mapped.size < indexed:
+            # Rotated or truncated since the last query
+            indexed, entries = 0, []
+        position = indexed
+        while position < mapped.size:
+            header = _HEADER.search(mapped.data, position)
+            if header is None:
+                break
+            entries.append((header.group(0), header.start()))
+            position = max(header.end(), (header.start() // self.stride + 1) * self.stride)
+        self._indexes[mapped.path] = (mapped.inode, mapped.size, entries)
+        return entries
+
+    def _start_offset(self, mapped: _Mapped, since: Optional[str]) -> int:
+        """Offset before which no record is as recent as since."""
+        if since is None:
+            return 0
+        entries = self._index(mapped)
+        position = bisect.bisect_left(entries, (since.encode(), 0)) - 1
+        return entries[position][1] if position >= 0 else 0
+
+    def _file_tail(self, mapped: _Mapped, log_filter: LogFilter, limit: int,
+                   since: Optional[str]) -> List[LogRecord]:
+        floor = self._start_offset(mapped, since)
+        since_bytes = since.encode() if since else None
+        found: List[LogRecord] = []
+        end = mapped.size
+        while end > floor and len(found) < limit:
+            start = max(floor, end - self.window)
+            # Records starting inside the window end before the next window, since they end at a header
+            first = _HEADER.search(mapped.data, start, end) if start > floor else None
+            begin = first.start() if first else start
+            found[:0] = log_filter.records(mapped.data, mapped.path, begin, end, since=since_bytes)
+            end = begin
+        return found[-limit:]
+
+    def tail(self, limit: int = 200, log_filter: Optional[LogFilter] = None,
+             since: Optional[str] = None) -> List[LogRecord]:
+        """
+        The most recent matching records across the rotation set, oldest first.
+
+        Args:
+            limit: Most records returned
+            log_filter: Records shown, all by default
+            since: Earliest timestamp shown, in the log's format
+
+        Returns:
+            List of LogRecord
+        """
+        log_filter = log_filter or LogFilter()
+        records: List[LogRecord] = []
+        for path in reversed(rotation_set(self.path)):
+            try:
+                with _Mapped(path) as mapped:
+                    records[:0] = self._file_tail(mapped, log_filter, limit - len(records), since)
+            except OSError as e:
+                # Rotation may rename or remove a backup between listing and opening
+                logger.debug(f"Skipping log file {path}: {e}")
+                continue
+            if len(records) >= limit:
+                break
+        return records
+
+    def time_range(self) -> Optional[Tuple[str, str]]:
+        """Timestamps of the first and the last record of the rotation set, from the index."""
+        for path in rotation_set(self.path):
+            try:
+                with _Mapped(path) as mapped:
+                    entries = self._index(mapped)
+            except OSError as e:
+                logger.debug(f"Skipping log file {path}: {e}")
+                continue
+            if entries:
+                last = self.tail(1)
+                return entries[0][0].decode(), last[-1].timestamp if last else entries[0][0].decode()
+        return None
+
+
+class LogFollower:
+    """
+    Records appended to the log since the previous poll.
+
+    Polls the file size instead of using inotify, which the standard library
+    has no interface to. A changed inode means the handler rotated the file;
+    the rest of the old file is then read from its first backup. The last
+    record is held back while the file grows, since its traceback may still
+    be on the way.
+    """
+
+    def __init__(self, path: str, log_filter: Optional[LogFilter] = None):
+        """
+        Initialize the follower at the current end of the log.
+
+        Args:
+            path: Current log file
+            log_filter: Records reported, all by default
+        """
+        self.path = path
+        self.log_filter = log_filter or LogFilter()
+        self.inode: Optional[int] = None
+        self.offset = 0
+        self._pending = b""
+        self._pending_offset = 0
+        try:
+            stat = os.stat(path)
+            self.inode, self.offset = stat.st_ino, stat.st_size
+        except OSError:
+            pass
+
+    def _read(self, path: str, inode: Optional[int]) -> bytes:
+        """Complete lines after the offset, if path is still the file being followed."""
+        with open(path, "rb") as f:
+            if inode is not None and os.fstat(f.fileno()).st_ino != inode:
+                return b""
+            f.seek(self.offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+        return data[:end]
+
+    def _flush(self, path: str) -> List[LogRecord]:
+        records = self.log_filter.records(self._pending, path, base=self._pending_offset)
+        self._pending = b""
+        return records
+
+    def poll(self) -> List[LogRecord]:
+        """New matching records, oldest first."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return []
+        records: List[LogRecord] = []
+        if self.inode is not None and stat.st_ino != self.inode:
+            # The handler renamed the file to the first backup; finish reading it there
+            backup = f"{self.path}.1"
+            try:
+                self._pending += self._read(backup, self.inode)
+            except OSError as e:
+                logger.debug(f"Error reading rotated log file {backup}: {e}")
+            records += self._flush(backup)
+            self.offset = self._pending_offset = 0
+        elif stat.st_size < self.offset:
+            records += self._flush(self.path)
+            self.offset = self._pending_offset = 0
+        self.inode = stat.st_ino
+
+        if not self._pending:
+            self._pending_offset = self.offset
+        try:
+            new = self._read(self.path, stat.st_ino)
+        except OSError as e:
+            logger.debug(f"Error reading log file {self.path}: {e}")
+            new = b""
+        if not new:
+            # Nothing was appended since the last poll, so the held back record is complete
+            return records + self._flush(self.path)
+        # Hold the last record back until a later poll shows it complete
+        buffer = self._pending + new
+        last = None
+        for last in _HEADER.finditer(buffer):
+            pass
+        cut = last.start() if last else 0
+        records += self.log_filter.records(buffer, self.path, end=cut, base=self._pending_offset)
+        self._pending = buffer[cut:]
+        self._pending_offset += cut
+        return records
@@ -1,9 +1,5 @@
 import logging
 import logging.handlers
-import os
-import sys
-import tempfile
-import platform
 
 # Create a custom logger
 logger = logging.getLogger('codesimulator')
@@ -20,27 +16,6 @@ logger.addHandler(console_handler)
 _file_logging_initialized = False
 
 
-def get_log_path():
-    """Get a guaranteed writable log file path"""
-    try:
-        # For macOS (which is what you're using)
-        if platform.system() == "Darwin":
-            # This directory should always be writable for the current user on macOS
-            log_dir = os.path.join(os.path.expanduser('~'), 'Library', 'Logs', 'CodeSimulator')
-        else:
-            # For other platforms
-            log_dir = os.path.join(tempfile.gettempdir(), 'CodeSimulator', 'logs')
-
-        # Ensure directory exists
-        os.makedirs(log_dir, exist_ok=True)
-
-        # Return full path
-        return os.path.join(log_dir, 'codesimulator.log')
-    except Exception:
-        # Ultimate fallback - use temp directory
-        return os.path.join(tempfile.gettempdir(), 'codesimulator.log')
-
-
 def setup_file_logging():
     """Set up file logging"""
     global _file_logging_initialized
@@ -50,7 +25,8 @@ def setup_file_logging():
         return
 
     try:
-        # Get log path
+        # Imported here since path_utils logs through this module
+        from .path_utils import get_log_path
         log_file_path = get_log_path()
 
         # Create handler
@@ -72,7 +48,3 @@ def setup_file_logging():
     except Exception as e:
         # If file logging fails, log to console
         logger.error(f"Failed to set up file logging: {e}")
-
-
-# Initialize file logging at module import time
-setup_file_logging()
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""
+Prometheus text-format metrics for the simulator.
+
+Counters and histograms are fed from the telemetry bus; gauges read the
+simulator's components when the endpoint is scraped. The endpoint is an
+optional asyncio HTTP server bound to localhost:
+
+    curl http://127.0.0.1:9464/metrics
+"""
+import asyncio
+import bisect
+import math
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .logging_config import logger
+from .telemetry import KeysInjected, Mistake, Sink, Stall, Switched
+
+DEFAULT_PORT = 9464
+
+# Seconds between checks of event loop lag
+LAG_INTERVAL = 0.5
+
+# Bucket upper bounds in seconds
+KEY_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0)
+FOCUS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where it cannot be read."""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        import resource
+        # Peak rather than current size; ru_maxrss is in bytes on macOS
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, function: Optional[Callable[[], Optional[float]]] = None):
+        """
+        Initialize the metric.
+
+        Args:
+            name: Metric name
+            help: Description shown in the exposition
+            function: Called at scrape time for the value; None leaves it to set()
+        """
+        self.name = name
+        self.help = help
+        self.function = function
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def samples(self) -> List[str]:
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception as e:
+                logger.error(f"Error reading metric {self.name}: {e}")
+                value = None
+            if value is None:
+                return []
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Counter(Gauge):
+    """A total that only goes up; a function may read it from a component instead."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        # Observations per bucket, the last one above every bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self, namespace: str = "codesimulator"):
+        self.namespace = namespace
+        self._metrics: Dict[str, object] = {}
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, function: Optional[Callable[[], Optional[float]]] = None) -> Counter:
+        return self._add(Counter(f"{self.namespace}_{name}", help, function))
+
+    def gauge(self, name: str, help: str, function: Optional[Callable[[], Optional[float]]] = None) -> Gauge:
+        return self._add(Gauge(f"{self.namespace}_{name}", help, function))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float]) -> Histogram:
+        return self._add(Histogram(f"{self.namespace}_{name}", help, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class SimulatorMetrics(Sink):
+    """
+    The simulator's metrics.
+
+    Subscribed to the telemetry bus for keystrokes, mistakes, typing speed,
+    focus latency and stalls; switch counts, mouse totals, console size and
+    memory are read from the components when the endpoint is scraped.
+    """
+
+    kinds = frozenset({KeysInjected.kind, Mistake.kind, Switched.kind, Stall.kind})
+
+    def __init__(self, simulator, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize the metrics.
+
+        Args:
+            simulator: ActionSimulator whose components are read at scrape time
+            registry: Registry to add the metrics to
+        """
+        self.simulator = simulator
+        self.registry = registry or MetricsRegistry()
+        registry = self.registry
+        self.keystrokes = registry.counter("keystrokes_total", "Key events injected, mistakes included")
+        self.chars = registry.counter("typed_chars_total", "Characters of the source typed")
+        self.mistakes = registry.counter("mistakes_total", "Simulated typing mistakes")
+        self.chars_per_second = registry.gauge("chars_per_second", "Typing speed over the last typed line")
+        self.key_latency = registry.histogram(
+            "inter_key_latency_seconds", "Mean time between key events, per typed line", KEY_LATENCY_BUCKETS)
+        switcher = simulator.app_switcher
+        registry.counter("switches_attempted_total", "Application focus changes attempted",
+                         lambda: switcher.focus_stats["attempted"])
+        registry.counter("switches_succeeded_total", "Application focus changes that succeeded",
+                         lambda: switcher.focus_stats["succeeded"])
+        self.focus_latency = registry.histogram(
+            "focus_latency_seconds", "Time to focus an application", FOCUS_LATENCY_BUCKETS)
+        mouse = simulator.mouse_controller
+        registry.counter("mouse_moves_total", "Mouse glides completed", lambda: mouse.moves)
+        registry.counter("mouse_distance_pixels_total", "Distance glided by the mouse", lambda: mouse.distance)
+        self.stalls = registry.counter("stalls_total", "Actions that started late because the loop was busy")
+        self.loop_lag = registry.histogram(
+            "event_loop_lag_seconds", "Lateness of a periodic event loop wakeup", LOOP_LAG_BUCKETS)
+        registry.counter("telemetry_dropped_total", "Telemetry events dropped because the bus was full",
+                         lambda: simulator.telemetry.dropped)
+        registry.gauge("console_buffer_chars", "Characters held by the console",
+                       lambda: len(simulator.text_box.value or ""))
+        registry.gauge("resident_memory_bytes", "Resident set size of the simulator process", rss_bytes)
+
+    def handle(self, events):
+        for _, event in events:
+            if event.kind == KeysInjected.kind:
+                self.keystrokes.inc(event.events)
+                self.chars.inc(event.chars)
+                if event.seconds > 0:
+                    self.chars_per_second.set(event.chars / event.seconds)
+                if event.events:
+                    self.key_latency.observe(event.seconds / event.events)
+            elif event.kind == Mistake.kind:
+                self.mistakes.inc(event.count)
+            elif event.kind == Switched.kind:
+                self.focus_latency.observe(event.seconds)
+            elif event.kind == Stall.kind:
+                self.stalls.inc()
+
+    async def monitor_loop_lag(self, interval: float = LAG_INTERVAL, clock: Callable[[], float] = time.monotonic):
+        """Observe how late the event loop wakes up from a fixed sleep, until cancelled."""
+        while True:
+            started = clock()
+            await asyncio.sleep(interval)
+            self.loop_lag.observe(max(0.0, clock() - started - interval))
+
+
+class MetricsServer:
+    """Serves a registry over HTTP on localhost; GET /metrics only."""
+
+    def __init__(self, registry: MetricsRegistry, port: int = DEFAULT_PORT, host: str = "127.0.0.1"):
+        """
+        Initialize the server; it listens after start().
+
+        Args:
+            registry: Metrics to serve
+            port: TCP port, 0 for any free port
+            host: Address to bind; loopback so nothing is exposed to the network
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    async def start(self):
+        if self._server is not None:
+            return
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+
+    async def close(self):
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+        logger.info("Stopped metrics server")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5.0)
+            # Skip the headers
+            while (await asyncio.wait_for(reader.readline(), 5.0)).strip():
+                pass
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] in ("GET", "HEAD") and parts[1].split("?")[0] in ("/", "/metrics"):
+                status, body = "200 OK", self.registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+            head = (f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+            writer.write(head.encode() + (body if parts[:1] != ["HEAD"] else b""))
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            logger.debug(f"Metrics request failed: {e}")
+        except Exception as e:
+            logger.error(f"Error serving metrics: {e}")
+        finally:
+            writer.close()
@@ -1,84 +1,73 @@
-import asyncio
 import random
-import pyautogui
 from typing import Optional, Tuple
+from .input_backend import InputInjector
 from .logging_config import logger
+from .tracing import POINTER_TRACK, Tracer
 
 
 class MouseController:
-    """Handles random mouse movements independently of typing simulation."""
+    """Moves the mouse in small steps so movements never block the event loop."""
 
-    def __init__(self):
-        """Initialize the mouse controller."""
-        self.is_active = False
-        self.screen_width, self.screen_height = pyautogui.size()
-        self.movement_task: Optional[asyncio.Task] = None
-
-    async def start_random_movement(self,
-                                    min_interval: float = 5.0,
-                                    max_interval: float = 15.0,
-                                    excluded_zone: Optional[Tuple[int, int, int, int]] = None):
+    def __init__(self, injector: InputInjector, excluded_zone: Optional[Tuple[int, int, int, int]] = None,
+                 tracer: Optional[Tracer] = None):
         """
-        Start random mouse movement in background.
+        Initialize the mouse controller.
 
         Args:
-            min_interval: Minimum time between movements in seconds
-            max_interval: Maximum time between movements in seconds
+            injector: Rate-limited input backend shared with the typing simulation
             excluded_zone: Tuple of (x1, y1, x2, y2) defining area to avoid
+            tracer: Tracer recording each trajectory
         """
-        self.is_active = True
-
-        while self.is_active:
-            try:
-                # Generate random position
-                x = random.randint(0, self.screen_width)
-                y = random.randint(0, self.screen_height)
-
-                # Skip if in excluded zone
-                if excluded_zone:
-                    x1, y1, x2, y2 = excluded_zone
-                    if x1 <= x <= x2 and y1 <= y <= y2:
-                        continue
-
-                # Calculate smooth movement duration based on distance
-                current_x, current_y = pyautogui.position()
-                distance = ((x - current_x) ** 2 + (y - current_y) ** 2) ** 0.5
-                duration = min(2.0, distance / 1000)  # Cap at 2 seconds
+        self.injector = injector
+        self.excluded_zone = excluded_zone
+        self.tracer = tracer or Tracer()
+        # Totals since start, read by the metrics exporter
+        self.moves = 0
+        self.distance = 0.0
 
-                # Move mouse smoothly
-                pyautogui.moveTo(x, y, duration=duration)
-                logger.debug(f"Moved mouse to ({x}, {y})")
+    def random_target(self) -> Tuple[int, int]:
+        """Pick a random point on screen outside the excluded zone."""
+        screen_width, screen_height = self.injector.size()
+        while True:
+            x = random.randint(0, screen_width - 1)
+            y = random.randint(0, screen_height - 1)
+            if self.excluded_zone:
+                x1, y1, x2, y2 = self.excluded_zone
+                if x1 <= x <= x2 and y1 <= y <= y2:
+                    continue
+            return x, y
 
-                # Random wait before next movement
-                wait_time = random.uniform(min_interval, max_interval)
-                await asyncio.sleep(wait_time)
-
-            except Exception as e:
-                logger.error(f"Error in mouse movement: {e}")
-                await asyncio.sleep(1)  # Brief pause before retry
-
-    def start(self,
-              min_interval: float = 5.0,
-              max_interval: float = 15.0,
-              excluded_zone: Optional[Tuple[int, int, int, int]] = None):
+    async def glide_to(self, x: int, y: int, duration: float, step_interval: float = 0.02):
         """
-        Start mouse movement in background task.
+        Move the mouse to a point in small steps, yielding to the event loop between them.
 
         Args:
-            min_interval: Minimum time between movements
-            max_interval: Maximum time between movements
-            excluded_zone: Area to avoid (x1, y1, x2, y2)
+            x: Target x coordinate
+            y: Target y coordinate
+            duration: Total duration of the movement in seconds
+            step_interval: Seconds between steps
         """
-        if self.movement_task and not self.movement_task.done():
-            return
-
-        self.movement_task = asyncio.create_task(
-            self.start_random_movement(min_interval, max_interval, excluded_zone)
-        )
+        start_x, start_y = self.injector.position()
+        steps = max(1, int(duration / step_interval))
+        for step in range(1, steps + 1):
+            progress = step / steps
+            # Ease in and out like a hand would
+            eased = progress * progress * (3 - 2 * progress)
+            await self.injector.move_to(start_x + (x - start_x) * eased, start_y + (y - start_y) * eased)
+            if step < steps:
+                await self.injector.cancel_token.sleep(step_interval)
 
-    def stop(self):
-        """Stop random mouse movement."""
-        self.is_active = False
-        if self.movement_task:
-            self.movement_task.cancel()
-            self.movement_task = None
\ No newline at end of file
+    async def move_random(self):
+        """Glide to a random point, taking longer for longer distances."""
+        try:
+            x, y = self.random_target()
+            current_x, current_y = self.injector.position()
+            distance = ((x - current_x) ** 2 + (y - current_y) ** 2) ** 0.5
+            duration = min(2.0, distance / 1000)  # Cap at 2 seconds
+            with self.tracer.span("mouse_trajectory", POINTER_TRACK, distance=round(distance)):
+                await self.glide_to(x, y, duration)
+            self.moves += 1
+            self.distance += distance
+            logger.debug(f"Moved mouse to ({x}, {y})")
+        except Exception as e:
+            logger.error(f"Error in mouse movement: {e}")
@@ -2,6 +2,8 @@ import os
 import sys
 import tempfile
 import platform
+import threading
+from typing import Dict, Optional
 from .logging_config import logger
 
 
@@ -10,6 +12,128 @@ def is_packaged():
     return getattr(sys, 'frozen', False)
 
 
+def _resolve_resources(app=None) -> str:
+    """Locate the resources directory, working in both development and packaged environments."""
+    # First try to use Toga's paths if available
+    if app and hasattr(app, 'paths') and hasattr(app.paths, 'resources'):
+        return str(app.paths.resources)
+    if is_packaged():
+        # Packaged app - path depends on platform
+        if platform.system() == 'Darwin':  # macOS
+            return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(sys.executable))), 'Resources')
+        elif platform.system() == 'Windows':
+            return os.path.join(os.path.dirname(sys.executable), 'app', 'resources')
+        else:  # Linux and others
+            return os.path.join(os.path.dirname(sys.executable), 'resources')
+    # Development environment
+    return os.path.join(os.path.dirname(__file__), 'resources')
+
+
+def _resolve_cache_dir() -> str:
+    if platform.system() == "Darwin":
+        return os.path.join(os.path.expanduser('~'), 'Library', 'Caches', 'CodeSimulator')
+    elif platform.system() == "Windows":
+        return os.path.join(os.environ.get('LOCALAPPDATA', tempfile.gettempdir()), 'CodeSimulator', 'cache')
+    else:  # Linux and others
+        cache_home = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+        return os.path.join(cache_home, 'codesimulator')
+
+
+def _resolve_log_dir() -> str:
+    if platform.system() == "Darwin":
+        # This directory should always be writable for the current user on macOS
+        return os.path.join(os.path.expanduser('~'), 'Library', 'Logs', 'CodeSimulator')
+    elif platform.system() == "Windows":
+        return os.path.join(os.environ.get('APPDATA', tempfile.gettempdir()), 'CodeSimulator', 'logs')
+    else:  # Linux and others
+        return os.path.join(tempfile.gettempdir(), 'CodeSimulator', 'logs')
+
+
+def _writable_dir(path: str, fallback: str) -> str:
+    try:
+        os.makedirs(path, exist_ok=True)
+        return path
+    except OSError:
+        os.makedirs(fallback, exist_ok=True)
+        return fallback
+
+
+class ResolvedPaths:
+    """
+    Directories used by the app, resolved once.
+
+    Attributes are plain strings, so path lookups in loops cost nothing;
+    only cache subdirectories are created on first request.
+    """
+
+    __slots__ = ("resources", "code", "cache", "log_dir", "log_file", "from_app", "_cache_dirs")
+
+    def __init__(self, resources: str, cache: str, log_dir: str, from_app: bool = False):
+        """
+        Initialize the registry.
+
+        Args:
+            resources: Directory holding config.json and the code corpus
+            cache: Writable directory for caches and sidecar indexes
+            log_dir: Writable directory for the log file
+            from_app: True if resources came from the Toga app's paths
+        """
+        self.resources = resources
+        self.code = os.path.join(resources, 'code')
+        self.cache = cache
+        self.log_dir = log_dir
+        self.log_file = os.path.join(log_dir, 'codesimulator.log')
+        self.from_app = from_app
+        self._cache_dirs: Dict[tuple, str] = {}
+
+    @classmethod
+    def resolve(cls, app=None) -> "ResolvedPaths":
+        """Work out every directory for the current platform and packaging."""
+        fallback = os.path.join(tempfile.gettempdir(), 'CodeSimulator')
+        return cls(
+            resources=_resolve_resources(app),
+            cache=_writable_dir(_resolve_cache_dir(), os.path.join(fallback, 'cache')),
+            log_dir=_writable_dir(_resolve_log_dir(), os.path.join(fallback, 'logs')),
+            from_app=bool(app and hasattr(app, 'paths')),
+        )
+
+    def resource(self, *paths) -> str:
+        """Path below the resources directory."""
+        return os.path.join(self.resources, *paths)
+
+    def cache_dir(self, *paths) -> str:
+        """Cache subdirectory, created the first time it is requested."""
+        directory = self._cache_dirs.get(paths)
+        if directory is None:
+            directory = os.path.join(self.cache, *paths)
+            os.makedirs(directory, exist_ok=True)
+            self._cache_dirs[paths] = directory
+        return directory
+
+
+_paths: Optional[ResolvedPaths] = None
+_paths_lock = threading.Lock()
+
+
+def get_paths(app=None) -> ResolvedPaths:
+    """
+    Return the resolved paths, resolving them on first use.
+
+    Paths resolved before the Toga app existed are resolved again once an
+    app is passed, since the app knows the real resources directory.
+    """
+    global _paths
+    paths = _paths
+    if paths is None or (app is not None and not paths.from_app and hasattr(app, 'paths')):
+        with _paths_lock:
+            paths = _paths
+            if paths is None or (app is not None and not paths.from_app and hasattr(app, 'paths')):
+                paths = _paths = ResolvedPaths.resolve(app)
+                logger.debug(f"Resolved paths: resources={paths.resources}, cache={paths.cache}, "
+                             f"logs={paths.log_dir}")
+    return paths
+
+
 def get_resource_path(app=None, *paths):
     """
     Get the correct path to resource files, working in both development and packaged environments.
@@ -18,57 +142,22 @@ def get_resource_path(app=None, *paths):
         app: Optional Toga app instance
         *paths: Path components to join to the resource path
     """
-    try:
-        # First try to use Toga's paths if available
-        if app and hasattr(app, 'paths') and hasattr(app.paths, 'resources'):
-            base_path = app.paths.resources
-            logger.debug(f"Using Toga resource path: {base_path}")
-        else:
-            # Fallback based on environment
-            if is_packaged():
-                # Packaged app - path depends on platform
-                if platform.system() == 'Darwin':  # macOS
-                    base_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(sys.executable))),
-                                             'Resources')
-                elif platform.system() == 'Windows':
-                    base_path = os.path.join(os.path.dirname(sys.executable), 'app', 'resources')
-                else:  # Linux and others
-                    base_path = os.path.join(os.path.dirname(sys.executable), 'resources')
-                logger.debug(f"Using packaged resource path: {base_path}")
-            else:
-                # Development environment
-                base_path = os.path.join(os.path.dirname(__file__), 'resources')
-                logger.debug(f"Using development resource path: {base_path}")
-
-        full_path = os.path.join(base_path, *paths)
-        logger.debug(f"Full resource path: {full_path}")
-        return full_path
-    except Exception as e:
-        logger.error(f"Error getting resource path: {e}")
-        # Last resort fallback
-        return os.path.join(os.path.dirname(__file__), 'resources', *paths)
+    return get_paths(app).resource(*paths)
 
 
-def get_log_path():
-    """Returns a path suitable for log files."""
-    if is_packaged():
-        # Use system temp directory for packaged app
-        log_dir = tempfile.gettempdir()
-    else:
-        # Use resources directory in development
-        log_dir = os.path.join(os.path.dirname(__file__), 'resources')
+def get_cache_dir(*paths):
+    """Returns a writable directory for caches and sidecar indexes."""
+    return get_paths().cache_dir(*paths)
 
-    if not os.path.exists(log_dir):
-        try:
-            os.makedirs(log_dir)
-        except Exception:
-            pass
 
-    return os.path.join(log_dir, 'codesimulator.log')
+def get_log_path():
+    """Returns the path of the log file."""
+    return get_paths().log_file
 
 
 def log_environment_info():
     """Log detailed environment information for debugging."""
+    paths = get_paths()
     info = {
         "Platform": platform.system(),
         "Python Version": sys.version,
@@ -76,34 +165,10 @@ def log_environment_info():
         "Executable Path": sys.executable,
         "Current Directory": os.getcwd(),
         "Module Path": os.path.dirname(__file__),
-        "Resource Path Example": get_resource_path(None, 'config.json')
+        "Resource Path": paths.resources,
+        "Cache Path": paths.cache,
+        "Log File": paths.log_file,
     }
 
     for key, value in info.items():
         logger.info(f"{key}: {value}")
-
-
-def get_log_path():
-    """Returns a path suitable for log files."""
-    try:
-        if is_packaged():
-            # Use a more accessible location for packaged app
-            if platform.system() == "Windows":
-                log_dir = os.path.join(os.environ.get('APPDATA', os.path.expanduser("~")), "CodeSimulator", "logs")
-            elif platform.system() == "Darwin":  # macOS
-                log_dir = os.path.join(os.path.expanduser("~"), "Library", "Logs", "CodeSimulator")
-            else:  # Linux and others
-                log_dir = os.path.join(os.path.expanduser("~"), ".codesimulator", "logs")
-        else:
-            # Use resources directory in development
-            log_dir = os.path.join(os.path.dirname(__file__), 'resources')
-
-        # Create directory if it doesn't exist
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-
-        return os.path.join(log_dir, 'codesimulator.log')
-    except Exception as e:
-        # If all else fails, use system temp directory
-        import tempfile
-        return os.path.join(tempfile.gettempdir(), 'codesimulator.log')
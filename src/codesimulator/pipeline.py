@@ -0,0 +1,203 @@
+import asyncio
+from contextlib import suppress
+from typing import AsyncIterator, Callable, List, NamedTuple, Optional
+
+from .corpus_io import open_code_file
+from .language_formatter import LanguageFormatter
+
+# Lines read from disk per trip to the worker thread
+READ_BATCH_LINES = 32
+
+
+class SourceLine(NamedTuple):
+    """A line read from the typed stream."""
+    number: int
+    offset: int
+    text: str
+    next_offset: int
+
+
+class PlannedLine(NamedTuple):
+    """The keystrokes needed to type one line."""
+    number: int
+    offset: int
+    chunk: int
+    chunk_start: bool
+    backspaces: int
+    text: str
+    next_offset: int
+
+
+async def read_lines(file_path: str, start_offset: int = 0, start_line: int = 0) -> AsyncIterator[SourceLine]:
+    """
+    Stream the lines of a code file together with their byte offsets.
+
+    Reads happen in a worker thread in small batches, so decompression and disk
+    I/O never block the event loop and only one batch is held at a time.
+
+    Args:
+        file_path: Corpus path of the file
+        start_offset: Byte offset of the first line to read
+        start_line: Number of the line at start_offset
+    """
+    stream = await asyncio.to_thread(open_code_file, file_path)
+    try:
+        if start_offset:
+            await asyncio.to_thread(stream.seek, start_offset)
+        number, offset = start_line, start_offset
+        while True:
+            batch: List[bytes] = await asyncio.to_thread(_read_batch, stream)
+            if not batch:
+                break
+            for raw in batch:
+                text = raw.decode('utf-8', errors='replace').rstrip("\r\n")
+                yield SourceLine(number, offset, text, offset + len(raw))
+                number += 1
+                offset += len(raw)
+    finally:
+        stream.close()
+
+
+def replay_prefix(file_path: str, end_offset: int,
+                  formatter: Optional[LanguageFormatter] = None,
+                  indent_model: Optional[LanguageFormatter] = None):
+    """
+    Run the formatter and indent model over the lines before a resume point without typing them.
+
+    Both carry nesting state from line to line, so this puts them where an
+    uninterrupted run would be. Blocking; call it from a worker thread.
+    """
+    if not (formatter or indent_model) or end_offset <= 0:
+        return
+    with open_code_file(file_path) as stream:
+        offset = 0
+        while offset < end_offset:
+            raw = stream.readline()
+            if not raw:
+                break
+            offset += len(raw)
+            text = raw.decode('utf-8', errors='replace').rstrip("\r\n")
+            if formatter:
+                text = formatter.format_line(text)
+            if indent_model:
+                stripped = text.strip()
+                indent_model.plan_indentation(" " * (len(text) - len(text.lstrip())) + stripped if stripped else "")
+
+
+def _read_batch(stream) -> List[bytes]:
+    batch = []
+    for _ in range(READ_BATCH_LINES):
+        raw = stream.readline()
+        if not raw:
+            break
+        batch.append(raw)
+    return batch
+
+
+async def format_lines(lines: AsyncIterator[SourceLine],
+                       formatter: Optional[LanguageFormatter]) -> AsyncIterator[SourceLine]:
+    """Apply a formatter to each line; files read from the format cache pass through as they are."""
+    async for line in lines:
+        if formatter:
+            line = line._replace(text=formatter.format_line(line.text))
+        yield line
+
+
+async def plan_keystrokes(lines: AsyncIterator[SourceLine],
+                          chunk_size: Callable[[], int],
+                          indent_model: Optional[LanguageFormatter] = None) -> AsyncIterator[PlannedLine]:
+    """
+    Turn source lines into keystroke plans, grouped into chunks.
+
+    Args:
+        lines: Upstream stage
+        chunk_size: Called at every chunk boundary for the size of the next chunk;
+            a size of 0 ends the stream
+        indent_model: Formatter modelling the editor's auto-indent, if enabled
+    """
+    chunk, remaining = 0, chunk_size()
+    chunk_start = True
+    async for line in lines:
+        if remaining <= 0 and not chunk_start:
+            chunk, remaining = chunk + 1, chunk_size()
+            chunk_start = True
+        if remaining <= 0:
+            return
+
+        stripped = line.text.strip()
+        text = " " * (len(line.text) - len(line.text.lstrip())) + stripped if stripped else ""
+        backspaces = 0
+        if indent_model:
+            backspaces, spaces = indent_model.plan_indentation(text)
+            text = " " * spaces + stripped if stripped else ""
+
+        yield PlannedLine(line.number, line.offset, chunk, chunk_start, backspaces, text, line.next_offset)
+        chunk_start = False
+        remaining -= 1
+
+
+async def bounded(source: AsyncIterator, maxsize: int) -> AsyncIterator:
+    """
+    Run an upstream stage ahead of its consumer, holding at most maxsize items.
+
+    The upstream stage waits once the buffer is full, so a slow consumer applies
+    backpressure instead of letting items pile up. On close, a read the
+    upstream stage has in flight is waited for, not cancelled, so the stream
+    is never closed under a worker thread still reading from it.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+    finished = object()
+    closing = False
+
+    async def pump():
+        try:
+            async for item in source:
+                if closing:
+                    return
+                await queue.put((item, None))
+            if not closing:
+                await queue.put((finished, None))
+        except Exception as e:
+            if not closing:
+                await queue.put((finished, e))
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item, error = await queue.get()
+            if error:
+                raise error
+            if item is finished:
+                break
+            yield item
+    finally:
+        closing = True
+        # Make room for a put the pump may be waiting on; it stops at its next item
+        while not queue.empty():
+            queue.get_nowait()
+        await asyncio.gather(task, return_exceptions=True)
+        with suppress(Exception):
+            await source.aclose()
+
+
+def typing_pipeline(file_path: str,
+                    chunk_size: Callable[[], int],
+                    formatter: Optional[LanguageFormatter] = None,
+                    indent_model: Optional[LanguageFormatter] = None,
+                    read_ahead: int = 64,
+                    start_offset: int = 0,
+                    start_line: int = 0) -> AsyncIterator[PlannedLine]:
+    """
+    Chain the read, format and plan stages for one file.
+
+    Args:
+        file_path: Corpus path of the file to type
+        chunk_size: Called at every chunk boundary for the size of the next chunk
+        formatter: Formatter applied on the fly, or None for pre-formatted files
+        indent_model: Formatter modelling the editor's auto-indent, if enabled
+        read_ahead: Maximum number of lines buffered ahead of the typing
+        start_offset: Byte offset to resume reading from
+        start_line: Number of the line at start_offset
+    """
+    lines = bounded(read_lines(file_path, start_offset, start_line), read_ahead)
+    return plan_keystrokes(format_lines(lines, formatter), chunk_size, indent_model)
@@ -0,0 +1,207 @@
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .corpus import CorpusEntry
+from .logging_config import logger
+
+# Corpus entries looked at per plan, so planning stays cheap on large corpora
+PLAN_LOOKAHEAD = 1000
+
+
+class PlannedFile(NamedTuple):
+    path: str
+    estimated_seconds: float
+    lines: Optional[int]    # Lines typed of the file, or None for all of it
+
+
+class SessionPlanner:
+    """
+    Fits typing into a fixed time budget.
+
+    Chooses the files of the session from their estimated typing times: whole
+    files that fit in the time left are taken in corpus order, passing over
+    those that are too long, and when no whole file fits any more the first
+    file passed over fills the rest of the budget with a range of its lines.
+    Where that range ends, the progress journal picks the file up next time.
+    Chunks are sized from the per-line estimate of the current file and the
+    time left; estimates are corrected by a moving average of how long chunks
+    actually took compared to their estimate.
+    """
+
+    def __init__(self, budget_seconds: float, target_chunk_seconds: float = 120.0,
+                 min_chunk: int = 5, max_chunk: int = 200, smoothing: float = 0.3,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the planner.
+
+        Args:
+            budget_seconds: Total typing time of the session
+            target_chunk_seconds: Preferred duration of one chunk between pauses
+            min_chunk: Smallest chunk, unless less than that fits in the budget
+            max_chunk: Largest chunk
+            smoothing: Weight of the latest chunk in the drift average
+            clock: Monotonic time source
+        """
+        self.budget_seconds = budget_seconds
+        self.target_chunk_seconds = target_chunk_seconds
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.smoothing = smoothing
+        self.clock = clock
+        # Actual / estimated duration, averaged over the chunks typed so far
+        self.drift = 1.0
+        # True when the current file stopped at the end of its range or of the budget
+        self.cut_short = False
+        # True once no file of a non-empty corpus fits in the time left
+        self.out_of_files = False
+        self._started: Optional[float] = None
+        self._used: Set[str] = set()
+        self._ranges: Dict[str, int] = {}
+        self._seconds_per_line = 1.0
+        self._line_limit: Optional[int] = None
+        self._file_lines = 0
+        self._chunk_started: Optional[float] = None
+        self._chunk_lines = 0
+
+    def start(self):
+        """Start the session clock."""
+        self._started = self.clock()
+        logger.info(f"Session budget: {self.budget_seconds / 60:.1f} minutes")
+
+    @property
+    def remaining(self) -> float:
+        """Seconds left in the budget."""
+        if self._started is None:
+            return self.budget_seconds
+        return max(0.0, self.budget_seconds - (self.clock() - self._started))
+
+    @property
+    def expired(self) -> bool:
+        """True once the budget is used up or nothing fits in what is left of it."""
+        return self.out_of_files or self.remaining <= 0
+
+    def plan(self, entries: Iterable[CorpusEntry],
+             estimate: Callable[[CorpusEntry], Tuple[float, int]],
+             used: Optional[Set[str]] = None) -> List[PlannedFile]:
+        """
+        Choose the files that fill the remaining budget.
+
+        Args:
+            entries: Candidate files in the order they are preferred
+            estimate: Returns the estimated typing seconds and lines of a file
+            used: Paths left out, the files taken this session by default
+
+        Returns:
+            Files to type in order; only the last one may be a range of lines
+        """
+        used = self._used if used is None else used
+        left = self.remaining
+        planned: List[PlannedFile] = []
+        passed_over: Optional[Tuple[CorpusEntry, float, int]] = None
+        looked_at = 0
+        for entry in entries:
+            if entry.path in used:
+                continue
+            looked_at += 1
+            if looked_at > PLAN_LOOKAHEAD:
+                break
+            seconds, lines = estimate(entry)
+            seconds *= self.drift
+            if seconds <= left:
+                planned.append(PlannedFile(entry.path, seconds, None))
+                left -= seconds
+            elif passed_over is None:
+                passed_over = (entry, seconds, lines)
+            if passed_over and left < self.min_chunk * passed_over[1] / max(1, passed_over[2]):
+                break
+        if passed_over:
+            entry, seconds, lines = passed_over
+            range_lines = int(left / (seconds / max(1, lines)))
+            if range_lines >= self.min_chunk:
+                planned.append(PlannedFile(entry.path, left, range_lines))
+        return planned
+
+    def next_file(self, entries: Iterable[CorpusEntry],
+                  estimate: Callable[[CorpusEntry], Tuple[float, int]]) -> Optional[PlannedFile]:
+        """
+        Take the first file of a fresh plan; files are not repeated within a session.
+
+        Args:
+            entries: Candidate files in the order they are preferred
+            estimate: Returns the estimated typing seconds and lines of a file
+
+        Returns:
+            PlannedFile, or None when nothing fits in the time left
+        """
+        entries = list(entries)
+        if entries and all(entry.path in self._used for entry in entries):
+            # Every file was typed this session; start over rather than stop early
+            self._used.clear()
+        planned = self.peek_file(entries, estimate)
+        if planned is None:
+            self.out_of_files = bool(entries)
+            return None
+        self._used.add(planned.path)
+        if planned.lines is not None:
+            self._ranges[planned.path] = planned.lines
+        logger.info(f"Planned {planned.path} ({planned.estimated_seconds:.0f}s"
+                    f"{f', {planned.lines} lines' if planned.lines is not None else ''}, "
+                    f"{self.remaining:.0f}s left)")
+        return planned
+
+    def peek_file(self, entries: Iterable[CorpusEntry],
+                  estimate: Callable[[CorpusEntry], Tuple[float, int]]) -> Optional[PlannedFile]:
+        """The file next_file would return now, without taking it."""
+        entries = list(entries)
+        used = set(self._used)
+        if entries and all(entry.path in used for entry in entries):
+            # next_file starts over here
+            used.clear()
+        planned = self.plan(entries, estimate, used)
+        return planned[0] if planned else None
+
+    def begin_file(self, estimated_seconds: float, lines: int, path: Optional[str] = None):
+        """
+        Take the typing-time estimate of the next file.
+
+        Args:
+            estimated_seconds: Estimate for typing the whole file
+            lines: Number of lines in the file
+            path: Corpus path of the file, to apply its planned range
+        """
+        self._seconds_per_line = estimated_seconds / max(1, lines)
+        self._line_limit = self._ranges.pop(path, None)
+        self._file_lines = 0
+        self.cut_short = False
+        self._chunk_started = None
+        self._chunk_lines = 0
+
+    def line_typed(self):
+        """Count a typed line towards the running chunk."""
+        self._chunk_lines += 1
+        self._file_lines += 1
+
+    def chunk_size(self) -> int:
+        """
+        Return the number of lines to type before the next pause.
+
+        Called at every chunk boundary. Returns 0 once the budget or the
+        planned range of the file is used up.
+        """
+        now = self.clock()
+        if self._chunk_started is not None and self._chunk_lines:
+            expected = self._chunk_lines * self._seconds_per_line
+            ratio = (now - self._chunk_started) / expected if expected > 0 else 1.0
+            self.drift += self.smoothing * (ratio - self.drift)
+        self._chunk_started = now
+        self._chunk_lines = 0
+
+        seconds_per_line = self._seconds_per_line * self.drift
+        lines_left = int(self.remaining / seconds_per_line) if seconds_per_line > 0 else self.max_chunk
+        if self._line_limit is not None:
+            lines_left = min(lines_left, self._line_limit - self._file_lines)
+        preferred = round(self.target_chunk_seconds / seconds_per_line) if seconds_per_line > 0 else self.max_chunk
+        size = max(0, min(max(self.min_chunk, min(preferred, self.max_chunk)), lines_left))
+        self.cut_short = size == 0
+        logger.debug(f"Planned chunk of {size} lines ({self.remaining:.0f}s left, drift {self.drift:.2f})")
+        return size
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Callable, Dict, NamedTuple, Optional
+
+from .corpus_io import FileStats
+from .logging_config import logger
+
+
+class PreparedFile(NamedTuple):
+    """Everything needed to start typing a file, computed ahead of time."""
+    path: str
+    language: str
+    stats: FileStats
+    typed_path: str
+    preformatted: bool
+
+
+class FilePrefetcher:
+    """
+    Prepares upcoming corpus files in a worker thread.
+
+    While one file is being typed, the next one is read, counted and formatted
+    in the background, so the switch to it costs nothing on the event loop.
+    """
+
+    def __init__(self, prepare: Callable[[str], PreparedFile]):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            prepare: Blocking function that prepares a single file
+        """
+        self._prepare = prepare
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def prefetch(self, path: Optional[str]):
+        """Start preparing a file in the background, replacing any older prefetch."""
+        if not path or path in self._pending:
+            return
+        for stale in self._pending.values():
+            stale.cancel()
+        loop = asyncio.get_running_loop()
+        self._pending = {path: loop.run_in_executor(None, self._prepare, path)}
+        logger.debug(f"Prefetching {path}")
+
+    async def get(self, path: str) -> PreparedFile:
+        """Return the prepared file, waiting for a running prefetch or preparing it now."""
+        future = self._pending.pop(path, None)
+        if future is not None:
+            try:
+                return await future
+            except Exception as e:
+                logger.error(f"Prefetch of {path} failed, preparing again: {e}")
+        return await asyncio.to_thread(self._prepare, path)
+
+    def clear(self):
+        """Drop pending prefetches, e.g. when the simulation stops."""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending = {}
@@ -0,0 +1,239 @@
+"""
+On-demand profiling of the running simulator.
+
+A ProfileSession profiles the event loop thread, with cProfile or by
+sampling its stack, and diffs tracemalloc snapshots taken at start and
+stop. Reports are written next to the log file.
+"""
+import collections
+import io
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import TYPE_CHECKING, Callable, Counter, List, NamedTuple, Optional
+
+from .logging_config import logger
+
+# cProfile and pstats load with the first cProfile session
+if TYPE_CHECKING:
+    import cProfile
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+# Frames kept per allocation traceback
+TRACEMALLOC_FRAMES = 10
+
+
+class ProfileReport(NamedTuple):
+    path: str           # Text report
+    stats_path: str     # pstats file for cProfile, empty for sampling
+    summary: str        # Top entries, for the console
+
+
+def _frame_name(code) -> str:
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread from a background thread.
+
+    Unlike cProfile it adds no cost to the calls of the profiled thread,
+    only a short stop of the interpreter per sample.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        """
+        Initialize the profiler.
+
+        Args:
+            thread_id: threading.get_ident() of the thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = 0
+        # Samples with the function running, and with it on the stack
+        self.own: Counter[str] = collections.Counter()
+        self.total: Counter[str] = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Record the current stack of the sampled thread."""
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        self.samples += 1
+        self.own[_frame_name(frame.f_code)] += 1
+        seen = set()
+        while frame is not None:
+            name = _frame_name(frame.f_code)
+            # Recursion counts a function once per sample
+            if name not in seen:
+                seen.add(name)
+                self.total[name] += 1
+            frame = frame.f_back
+
+    def report(self, top: int) -> str:
+        if not self.samples:
+            return "No samples taken.\n"
+        lines = [f"{self.samples} samples every {self.interval * 1000:.0f}ms",
+                 f"{'own %':>7} {'total %':>8}  function"]
+        for name, own in self.own.most_common(top):
+            lines.append(f"{own / self.samples:7.1%} {self.total[name] / self.samples:8.1%}  {name}")
+        lines.append("")
+        lines.append("Most time on the stack:")
+        for name, total in self.total.most_common(top):
+            lines.append(f"{total / self.samples:8.1%}  {name}")
+        return "\n".join(lines) + "\n"
+
+
+class ProfileSession:
+    """
+    One profiling run over the live event loop.
+
+    start() and stop() must be called from the event loop thread, which is
+    the thread profiled; write_report() is blocking and may run anywhere.
+    """
+
+    def __init__(self, mode: str, report_dir: str, top: int = 20,
+                 interval: float = SAMPLE_INTERVAL, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the session.
+
+        Args:
+            mode: "sampling" or "cprofile"
+            report_dir: Directory the reports are written to
+            top: Entries listed per report section
+            interval: Seconds between samples in sampling mode
+            clock: Monotonic time source
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}, expected one of {', '.join(PROFILE_MODES)}")
+        self.mode = mode
+        self.report_dir = report_dir
+        self.top = top
+        self.interval = interval
+        self.clock = clock
+        self.started_at: Optional[float] = None
+        self.duration = 0.0
+        self._profile: Optional["cProfile.Profile"] = None
+        self._sampler: Optional[SamplingProfiler] = None
+        self._started_tracemalloc = False
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._memory_diff: List[tracemalloc.StatisticDiff] = []
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None
+
+    def start(self):
+        if self.running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        self._snapshot = tracemalloc.take_snapshot()
+        if self.mode == "cprofile":
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = SamplingProfiler(threading.get_ident(), self.interval)
+            self._sampler.start()
+        self.started_at = self.clock()
+        logger.info(f"Started {self.mode} profiling")
+
+    def stop(self):
+        """Stop collecting; the data is kept for write_report()."""
+        if not self.running:
+            return
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self.duration = self.clock() - self.started_at
+        self.started_at = None
+        snapshot = tracemalloc.take_snapshot()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        self._memory_diff = snapshot.filter_traces(filters).compare_to(
+            self._snapshot.filter_traces(filters), "lineno")
+        self._snapshot = None
+        logger.info(f"Stopped profiling after {self.duration:.1f}s")
+
+    def _cpu_report(self) -> str:
+        if self._sampler is not None:
+            return self._sampler.report(self.top)
+        import pstats
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+        return stream.getvalue()
+
+    def _memory_report(self) -> str:
+        lines = [f"{'change':>12} {'size':>12} {'blocks':>8}  location"]
+        for diff in self._memory_diff[:self.top]:
+            frame = diff.traceback[0]
+            lines.append(f"{diff.size_diff / 1024:+10.1f}KiB {diff.size / 1024:10.1f}KiB "
+                         f"{diff.count_diff:+8d}  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+    def _summary(self) -> str:
+        lines = [f"Profiled {self.duration:.1f}s ({self.mode})"]
+        top = min(self.top, 5)
+        if self._sampler is not None:
+            samples = max(1, self._sampler.samples)
+            lines += [f"  {own / samples:6.1%}  {name}" for name, own in self._sampler.own.most_common(top)]
+        else:
+            import pstats
+            stats = pstats.Stats(self._profile)
+            entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+            lines += [f"  {own_time * 1000:8.1f}ms  {name} ({os.path.basename(path)}:{line})"
+                      for (path, line, name), (_, _, own_time, _, _) in entries]
+        lines.append("Memory growth:")
+        lines += [f"  {diff.size_diff / 1024:+8.1f}KiB  {os.path.basename(diff.traceback[0].filename)}:"
+                  f"{diff.traceback[0].lineno}" for diff in self._memory_diff[:top]]
+        return "\n".join(lines) + "\n"
+
+    def write_report(self) -> ProfileReport:
+        """Write the report of a stopped session. Blocking."""
+        os.makedirs(self.report_dir, exist_ok=True)
+        base = os.path.join(self.report_dir, f"profile-{time.strftime('%Y%m%d-%H%M%S')}")
+        stats_path = ""
+        if self._profile is not None:
+            stats_path = base + ".prof"
+            self._profile.dump_stats(stats_path)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(f"Mode: {self.mode}\nDuration: {self.duration:.1f}s\n\n")
+            f.write("CPU\n===\n\n")
+            f.write(self._cpu_report())
+            f.write("\nMemory growth (tracemalloc)\n===========================\n\n")
+            f.write(self._memory_report())
+        logger.info(f"Profile report written to {base}.txt")
+        return ProfileReport(base + ".txt", stats_path, self._summary())
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .cancellation import CancellationToken
+from .logging_config import logger
+
+# Event classes and their (events per second, burst) limits
+DEFAULT_RATES: Dict[str, Tuple[float, int]] = {
+    "key": (40.0, 20),
+    "pointer": (60.0, 30),
+    "scroll": (5.0, 5),
+    "hotkey": (2.0, 2),
+    "focus": (0.5, 1),
+}
+
+# Cap on all injected events together
+DEFAULT_GLOBAL_RATE: Tuple[float, int] = (80.0, 40)
+
+
+class TokenBucket:
+    """Classic token bucket; thread-safe so blocking callers in worker threads can share it."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the bucket, full.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+            clock: Monotonic time source
+        """
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, count: int = 1) -> float:
+        """Seconds until count tokens are available; 0 if they are available now."""
+        with self._lock:
+            self._refill()
+            missing = min(count, self.burst) - self._tokens
+            return max(0.0, missing / self.rate)
+
+    def take(self, count: int = 1):
+        """Remove tokens; the bucket may go negative for events larger than the burst."""
+        with self._lock:
+            self._refill()
+            self._tokens -= count
+
+
+class InputRateLimiter:
+    """
+    Bounds the rate of injected input events per event class and overall.
+
+    Producers wait for tokens instead of having events dropped, so a burst from
+    overlapping sources turns into backpressure on those sources. Every wait is
+    counted per class for the throttling metrics.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, Tuple[float, int]]] = None,
+                 global_rate: Tuple[float, int] = DEFAULT_GLOBAL_RATE,
+                 clock: Callable[[], float] = time.monotonic,
+                 cancel_token: Optional[CancellationToken] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            rates: Event class -> (events per second, burst); defaults to DEFAULT_RATES
+            global_rate: (events per second, burst) over all classes
+            clock: Monotonic time source
+            cancel_token: Token that ends waits for tokens on stop
+        """
+        self.cancel_token = cancel_token or CancellationToken()
+        rates = rates or DEFAULT_RATES
+        self.buckets = {name: TokenBucket(rate, burst, clock) for name, (rate, burst) in rates.items()}
+        self.global_bucket = TokenBucket(*global_rate, clock)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._thread_lock = threading.Lock()
+        self.stats = {name: {"events": 0, "throttled": 0, "throttled_seconds": 0.0} for name in self.buckets}
+
+    def _wait_time(self, event_class: str, count: int) -> float:
+        return max(self.buckets[event_class].wait_time(count), self.global_bucket.wait_time(count))
+
+    def _take(self, event_class: str, count: int, waited: float):
+        self.buckets[event_class].take(count)
+        self.global_bucket.take(count)
+        stats = self.stats[event_class]
+        stats["events"] += count
+        if waited:
+            stats["throttled"] += 1
+            stats["throttled_seconds"] += waited
+
+    async def acquire(self, event_class: str, count: int = 1):
+        """
+        Wait until count events of a class may be injected.
+
+        Callers of the same class are served in order, so a throttled class
+        keeps its event order.
+        """
+        lock = self._locks.setdefault(event_class, asyncio.Lock())
+        async with lock:
+            waited = 0.0
+            while True:
+                with self._thread_lock:
+                    delay = self._wait_time(event_class, count)
+                    if delay <= 0:
+                        self._take(event_class, count, waited)
+                        return
+                waited += delay
+                await self.cancel_token.sleep(delay)
+
+    def acquire_blocking(self, event_class: str, count: int = 1):
+        """Blocking variant of acquire for synchronous callers such as AppSwitcher."""
+        waited = 0.0
+        while True:
+            with self._thread_lock:
+                delay = self._wait_time(event_class, count)
+                if delay <= 0:
+                    self._take(event_class, count, waited)
+                    return
+            waited += delay
+            self.cancel_token.wait(delay)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return a copy of the per-class event and throttling counters."""
+        return {name: dict(stats) for name, stats in self.stats.items()}
+
+    def log_summary(self):
+        """Log how often each event class was throttled."""
+        for name, stats in self.stats.items():
+            if stats["events"]:
+                logger.info(
+                    f"Input {name}: {stats['events']} events, throttled {stats['throttled']} times "
+                    f"for {stats['throttled_seconds']:.2f}s"
+                )
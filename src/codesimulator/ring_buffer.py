@@ -0,0 +1,131 @@
+import struct
+from multiprocessing import shared_memory
+from typing import Iterable, List, Optional, Tuple
+
+# One record: keycode, flags, delay in microseconds
+RECORD = struct.Struct("<IIQ")
+
+_INDEX = struct.Struct("<Q")
+
+# Header layout; head and tail sit on separate cache lines since different processes write them
+HEAD_OFFSET = 0       # Records ever pushed, written by the producer only
+CAPACITY_OFFSET = 8   # Fixed at creation
+TAIL_OFFSET = 64      # Records ever popped, written by the consumer only
+DATA_OFFSET = 128
+
+Record = Tuple[int, int, int]
+
+
+class SharedRingBuffer:
+    """
+    Fixed-size ring of packed records in shared memory, for one producer and one consumer.
+
+    Records are packed straight into the shared block, so nothing is pickled
+    or copied through a pipe. The producer only writes the head index and the
+    consumer only writes the tail index; a record is written before the head
+    that publishes it, so each side can run in its own process without a lock.
+    Only the creating process should unlink the block.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._buf = shm.buf
+        self.owner = owner
+        self.capacity = _INDEX.unpack_from(self._buf, CAPACITY_OFFSET)[0]
+        self._mask = self.capacity - 1
+
+    @classmethod
+    def create(cls, capacity: int = 4096) -> "SharedRingBuffer":
+        """
+        Allocate a new, empty ring.
+
+        Args:
+            capacity: Number of records; must be a power of two
+        """
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError(f"Ring capacity must be a power of two, got {capacity}")
+        shm = shared_memory.SharedMemory(create=True, size=DATA_OFFSET + capacity * RECORD.size)
+        shm.buf[:DATA_OFFSET] = bytes(DATA_OFFSET)
+        _INDEX.pack_into(shm.buf, CAPACITY_OFFSET, capacity)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedRingBuffer":
+        """Open a ring created by another process, such as the parent of a spawned worker."""
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def _head(self) -> int:
+        return _INDEX.unpack_from(self._buf, HEAD_OFFSET)[0]
+
+    def _tail(self) -> int:
+        return _INDEX.unpack_from(self._buf, TAIL_OFFSET)[0]
+
+    def __len__(self) -> int:
+        return self._head() - self._tail()
+
+    def free(self) -> int:
+        """Records that can be pushed before the ring is full."""
+        return self.capacity - len(self)
+
+    def push(self, keycode: int, flags: int, delay_us: int) -> bool:
+        """Append one record; returns False if the ring is full. Producer only."""
+        head = self._head()
+        if head - self._tail() >= self.capacity:
+            return False
+        RECORD.pack_into(self._buf, DATA_OFFSET + (head & self._mask) * RECORD.size, keycode, flags, delay_us)
+        _INDEX.pack_into(self._buf, HEAD_OFFSET, head + 1)
+        return True
+
+    def push_many(self, records: Iterable[Record]) -> int:
+        """
+        Append records until the ring is full, publishing them together. Producer only.
+
+        Returns:
+            Number of records pushed
+        """
+        head = start = self._head()
+        limit = self._tail() + self.capacity
+        for record in records:
+            if head >= limit:
+                break
+            RECORD.pack_into(self._buf, DATA_OFFSET + (head & self._mask) * RECORD.size, *record)
+            head += 1
+        _INDEX.pack_into(self._buf, HEAD_OFFSET, head)
+        return head - start
+
+    def pop(self) -> Optional[Record]:
+        """Remove the oldest record; None if the ring is empty. Consumer only."""
+        tail = self._tail()
+        if tail >= self._head():
+            return None
+        record = RECORD.unpack_from(self._buf, DATA_OFFSET + (tail & self._mask) * RECORD.size)
+        _INDEX.pack_into(self._buf, TAIL_OFFSET, tail + 1)
+        return record
+
+    def pop_many(self, limit: Optional[int] = None) -> List[Record]:
+        """Remove up to limit records (default: all available). Consumer only."""
+        tail = self._tail()
+        end = self._head()
+        if limit is not None:
+            end = min(end, tail + limit)
+        records = [RECORD.unpack_from(self._buf, DATA_OFFSET + (index & self._mask) * RECORD.size)
+                   for index in range(tail, end)]
+        _INDEX.pack_into(self._buf, TAIL_OFFSET, end)
+        return records
+
+    def skip(self, count: int) -> int:
+        """Drop up to count records without reading them. Consumer only."""
+        tail = self._tail()
+        end = min(self._head(), tail + count)
+        _INDEX.pack_into(self._buf, TAIL_OFFSET, end)
+        return end - tail
+
+    def close(self):
+        """Release this process's mapping; the creating process also frees the block."""
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
@@ -0,0 +1,258 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .cancellation import MAX_STOP_LATENCY
+from .logging_config import logger
+from .telemetry import Stall, TelemetryBus
+
+# Input devices a source can claim; sources sharing a device never fire at the same time
+KEYBOARD = "keyboard"
+POINTER = "pointer"
+FOCUS = "focus"
+
+# Delay before a source that raised is fired again
+ERROR_BACKOFF = 1.0
+
+# Seconds a source may start after its fire time before a stall is reported
+STALL_THRESHOLD = 0.5
+
+
+class ActionSource(ABC):
+    """
+    A stream of timed actions run by the ActionScheduler.
+
+    Each fire performs one short action and returns the delay until the next
+    one, or None when the source is exhausted.
+    """
+
+    def __init__(self, name: str, devices: Iterable[str], min_interval: float = 0.0, priority: int = 10):
+        """
+        Initialize the source.
+
+        Args:
+            name: Name used in logs
+            devices: Input devices held while the source fires
+            min_interval: Minimum seconds between the starts of two fires
+            priority: Lower values fire first when several sources are due
+        """
+        self.name = name
+        self.devices: FrozenSet[str] = frozenset(devices)
+        self.min_interval = min_interval
+        self.priority = priority
+        # Devices kept from one fire to the next, away from other sources
+        self.held: FrozenSet[str] = frozenset()
+
+    def first_delay(self) -> float:
+        """Seconds before the first fire."""
+        return 0.0
+
+    @abstractmethod
+    async def fire(self) -> Optional[float]:
+        """Perform one action and return the delay until the next, or None when exhausted."""
+
+    async def close(self):
+        """Release whatever the source holds; called when the scheduler stops."""
+
+
+class IntervalSource(ActionSource):
+    """Runs an action at random intervals."""
+
+    def __init__(self, name: str, devices: Iterable[str], action: Callable[[], Awaitable],
+                 interval: Tuple[float, float], min_interval: float = 0.0, priority: int = 10):
+        """
+        Initialize the source.
+
+        Args:
+            name: Name used in logs
+            devices: Input devices held while the action runs
+            action: Coroutine function performing one action
+            interval: (min, max) seconds between actions
+            min_interval: Minimum seconds between the starts of two actions
+            priority: Lower values fire first when several sources are due
+        """
+        super().__init__(name, devices, min_interval, priority)
+        self.action = action
+        self.interval = interval
+
+    def first_delay(self) -> float:
+        return random.uniform(*self.interval)
+
+    async def fire(self) -> Optional[float]:
+        await self.action()
+        return random.uniform(*self.interval)
+
+
+class TypingSource(ActionSource):
+    """
+    Types one step of the current file per fire.
+
+    Steps come from an async iterator of delays, such as
+    ActionSimulator.typing_steps; when one is exhausted the next is requested.
+    File devices are held from the first step of a file to its end, so that
+    sources claiming them only fire between files.
+    """
+
+    def __init__(self, next_steps: Callable[[], Awaitable[Optional[AsyncIterator[float]]]],
+                 devices: Iterable[str] = (KEYBOARD,), retry_delay: float = 2.0, priority: int = 0,
+                 file_devices: Iterable[str] = ()):
+        """
+        Initialize the source.
+
+        Args:
+            next_steps: Returns the steps of the next file, or None if there is none yet
+            devices: Input devices held while a step runs
+            retry_delay: Seconds to wait before asking again when there is no file
+            priority: Lower values fire first when several sources are due
+            file_devices: Input devices held for the whole of a file
+        """
+        super().__init__("typing", tuple(devices) + tuple(file_devices), priority=priority)
+        self.file_devices: FrozenSet[str] = frozenset(file_devices)
+        self.next_steps = next_steps
+        self.retry_delay = retry_delay
+        self._steps: Optional[AsyncIterator[float]] = None
+
+    async def fire(self) -> Optional[float]:
+        if self._steps is None:
+            self._steps = await self.next_steps()
+            if self._steps is None:
+                return self.retry_delay
+            self.held = self.file_devices
+        try:
+            return await self._steps.__anext__()
+        except StopAsyncIteration:
+            self._steps = None
+            self.held = frozenset()
+            return 0.0
+
+    async def close(self):
+        self.held = frozenset()
+        if self._steps is not None:
+            steps, self._steps = self._steps, None
+            await steps.aclose()
+
+
+class ActionScheduler:
+    """
+    Runs several action sources concurrently, ordered by their next fire time.
+
+    Due sources are kept in a heap. A source whose devices are held by a running
+    action, or kept by another source between its fires, waits until they are
+    released, so, for example, a window switch never lands in the middle of a
+    typed file while the pointer keeps moving.
+    """
+
+    def __init__(self, max_wait: float = MAX_STOP_LATENCY, clock: Callable[[], float] = time.monotonic,
+                 telemetry: Optional[TelemetryBus] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_wait: Longest sleep between checks of the run condition
+            clock: Monotonic time source
+            telemetry: Bus receiving a Stall event when a source starts late
+        """
+        self.max_wait = max_wait
+        self.clock = clock
+        self.telemetry = telemetry
+        self._heap: List[Tuple[float, int, int, ActionSource]] = []
+        self._sources: List[ActionSource] = []
+        self._last_start: Dict[ActionSource, float] = {}
+        self._busy: set = set()
+        self._sequence = itertools.count()
+
+    def add(self, source: ActionSource, delay: Optional[float] = None):
+        """Schedule a source, first firing after delay (default: the source's first_delay)."""
+        self._sources.append(source)
+        self._push(source, self.clock() + (source.first_delay() if delay is None else delay))
+
+    def _push(self, source: ActionSource, fire_at: float):
+        heapq.heappush(self._heap, (fire_at, source.priority, next(self._sequence), source))
+
+    async def run(self, should_continue: Callable[[], bool] = lambda: True):
+        """
+        Fire sources until should_continue returns False or all sources are exhausted.
+
+        Running actions are cancelled and every source is closed on the way out.
+        """
+        running: Dict[asyncio.Task, ActionSource] = {}
+        blocked: List[Tuple[float, int, int, ActionSource]] = []
+        # Sequence numbers of entries that waited for a device; their delay is not a stall
+        waited: set = set()
+        try:
+            while should_continue() and (self._heap or running):
+                now = self.clock()
+                while self._heap and self._heap[0][0] <= now:
+                    entry = heapq.heappop(self._heap)
+                    source = entry[3]
+                    if source.devices & self._claimed(source):
+                        blocked.append(entry)
+                        waited.add(entry[2])
+                        continue
+                    if entry[2] in waited:
+                        waited.discard(entry[2])
+                    elif self.telemetry and now - entry[0] > STALL_THRESHOLD:
+                        self.telemetry.publish(Stall(source.name, now - entry[0]))
+                    self._busy |= source.devices
+                    self._last_start[source] = now
+                    running[asyncio.create_task(source.fire())] = source
+
+                timeout = self.max_wait
+                if self._heap:
+                    timeout = min(timeout, max(0.0, self._heap[0][0] - now))
+                if running:
+                    done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    await asyncio.sleep(timeout)
+                    done = set()
+
+                for task in done:
+                    source = running.pop(task)
+                    self._busy -= source.devices
+                    await self._reschedule(source, task)
+
+                if done and blocked:
+                    # Devices were released; blocked sources compete again
+                    for entry in blocked:
+                        heapq.heappush(self._heap, entry)
+                    blocked = []
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            self._busy.clear()
+            for source in self._sources:
+                try:
+                    await source.close()
+                except Exception as e:
+                    logger.error(f"Error closing action source {source.name}: {e}")
+
+    def _claimed(self, source: ActionSource) -> set:
+        """Devices source cannot take now: those of running actions and those other sources hold."""
+        claimed = set(self._busy)
+        for other in self._sources:
+            if other is not source:
+                claimed |= other.held
+        return claimed
+
+    async def _reschedule(self, source: ActionSource, task: asyncio.Task):
+        if task.cancelled():
+            # Stopped through the cancellation token; run() exits on its next check
+            return
+        try:
+            delay = task.result()
+        except Exception as e:
+            logger.error(f"Error in action source {source.name}: {e}")
+            delay = ERROR_BACKOFF
+        if delay is None:
+            logger.debug(f"Action source {source.name} finished")
+            await source.close()
+            self._sources.remove(source)
+            return
+        fire_at = max(self.clock() + delay, self._last_start[source] + source.min_interval)
+        self._push(source, fire_at)
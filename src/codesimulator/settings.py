@@ -0,0 +1,310 @@
+import asyncio
+import decimal
+import json
+import numbers
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .corpus import SELECTION_MODES
+from .logging_config import logger
+
+# Seconds between checks of the configuration file for changes
+WATCH_INTERVAL = 1.0
+
+
+class ConfigError(ValueError):
+    """Raised when config.json holds a value the simulator cannot use."""
+
+
+def _number(section: str, key: str, value: Any, kind: type, low: float, high: float):
+    # bool is an int, and strings would parse; neither belongs in a number field.
+    # Decimal is what the settings view's number inputs return
+    if isinstance(value, bool) or not isinstance(value, (numbers.Real, decimal.Decimal)):
+        raise ConfigError(f"{section}.{key} must be a number, got {value!r}")
+    try:
+        number = kind(value)
+    except (ValueError, OverflowError):
+        raise ConfigError(f"{section}.{key} must be a finite number, got {value!r}")
+    if kind is int and number != value:
+        raise ConfigError(f"{section}.{key} must be a whole number, got {value!r}")
+    if not low <= number <= high:
+        raise ConfigError(f"{section}.{key} must be between {low} and {high}, got {number}")
+    return number
+
+
+def _switch(section: str, key: str, value: Any) -> bool:
+    if not isinstance(value, bool):
+        raise ConfigError(f"{section}.{key} must be true or false, got {value!r}")
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class CodeSettings:
+    language: str = "python"
+    indent_size: int = 4
+    max_line_length: int = 80
+    auto_indent: bool = False
+    format_code: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CodeSettings":
+        defaults = cls()
+        return cls(
+            language=str(data.get("language", defaults.language)),
+            indent_size=_number("code", "indent_size", data.get("indent_size", defaults.indent_size), int, 1, 16),
+            max_line_length=_number("code", "max_line_length",
+                                    data.get("max_line_length", defaults.max_line_length), int, 20, 1000),
+            auto_indent=_switch("code", "auto_indent", data.get("auto_indent", defaults.auto_indent)),
+            format_code=_switch("code", "format_code", data.get("format_code", defaults.format_code)),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CorpusSettings:
+    selection: str = "sequential"
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CorpusSettings":
+        defaults = cls()
+        selection = data.get("selection", defaults.selection)
+        if selection not in SELECTION_MODES:
+            raise ConfigError(f"corpus.selection must be one of {', '.join(SELECTION_MODES)}, got {selection!r}")
+        return cls(selection=selection)
+
+
+@dataclass(frozen=True, slots=True)
+class SessionSettings:
+    budget_minutes: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SessionSettings":
+        defaults = cls()
+        return cls(budget_minutes=_number("session", "budget_minutes",
+                                          data.get("budget_minutes", defaults.budget_minutes), int, 0, 1440))
+
+
+@dataclass(frozen=True, slots=True)
+class InjectionSettings:
+    use_worker_process: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "InjectionSettings":
+        defaults = cls()
+        return cls(use_worker_process=_switch("injection", "use_worker_process",
+                                              data.get("use_worker_process", defaults.use_worker_process)))
+
+
+@dataclass(frozen=True, slots=True)
+class MetricsSettings:
+    enabled: bool = False
+    port: int = 9464
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MetricsSettings":
+        defaults = cls()
+        return cls(
+            enabled=_switch("metrics", "enabled", data.get("enabled", defaults.enabled)),
+            port=_number("metrics", "port", data.get("port", defaults.port), int, 1, 65535),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TracingSettings:
+    enabled: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TracingSettings":
+        defaults = cls()
+        return cls(enabled=_switch("tracing", "enabled", data.get("enabled", defaults.enabled)))
+
+
+@dataclass(frozen=True, slots=True)
+class WatchdogSettings:
+    enabled: bool = False
+    max_growth_mb: float = 256.0
+    interval_seconds: float = 300.0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "WatchdogSettings":
+        defaults = cls()
+        return cls(
+            enabled=_switch("watchdog", "enabled", data.get("enabled", defaults.enabled)),
+            max_growth_mb=_number("watchdog", "max_growth_mb",
+                                  data.get("max_growth_mb", defaults.max_growth_mb), float, 1.0, 65536.0),
+            interval_seconds=_number("watchdog", "interval_seconds",
+                                     data.get("interval_seconds", defaults.interval_seconds), float, 1.0, 86400.0),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TypingSpeed:
+    min: float = 0.03
+    max: float = 0.07
+    line_break: Tuple[float, float] = (0.5, 1.0)
+    mistake_rate: float = 0.07
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TypingSpeed":
+        defaults = cls()
+        low = _number("typing_speed", "min", data.get("min", defaults.min), float, 0.0, 10.0)
+        high = _number("typing_speed", "max", data.get("max", defaults.max), float, 0.0, 10.0)
+        if low > high:
+            raise ConfigError(f"typing_speed.min ({low}) is greater than typing_speed.max ({high})")
+        line_break = data.get("line_break", defaults.line_break)
+        if not isinstance(line_break, (list, tuple)) or len(line_break) != 2:
+            raise ConfigError(f"typing_speed.line_break must be [min, max], got {line_break!r}")
+        line_break = tuple(_number("typing_speed", "line_break", value, float, 0.0, 60.0) for value in line_break)
+        if line_break[0] > line_break[1]:
+            raise ConfigError(f"typing_speed.line_break must be [min, max], got {list(line_break)}")
+        return cls(
+            min=low,
+            max=high,
+            line_break=line_break,
+            mistake_rate=_number("typing_speed", "mistake_rate",
+                                 data.get("mistake_rate", defaults.mistake_rate), float, 0.0, 1.0),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class SimulatorConfig:
+    """
+    Validated contents of config.json.
+
+    Instances are immutable, so a reload replaces the whole object and
+    readers never see a half-updated configuration.
+    """
+    code: CodeSettings = field(default_factory=CodeSettings)
+    corpus: CorpusSettings = field(default_factory=CorpusSettings)
+    session: SessionSettings = field(default_factory=SessionSettings)
+    injection: InjectionSettings = field(default_factory=InjectionSettings)
+    metrics: MetricsSettings = field(default_factory=MetricsSettings)
+    tracing: TracingSettings = field(default_factory=TracingSettings)
+    watchdog: WatchdogSettings = field(default_factory=WatchdogSettings)
+    typing_speed: TypingSpeed = field(default_factory=TypingSpeed)
+    # Top-level sections this version does not know, kept so saving does not drop them
+    extra: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SimulatorConfig":
+        """
+        Build and validate a configuration from parsed JSON.
+
+        Raises:
+            ConfigError: If a value has the wrong type or is out of range
+        """
+        sections = {
+            "code": CodeSettings, "corpus": CorpusSettings, "session": SessionSettings,
+            "injection": InjectionSettings, "metrics": MetricsSettings, "tracing": TracingSettings,
+            "watchdog": WatchdogSettings, "typing_speed": TypingSpeed,
+        }
+        values = {}
+        for name, section in sections.items():
+            section_data = data.get(name, {})
+            if not isinstance(section_data, dict):
+                raise ConfigError(f"{name} must be an object, got {section_data!r}")
+            values[name] = section.from_dict(section_data)
+        extra = {key: value for key, value in data.items() if key not in sections}
+        return cls(extra=extra, **values)
+
+    def to_dict(self) -> Dict:
+        """Plain dictionary in the layout of config.json."""
+        data = {name: asdict(getattr(self, name))
+                for name in ("code", "corpus", "session", "injection", "metrics", "tracing", "watchdog",
+                             "typing_speed")}
+        data["typing_speed"]["line_break"] = list(self.typing_speed.line_break)
+        data.update(self.extra)
+        return data
+
+
+class ConfigStore:
+    """
+    Owns config.json: loads and validates it once, and shares the result.
+
+    Components read store.config whenever they need a value; a reload or
+    save swaps in a new immutable SimulatorConfig, so a change is picked up
+    by the next read without anyone parsing the file again. An invalid file
+    is reported and the previous configuration stays in effect.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the store and load the file.
+
+        Args:
+            path: Path of config.json
+        """
+        self.path = path
+        self.config = SimulatorConfig()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._listeners = []
+        self.load()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self) -> bool:
+        """
+        Read and validate the file, swapping in the result.
+
+        Returns:
+            True if a new configuration is in effect
+        """
+        signature = self._stat()
+        try:
+            with open(self.path, 'r') as f:
+                config = SimulatorConfig.from_dict(json.load(f))
+        except Exception as e:
+            logger.error(f"Error loading config from {self.path}, keeping the current settings: {e}")
+            # Do not retry until the file changes again
+            self._signature = signature
+            return False
+        self._signature = signature
+        self._swap(config)
+        logger.info("Successfully loaded configuration")
+        return True
+
+    def reload_if_changed(self) -> bool:
+        """Reload the file if its mtime or size changed; a stat call otherwise."""
+        if self._stat() == self._signature:
+            return False
+        logger.info(f"Configuration file changed, reloading {self.path}")
+        return self.load()
+
+    def save(self, config: SimulatorConfig):
+        """Write a configuration atomically and put it into effect."""
+        directory = os.path.dirname(self.path) or "."
+        fd, temp_path = tempfile.mkstemp(prefix=".config-", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(config.to_dict(), f, indent=4)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._signature = self._stat()
+        self._swap(config)
+
+    def subscribe(self, listener: Callable[[SimulatorConfig], None]):
+        """Call listener with every configuration that is put into effect."""
+        self._listeners.append(listener)
+
+    def _swap(self, config: SimulatorConfig):
+        self.config = config
+        for listener in self._listeners:
+            try:
+                listener(config)
+            except Exception as e:
+                logger.error(f"Error applying configuration: {e}")
+
+    async def watch(self, interval: float = WATCH_INTERVAL):
+        """Poll the file for changes until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            self.reload_if_changed()
@@ -0,0 +1,296 @@
+"""
+Memory soak test of the full simulation loop.
+
+Runs the hybrid simulation against a null input backend on an event loop
+with a virtual clock, so a day of simulated typing, switching and mouse
+movement takes minutes, and fails if memory keeps growing once warmed up:
+
+    python -m codesimulator.soak --hours 24 --max-growth-mb 16
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import selectors
+import sys
+import tempfile
+import tracemalloc
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .actions import ActionSimulator
+from .app_switcher import AppSwitcher
+from .input_backend import DEFAULT_PAUSE
+from .logging_config import logger
+from .metrics import rss_bytes
+from .path_utils import ResolvedPaths, get_paths
+from .scheduler import ActionScheduler
+from .settings import SimulatorConfig
+from .telemetry import ConsoleSink
+from .watchdog import MemoryGuard
+
+# Simulated seconds between memory samples
+SAMPLE_INTERVAL = 600.0
+
+DEFAULT_MAX_GROWTH_MB = 16.0
+
+
+class _VirtualSelector:
+    """Selector that polls instead of blocking and advances the virtual clock by the timeout."""
+
+    def __init__(self, selector: selectors.BaseSelector):
+        self._selector = selector
+        self.now = 0.0
+
+    def select(self, timeout: Optional[float] = None):
+        if timeout is None:
+            # Nothing is scheduled; only I/O, such as a finished worker thread, can wake the loop
+            return self._selector.select(None)
+        events = self._selector.select(0)
+        if not events and timeout > 0:
+            self.now += timeout
+        return events
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop whose clock only moves when the loop would otherwise wait.
+
+    Sleeps and timeouts complete immediately in real time, so components
+    that take their clock from loop.time run hours of timers in seconds.
+    """
+
+    def __init__(self):
+        self._virtual = _VirtualSelector(selectors.DefaultSelector())
+        super().__init__(self._virtual)
+
+    def time(self) -> float:
+        return self._virtual.now
+
+
+class NullBackend:
+    """Input backend with pyautogui's interface that only counts events."""
+
+    PAUSE = DEFAULT_PAUSE
+
+    def __init__(self, size: Tuple[int, int] = (1920, 1080)):
+        self.events = 0
+        self._size = size
+        self._position = (0, 0)
+
+    def press(self, key: str, _pause: bool = True):
+        self.events += 1
+
+    def write(self, text: str, _pause: bool = True):
+        self.events += len(text)
+
+    def hotkey(self, *keys: str, _pause: bool = True):
+        self.events += 1
+
+    def moveTo(self, x: float, y: float, _pause: bool = True):
+        self._position = (int(x), int(y))
+        self.events += 1
+
+    def click(self, button: str = "left", _pause: bool = True):
+        self.events += 1
+
+    def scroll(self, amount: int, _pause: bool = True):
+        self.events += 1
+
+    def position(self) -> Tuple[int, int]:
+        return self._position
+
+    def size(self) -> Tuple[int, int]:
+        return self._size
+
+
+class NullAppSwitcher(AppSwitcher):
+    """AppSwitcher that pretends a fixed set of applications is running and always focuses them."""
+
+    def __init__(self, config, apps: Optional[List[Dict]] = None):
+        super().__init__(config)
+        self.apps = apps or [{"name": "Editor"}, {"name": "Terminal"}, {"name": "Browser"}]
+
+    def get_running_applications(self) -> List[Dict]:
+        return list(self.apps)
+
+    def focus_application(self, app_info: Dict) -> bool:
+        self.focus_stats["attempted"] += 1
+        self.focus_stats["succeeded"] += 1
+        return True
+
+
+class _Console:
+    value = ""
+
+
+class MemorySample(NamedTuple):
+    at: float               # Simulated seconds since the start
+    traced: int             # Bytes allocated through Python, from tracemalloc
+    rss: Optional[int]      # Resident set size in bytes
+
+
+class SoakReport(NamedTuple):
+    simulated_seconds: float
+    samples: List[MemorySample]
+    growth: int             # Steady-state growth of traced memory in bytes
+    violation: Optional[str]
+    top_growth: List[str]   # Allocation sites that grew most since the baseline
+    input_events: int
+    switches: int
+
+    @property
+    def passed(self) -> bool:
+        return self.violation is None
+
+    def format(self) -> str:
+        lines = [f"Simulated {self.simulated_seconds / 3600:.1f}h: {self.input_events} input events, "
+                 f"{self.switches} window switches"]
+        for sample in self.samples:
+            rss = f"{sample.rss / 2 ** 20:8.1f}MiB" if sample.rss else "       n/a"
+            lines.append(f"  {sample.at / 3600:6.2f}h  traced {sample.traced / 2 ** 20:8.2f}MiB  rss {rss}")
+        lines.append(f"Steady-state growth: {self.growth / 2 ** 20:+.2f}MiB")
+        if self.top_growth:
+            lines.append("Largest growth since the baseline:")
+            lines.extend(f"  {line}" for line in self.top_growth)
+        lines.append("PASSED" if self.passed else f"FAILED: {self.violation}")
+        return "\n".join(lines)
+
+
+async def _soak(simulator: ActionSimulator, duration: float, sample_interval: float,
+                guard: MemoryGuard) -> Tuple[List[MemorySample], Optional[str], List[str]]:
+    loop = asyncio.get_running_loop()
+    end = loop.time() + duration
+    samples: List[MemorySample] = []
+    violation: Optional[str] = None
+    baseline_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    async def next_steps():
+        path = await simulator.get_next_code_file()
+        if not path:
+            return None
+        prepared = await simulator.get_prepared_file(path)
+        await simulator.calculate_typing_time(path, prepared.stats)
+        return simulator.typing_steps(path, prepared)
+
+    async def sample_memory():
+        nonlocal violation, baseline_snapshot
+        while True:
+            await asyncio.sleep(sample_interval)
+            gc.collect()
+            traced = tracemalloc.get_traced_memory()[0]
+            samples.append(MemorySample(loop.time(), traced, rss_bytes()))
+            violation = violation or guard.add(traced)
+            if baseline_snapshot is None and guard.baseline is not None:
+                baseline_snapshot = tracemalloc.take_snapshot()
+
+    scheduler = ActionScheduler(clock=loop.time, telemetry=simulator.telemetry)
+    for source in simulator.create_sources(next_steps):
+        scheduler.add(source)
+    tasks = [asyncio.create_task(simulator.telemetry.run()), asyncio.create_task(sample_memory())]
+    try:
+        await scheduler.run(lambda: simulator.loop_flag and loop.time() < end)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    top_growth = []
+    if baseline_snapshot is not None:
+        gc.collect()
+        growing = [stat for stat in tracemalloc.take_snapshot().compare_to(baseline_snapshot, "lineno")
+                   if stat.size_diff > 0]
+        for stat in growing[:10]:
+            frame = stat.traceback[0]
+            top_growth.append(f"{stat.size_diff / 1024:+.1f}KiB at {frame.filename}:{frame.lineno}")
+    return samples, violation, top_growth
+
+
+def _soak_paths(work_dir: str, corpus_dir: Optional[str]) -> ResolvedPaths:
+    """
+    Paths that keep the run inside work_dir.
+
+    The default configuration is written there, so neither the packaged
+    config.json nor the user's format cache and progress journal affect it.
+    """
+    resources = os.path.join(work_dir, "resources")
+    os.makedirs(resources, exist_ok=True)
+    with open(os.path.join(resources, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(SimulatorConfig().to_dict(), f, indent=4)
+    paths = ResolvedPaths(resources, os.path.join(work_dir, "cache"), os.path.join(work_dir, "logs"))
+    paths.code = corpus_dir or get_paths().code
+    return paths
+
+
+def run_soak(duration: float = 24 * 3600, sample_interval: float = SAMPLE_INTERVAL,
+             max_growth_bytes: int = int(DEFAULT_MAX_GROWTH_MB * 2 ** 20),
+             work_dir: Optional[str] = None, corpus_dir: Optional[str] = None) -> SoakReport:
+    """
+    Run the hybrid simulation for a simulated duration and check its memory.
+
+    Args:
+        duration: Simulated seconds to run
+        sample_interval: Simulated seconds between memory samples
+        max_growth_bytes: Steady-state growth of traced memory that fails the run
+        work_dir: Directory for the configuration, caches and journal; a temporary one by default
+        corpus_dir: Code files to type; the packaged corpus by default
+
+    Returns:
+        SoakReport with the samples and the verdict
+    """
+    loop = VirtualTimeLoop()
+    asyncio.set_event_loop(loop)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    # Typed lines are logged at INFO; a day of them is not worth printing
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    backend = NullBackend()
+    try:
+        with tempfile.TemporaryDirectory(prefix="soak-") as temp_dir:
+            paths = _soak_paths(work_dir or temp_dir, corpus_dir)
+            simulator = ActionSimulator(_Console(), clock=loop.time, input_backend=backend, paths=paths)
+            simulator.app_switcher = NullAppSwitcher(simulator.app_config)
+            simulator.telemetry.subscribe(ConsoleSink(simulator.text_box))
+            simulator.simulation_mode = "Hybrid"
+            simulator.loop_flag = True
+            guard = MemoryGuard(max_growth_bytes)
+            samples, violation, top_growth = loop.run_until_complete(
+                _soak(simulator, duration, sample_interval, guard))
+            simulated = loop.time()
+            simulator.loop_flag = False
+            loop.run_until_complete(loop.shutdown_default_executor())
+            simulator.close()
+    finally:
+        logger.setLevel(level)
+        if started_tracing:
+            tracemalloc.stop()
+        asyncio.set_event_loop(None)
+        loop.close()
+    return SoakReport(simulated, samples, guard.growth, violation, top_growth, backend.events,
+                      simulator.app_switcher.focus_stats["succeeded"])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the simulation in virtual time and check for memory growth.")
+    parser.add_argument("--hours", type=float, default=24.0, help="Simulated hours to run")
+    parser.add_argument("--sample-minutes", type=float, default=SAMPLE_INTERVAL / 60,
+                        help="Simulated minutes between memory samples")
+    parser.add_argument("--max-growth-mb", type=float, default=DEFAULT_MAX_GROWTH_MB,
+                        help="Steady-state growth that fails the run")
+    parser.add_argument("--corpus", help="Directory of code files to type instead of the packaged corpus")
+    args = parser.parse_args(argv)
+
+    report = run_soak(args.hours * 3600, args.sample_minutes * 60, int(args.max_growth_mb * 2 ** 20),
+                      corpus_dir=args.corpus)
+    print(report.format())
+    return 0 if report.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
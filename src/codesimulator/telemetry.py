@@ -0,0 +1,266 @@
+import asyncio
+import collections
+import heapq
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Deque, List, NamedTuple, Optional, Tuple
+
+from .logging_config import logger
+
+# Events kept while no dispatcher drains the bus; older ones are dropped first
+DEFAULT_CAPACITY = 4096
+
+# Seconds between deliveries to the sinks
+DISPATCH_INTERVAL = 0.05
+
+# Characters kept in the console; older output is trimmed
+CONSOLE_MAX_CHARS = 100_000
+
+
+class ChunkStarted(NamedTuple):
+    kind = "chunk_started"
+    file: str
+    chunk: int
+    line: int
+
+
+class KeysInjected(NamedTuple):
+    """One typed line, injected as a batch."""
+    kind = "key_injected"
+    line: int
+    events: int
+    chars: int
+    seconds: float
+
+
+class Mistake(NamedTuple):
+    kind = "mistake"
+    line: int
+    count: int
+
+
+class Switched(NamedTuple):
+    kind = "switch"
+    app: str
+    seconds: float
+
+
+class FocusFailed(NamedTuple):
+    kind = "focus_failed"
+    app: str
+    reason: str
+
+
+class Stall(NamedTuple):
+    """An action started later than scheduled, for example because the event loop was blocked."""
+    kind = "stall"
+    source: str
+    seconds: float
+
+
+class Message(NamedTuple):
+    """Text for the console; replace clears the console first."""
+    kind = "message"
+    text: str
+    replace: bool = False
+
+
+class Status(NamedTuple):
+    """Text for the status line."""
+    kind = "status"
+    text: str
+
+
+# (monotonic time, event)
+Stamped = Tuple[float, NamedTuple]
+
+
+class Sink(ABC):
+    """Receives the events published on a TelemetryBus, in batches."""
+
+    # Event kinds the sink wants; None for all
+    kinds: Optional[frozenset] = None
+
+    @abstractmethod
+    def handle(self, events: List[Stamped]):
+        """Take a batch of events of the wanted kinds, oldest first."""
+
+
+class TelemetryBus:
+    """
+    In-process event bus between the simulation and its outputs.
+
+    publish only appends to a bounded deque, so it costs the same whatever
+    sinks are attached and never blocks the code being instrumented; when
+    the deque is full the oldest events are dropped and counted. Console
+    text and the status line are kept apart and never dropped: messages
+    queue without bound until one replaces the console, and only the latest
+    status is kept. A dispatcher task delivers the queued events to every
+    subscribed sink in batches, in publishing order, so adding an output
+    means adding a sink, not editing callers.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the bus.
+
+        Args:
+            capacity: Events kept until the next dispatch
+            clock: Monotonic time source used to stamp events
+        """
+        self.capacity = capacity
+        self.clock = clock
+        self.dropped = 0
+        self._queue: Deque[Stamped] = collections.deque(maxlen=capacity)
+        self._messages: List[Stamped] = []
+        self._status: Optional[Stamped] = None
+        self._console_lock = threading.Lock()
+        self._sinks: List[Sink] = []
+
+    def publish(self, event: NamedTuple):
+        """Queue an event; safe from any thread, never blocks on structured events."""
+        stamped = (self.clock(), event)
+        if event.kind == Message.kind:
+            with self._console_lock:
+                if event.replace:
+                    # The console is cleared anyway; text queued before it would never show
+                    self._messages.clear()
+                self._messages.append(stamped)
+        elif event.kind == Status.kind:
+            with self._console_lock:
+                self._status = stamped
+        else:
+            if len(self._queue) == self.capacity:
+                self.dropped += 1
+            self._queue.append(stamped)
+
+    def message(self, text: str, replace: bool = False):
+        """Queue console text."""
+        self.publish(Message(text, replace))
+
+    def status(self, text: str):
+        """Queue status line text."""
+        self.publish(Status(text))
+
+    def subscribe(self, sink: Sink):
+        self._sinks.append(sink)
+
+    def unsubscribe(self, sink: Sink):
+        if sink in self._sinks:
+            self._sinks.remove(sink)
+
+    def dispatch(self) -> int:
+        """
+        Deliver queued events to the sinks.
+
+        Returns:
+            Number of events delivered
+        """
+        structured = []
+        queue = self._queue
+        while queue:
+            structured.append(queue.popleft())
+        with self._console_lock:
+            messages, self._messages = self._messages, []
+            status, self._status = self._status, None
+        events = list(heapq.merge(structured, messages, [status] if status else [], key=lambda e: e[0]))
+        if not events:
+            return 0
+        for sink in self._sinks:
+            selected = events if sink.kinds is None else [e for e in events if e[1].kind in sink.kinds]
+            if not selected:
+                continue
+            try:
+                sink.handle(selected)
+            except Exception as e:
+                logger.error(f"Error in telemetry sink {type(sink).__name__}: {e}")
+        return len(events)
+
+    async def run(self, interval: float = DISPATCH_INTERVAL):
+        """Dispatch queued events periodically until cancelled."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                self.dispatch()
+        finally:
+            self.dispatch()
+
+
+def trim_console(text: str, max_chars: int = CONSOLE_MAX_CHARS) -> str:
+    """Drop the oldest console output above max_chars, cutting at a line break."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.find("\n", len(text) - max_chars)
+    return text[cut + 1:] if cut >= 0 else text[-max_chars:]
+
+
+class ConsoleSink(Sink):
+    """Writes console text and the status line, one widget update per batch."""
+
+    kinds = frozenset({Message.kind, Status.kind})
+
+    def __init__(self, text_box, status_label=None, max_chars: int = CONSOLE_MAX_CHARS):
+        """
+        Initialize the sink.
+
+        Args:
+            text_box: Multiline text widget receiving Message text
+            status_label: Label receiving Status text
+            max_chars: Console length above which the oldest output is trimmed
+        """
+        self.text_box = text_box
+        self.status_label = status_label
+        self.max_chars = max_chars
+
+    def handle(self, events: List[Stamped]):
+        text = None
+        status = None
+        for _, event in events:
+            if event.kind == Status.kind:
+                status = event.text
+            elif event.replace:
+                text = event.text
+            else:
+                text = (self.text_box.value if text is None else text) + event.text
+        if text is not None:
+            self.text_box.value = trim_console(text, self.max_chars)
+        if status is not None and self.status_label is not None:
+            self.status_label.text = status
+
+
+class LogSink(Sink):
+    """Logs structured events; console text is logged by its callers already."""
+
+    kinds = frozenset({ChunkStarted.kind, Switched.kind, FocusFailed.kind, Stall.kind})
+
+    def handle(self, events: List[Stamped]):
+        for _, event in events:
+            fields = " ".join(f"{name}={value}" for name, value in zip(event._fields, event))
+            if event.kind in (FocusFailed.kind, Stall.kind):
+                logger.warning(f"{event.kind} {fields}")
+            else:
+                logger.info(f"{event.kind} {fields}")
+
+
+class TraceSink(Sink):
+    """Adds simulation events to a trace as instants, with the telemetry backlog as a counter."""
+
+    kinds = frozenset({ChunkStarted.kind, Mistake.kind, Switched.kind, FocusFailed.kind, Stall.kind})
+
+    def __init__(self, tracer):
+        """
+        Initialize the sink.
+
+        Args:
+            tracer: tracing.Tracer; nothing is added while it is not recording
+        """
+        self.tracer = tracer
+
+    def handle(self, events: List[Stamped]):
+        tracer = self.tracer
+        if not tracer.recording:
+            return
+        tracer.counter("telemetry_backlog", events=len(events))
+        for stamp, event in events:
+            tracer.instant(event.kind, timestamp=stamp, track="typing", **event._asdict())
@@ -0,0 +1,206 @@
+"""
+Timeline traces of simulation sessions.
+
+Traces use the Chrome trace event format and open in chrome://tracing or
+https://ui.perfetto.dev. Typing, window switching and mouse movement each
+get a named track; calls made in worker threads appear on their thread.
+"""
+import asyncio
+import collections
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .logging_config import logger
+
+# Seconds between writes of buffered events
+FLUSH_INTERVAL = 0.5
+
+# Named tracks and their position in the timeline
+TYPING_TRACK = "typing"
+FOCUS_TRACK = "focus"
+POINTER_TRACK = "pointer"
+TRACKS = {TYPING_TRACK: 1, FOCUS_TRACK: 2, POINTER_TRACK: 3}
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "tid", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, tid: int, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.tid = tid
+        self.args = args
+
+    def __enter__(self):
+        self.start = self.tracer.clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        tracer = self.tracer
+        end = tracer.clock()
+        tracer._emit({"ph": "X", "name": self.name, "tid": self.tid, "ts": tracer._us(self.start),
+                      "dur": round((end - self.start) * 1_000_000, 1), "args": self.args})
+        return False
+
+
+class Tracer:
+    """
+    Records spans, instants and counters to a trace file.
+
+    Events go to an in-memory queue; a background thread writes them to the
+    file, so recording costs the simulation no I/O. A tracer that is not
+    recording returns a shared no-op span, so instrumented code costs one
+    check when tracing is off.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, flush_interval: float = FLUSH_INTERVAL):
+        """
+        Initialize the tracer; nothing is recorded until start().
+
+        Args:
+            clock: Monotonic time source, shared with the telemetry bus
+            flush_interval: Seconds between writes of buffered events
+        """
+        self.clock = clock
+        self.flush_interval = flush_interval
+        self.path: Optional[str] = None
+        self.recording = False
+        self._pid = os.getpid()
+        self._origin = 0.0
+        self._queue: Deque[Dict[str, Any]] = collections.deque()
+        self._threads_named: set = set()
+        self._file = None
+        self._written = 0
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    def _us(self, timestamp: float) -> float:
+        return round((timestamp - self._origin) * 1_000_000, 1)
+
+    def _emit(self, event: Dict[str, Any]):
+        event["pid"] = self._pid
+        self._queue.append(event)
+
+    def _tid(self, track: Optional[str]) -> int:
+        if track is not None:
+            return TRACKS[track]
+        thread = threading.current_thread()
+        if thread.ident not in self._threads_named:
+            self._threads_named.add(thread.ident)
+            self._emit({"ph": "M", "name": "thread_name", "tid": thread.ident, "args": {"name": thread.name}})
+        return thread.ident
+
+    def start(self, path: str):
+        """Start recording to a new trace file."""
+        if self.recording:
+            self.stop()
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write("[")
+        self._written = 0
+        self.path = path
+        # Drop events of spans that ended after the previous trace stopped
+        self._queue.clear()
+        self._origin = self.clock()
+        self._threads_named = set()
+        self._emit({"ph": "M", "name": "process_name", "tid": 0, "args": {"name": "Code Simulator"}})
+        for name, tid in TRACKS.items():
+            self._emit({"ph": "M", "name": "thread_name", "tid": tid, "args": {"name": name}})
+            self._emit({"ph": "M", "name": "thread_sort_index", "tid": tid, "args": {"sort_index": tid}})
+        self._stop.clear()
+        self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+        self._writer.start()
+        self.recording = True
+        logger.info(f"Recording trace to {path}")
+
+    def stop(self):
+        """Stop recording and complete the trace file."""
+        if not self.recording:
+            return
+        self.recording = False
+        self._stop.set()
+        self._writer.join()
+        self._writer = None
+        try:
+            self._flush()
+            self._file.write("\n]\n")
+        finally:
+            self._file.close()
+            self._file = None
+        logger.info(f"Trace written to {self.path} ({self._written} events)")
+
+    def _write_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self._flush()
+            except Exception as e:
+                logger.error(f"Error writing trace: {e}")
+
+    def _flush(self):
+        queue = self._queue
+        lines = []
+        while queue:
+            lines.append(json.dumps(queue.popleft(), separators=(",", ":")))
+        if lines:
+            # Events are separated, not terminated, so the closed file is valid JSON
+            self._file.write(("\n" if not self._written else ",\n") + ",\n".join(lines))
+            self._written += len(lines)
+            self._file.flush()
+
+    def span(self, name: str, track: Optional[str] = None, **args):
+        """
+        Context manager recording a span.
+
+        Args:
+            name: Span name
+            track: Named track, or None for the current thread
+            args: Details shown with the span
+        """
+        if not self.recording:
+            return _NULL_SPAN
+        return _Span(self, name, self._tid(track), args)
+
+    def begin(self, name: str, track: str, **args):
+        """Open a span that does not fit a with block; spans on a track must end in reverse order."""
+        if self.recording:
+            self._emit({"ph": "B", "name": name, "tid": TRACKS[track], "ts": self._us(self.clock()), "args": args})
+
+    def end(self, track: str):
+        """Close the most recent span opened with begin on a track."""
+        if self.recording:
+            self._emit({"ph": "E", "tid": TRACKS[track], "ts": self._us(self.clock())})
+
+    def instant(self, name: str, track: Optional[str] = None, timestamp: Optional[float] = None, **args):
+        """Record a point in time; timestamp is a clock() value, now by default."""
+        if self.recording:
+            self._emit({"ph": "i", "s": "t", "name": name, "tid": self._tid(track),
+                        "ts": self._us(self.clock() if timestamp is None else timestamp), "args": args})
+
+    def counter(self, name: str, **values: float):
+        """Record the current values of a counter track."""
+        if self.recording:
+            self._emit({"ph": "C", "name": name, "tid": 0, "ts": self._us(self.clock()), "args": values})
+
+    async def to_thread(self, name: str, function: Callable, *args, **kwargs):
+        """asyncio.to_thread, with the call recorded as a span on its worker thread."""
+        if not self.recording:
+            return await asyncio.to_thread(function, *args, **kwargs)
+
+        def traced():
+            with self.span(name):
+                return function(*args, **kwargs)
+
+        return await asyncio.to_thread(traced)
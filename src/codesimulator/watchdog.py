@@ -0,0 +1,133 @@
+"""
+Guard against memory that keeps growing over long sessions.
+
+The same MemoryGuard decides the verdict of the soak test, over traced
+memory, and of the opt-in runtime watchdog, over the resident set size.
+"""
+import asyncio
+import collections
+import tracemalloc
+from typing import Callable, Deque, List, Optional
+
+from .logging_config import logger
+from .metrics import rss_bytes
+
+# Samples ignored while caches and pools fill up after the start
+WARMUP_SAMPLES = 3
+
+# Samples whose minimum counts as the current level, so one spike does not trip the guard
+WINDOW_SAMPLES = 3
+
+
+class MemoryGuard:
+    """
+    Decides whether memory keeps growing once a session has warmed up.
+
+    The first samples after the warmup are the baseline; growth is the
+    lowest of the latest samples above it, so memory that is freed again
+    does not count. Only the latest samples are kept, so the guard itself
+    stays the same size however long the session runs. Shared by the soak
+    test and the runtime watchdog.
+    """
+
+    def __init__(self, max_growth_bytes: int, warmup_samples: int = WARMUP_SAMPLES,
+                 window_samples: int = WINDOW_SAMPLES):
+        """
+        Initialize the guard.
+
+        Args:
+            max_growth_bytes: Growth over the baseline that counts as a leak
+            warmup_samples: Samples ignored at the start
+            window_samples: Latest samples whose minimum is compared to the baseline
+        """
+        self.max_growth_bytes = max_growth_bytes
+        self.warmup_samples = warmup_samples
+        self.window_samples = window_samples
+        self.count = 0
+        self.samples: Deque[int] = collections.deque(maxlen=window_samples)
+        self.baseline: Optional[int] = None
+
+    @property
+    def growth(self) -> int:
+        """Steady-state growth in bytes; 0 until there is a baseline."""
+        if self.baseline is None:
+            return 0
+        return min(self.samples) - self.baseline
+
+    def add(self, value: int) -> Optional[str]:
+        """
+        Record a sample.
+
+        Returns:
+            Description of the violation, or None while growth is within bounds
+        """
+        self.count += 1
+        self.samples.append(value)
+        if self.count <= self.warmup_samples:
+            return None
+        if self.baseline is None:
+            self.baseline = value
+        if self.growth > self.max_growth_bytes:
+            return (f"memory grew {self.growth / 2 ** 20:.1f}MiB over the steady-state baseline "
+                    f"of {self.baseline / 2 ** 20:.1f}MiB, limit {self.max_growth_bytes / 2 ** 20:.1f}MiB")
+        return None
+
+
+def top_allocations(limit: int = 10) -> List[str]:
+    """Largest allocation sites while tracemalloc is tracing; empty otherwise."""
+    if not tracemalloc.is_tracing():
+        return []
+    statistics = tracemalloc.take_snapshot().statistics("lineno")
+    return [f"{stat.size / 1024:.1f}KiB in {stat.count} blocks at "
+            f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}" for stat in statistics[:limit]]
+
+
+class MemoryWatchdog:
+    """
+    Opt-in runtime check for memory growth over a long session.
+
+    Samples the resident set size periodically and reports once when the
+    MemoryGuard trips, with the top allocations if tracemalloc is tracing.
+    """
+
+    def __init__(self, max_growth_bytes: int, interval: float = 300.0, telemetry=None,
+                 sample: Callable[[], Optional[int]] = rss_bytes):
+        """
+        Initialize the watchdog.
+
+        Args:
+            max_growth_bytes: Growth over the baseline that counts as a leak
+            interval: Seconds between samples
+            telemetry: TelemetryBus the warning is shown through
+            sample: Returns the current memory use in bytes, or None
+        """
+        self.guard = MemoryGuard(max_growth_bytes)
+        self.interval = interval
+        self.telemetry = telemetry
+        self.sample = sample
+        self.tripped = False
+
+    def check(self) -> Optional[str]:
+        """Take one sample; returns the violation the first time the guard trips."""
+        value = self.sample()
+        if value is None:
+            return None
+        violation = self.guard.add(value)
+        if violation is None or self.tripped:
+            return None
+        self.tripped = True
+        logger.warning(f"Memory watchdog: {violation}")
+        for line in top_allocations():
+            logger.warning(f"  {line}")
+        if self.telemetry is not None:
+            self.telemetry.message(f"⚠️ Memory watchdog: {violation}\n")
+        return violation
+
+    async def run(self):
+        """Sample until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error in memory watchdog: {e}")
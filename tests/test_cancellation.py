@@ -0,0 +1,79 @@
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+from codesimulator.cancellation import MAX_STOP_LATENCY, CancellationToken
+from codesimulator.rate_limiter import InputRateLimiter
+from codesimulator.scheduler import KEYBOARD, POINTER, ActionScheduler, IntervalSource
+
+# Allowance for thread wake-up and loop scheduling on a busy test machine
+SLACK = 0.03
+
+
+def _cancel_later(token, delay, stamp):
+    def cancel():
+        time.sleep(delay)
+        stamp.append(time.monotonic())
+        token.cancel()
+    threading.Thread(target=cancel, daemon=True).start()
+
+
+def test_sliced_sleep_stops_within_the_latency_bound():
+    token = CancellationToken()
+    stamp = []
+
+    async def main():
+        _cancel_later(token, 0.1, stamp)
+        with pytest.raises(asyncio.CancelledError):
+            await token.sleep(10)
+        return time.monotonic()
+
+    stopped = asyncio.run(main())
+    assert stopped - stamp[0] <= MAX_STOP_LATENCY + SLACK
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses the sleep command")
+def test_running_process_is_terminated_on_stop():
+    token = CancellationToken()
+    stamp = []
+    _cancel_later(token, 0.1, stamp)
+
+    with pytest.raises(asyncio.CancelledError):
+        token.run_process(["sleep", "10"])
+    assert time.monotonic() - stamp[0] <= MAX_STOP_LATENCY + SLACK
+
+
+def test_blocking_rate_limit_wait_ends_on_stop():
+    token = CancellationToken()
+    limiter = InputRateLimiter(rates={"focus": (0.01, 1)}, cancel_token=token)
+    limiter.acquire_blocking("focus")
+    stamp = []
+    _cancel_later(token, 0.1, stamp)
+
+    with pytest.raises(asyncio.CancelledError):
+        limiter.acquire_blocking("focus")
+    assert time.monotonic() - stamp[0] <= MAX_STOP_LATENCY + SLACK
+
+
+def test_scheduler_stops_within_the_latency_bound():
+    """Worst case: every source is in the middle of a long wait when stop is requested."""
+    token = CancellationToken()
+    stamp = []
+
+    async def long_action():
+        await token.sleep(30)
+
+    async def main():
+        scheduler = ActionScheduler()
+        scheduler.add(IntervalSource("idle", [KEYBOARD], long_action, (0, 0)), delay=0)
+        scheduler.add(IntervalSource("mouse", [POINTER], long_action, (0, 0)), delay=0)
+        scheduler.add(IntervalSource("later", [POINTER], long_action, (60, 60)))
+        _cancel_later(token, 0.1, stamp)
+        await scheduler.run(lambda: not token.cancelled)
+        return time.monotonic()
+
+    stopped = asyncio.run(main())
+    assert stopped - stamp[0] <= MAX_STOP_LATENCY + SLACK
@@ -0,0 +1,74 @@
+import gc
+import json
+import os
+import time
+import weakref
+
+from codesimulator import config as config_module
+from codesimulator.config import DEFAULT_APPS, AppConfig
+
+
+def _config(tmp_path, **kwargs):
+    return AppConfig(config_path=str(tmp_path / "applications.json"), **kwargs)
+
+
+def test_defaults_are_not_written_until_edited(tmp_path):
+    config = _config(tmp_path)
+
+    assert config.get_applications() == DEFAULT_APPS.get(config.platform, {}).get("applications", [])
+    assert not os.path.exists(config.config_path)
+
+    config.add_application({"name": "Terminal"})
+    assert DEFAULT_APPS.get(config.platform, {}).get("applications", []) != config.get_applications()
+    assert config.flush()
+
+
+def test_burst_of_edits_is_coalesced_into_one_write(tmp_path, monkeypatch):
+    config = _config(tmp_path, write_delay=0.1)
+    writes = []
+    write_atomic = config._write_atomic
+    monkeypatch.setattr(config, "_write_atomic", lambda data: (writes.append(data), write_atomic(data)))
+
+    config.set_applications([])
+    for n in range(20):
+        config.add_application({"name": f"App {n}"})
+    config.remove_application("App 0")
+    assert config.pending and writes == []
+
+    deadline = time.monotonic() + 5
+    while config.pending and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert len(writes) == 1
+    with open(config.config_path) as f:
+        names = [app["name"] for app in json.load(f)[config.platform]["applications"]]
+    assert names == [f"App {n}" for n in range(1, 20)]
+    assert os.listdir(tmp_path) == ["applications.json"]
+
+
+def test_flush_writes_pending_edits_and_reloads(tmp_path):
+    config = _config(tmp_path, write_delay=60)
+    config.set_applications([{"name": "Editor", "window_class": "editor"}])
+    assert config.flush()
+    assert not config.pending
+
+    assert _config(tmp_path).get_applications() == [{"name": "Editor", "window_class": "editor"}]
+
+
+def test_exit_flush_holds_only_live_configs(tmp_path):
+    stale = _config(tmp_path)
+    stale_ref = weakref.ref(stale)
+    del stale
+    gc.collect()
+    assert stale_ref() is None
+
+    closed = _config(tmp_path, write_delay=60)
+    closed.set_applications([{"name": "Closed"}])
+    assert closed.close()
+    live = _config(tmp_path, write_delay=60)
+    live.set_applications([{"name": "Live"}])
+    closed.set_applications([{"name": "Stale"}])
+
+    config_module._flush_live_configs()
+    assert not live.pending and closed.pending
+    assert _config(tmp_path).get_applications() == [{"name": "Live"}]
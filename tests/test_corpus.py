@@ -0,0 +1,107 @@
+import os
+
+from codesimulator.corpus import CodeCorpus
+
+
+def _write(path, content="x = 1\n"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_scans_recursively_and_lazily(tmp_path):
+    """Code files in subdirectories are indexed on first use, other files are ignored."""
+    _write(str(tmp_path / "a.txt"))
+    _write(str(tmp_path / "java" / "Main.java"))
+    _write(str(tmp_path / "notes.md"))
+    corpus = CodeCorpus(str(tmp_path))
+
+    assert corpus._last_refresh is None
+    picks = {os.path.basename(corpus.next_file()) for _ in range(4)}
+    assert picks == {"a.txt", "Main.java"}
+
+
+def test_refresh_picks_up_changes(tmp_path):
+    """Added and removed files are seen after a refresh without rescanning everything."""
+    _write(str(tmp_path / "a.txt"))
+    corpus = CodeCorpus(str(tmp_path), refresh_interval=0)
+    assert len(corpus) == 1
+
+    _write(str(tmp_path / "new" / "b.py"))
+    os.remove(str(tmp_path / "a.txt"))
+
+    assert [os.path.basename(corpus.next_file()) for _ in range(2)] == ["b.py", "b.py"]
+
+
+def test_files_edited_in_place_are_restated_when_picked(tmp_path):
+    """An edit keeps the directory's mtime, so the picked file's own size and mtime are read again."""
+    path = str(tmp_path / "a.py")
+    _write(path)
+    corpus = CodeCorpus(str(tmp_path), refresh_interval=0)
+    assert corpus.entries()[0].size == 6
+
+    _write(path, "x = 1\n" * 100)
+    assert corpus.entries()[0].size == 6
+    assert corpus.next_file() == path
+    assert corpus.entries()[0].size == 600
+
+    os.remove(path)
+    assert corpus.current(path) is None and corpus.next_file() is None
+
+
+def test_shuffle_and_weighted_selection(tmp_path):
+    """Shuffled passes visit every file once; weighted picks favour large files."""
+    for i in range(5):
+        _write(str(tmp_path / f"f{i}.txt"))
+    _write(str(tmp_path / "big.txt"), "x" * 100000)
+
+    shuffled = CodeCorpus(str(tmp_path), selection="shuffle")
+    assert len({shuffled.next_file() for _ in range(6)}) == 6
+
+    weighted = CodeCorpus(str(tmp_path), selection="weighted")
+    picks = [os.path.basename(weighted.next_file()) for _ in range(200)]
+    assert picks.count("big.txt") > 150
+
+
+def test_compressed_files_and_archive_members(tmp_path):
+    """Archive members are indexed from the archive index and read as streams."""
+    import gzip
+    import tarfile
+    import zipfile
+
+    from codesimulator.corpus_io import open_code_text
+
+    with gzip.open(str(tmp_path / "one.py.gz"), "wt") as f:
+        f.write("print(1)\n")
+    with zipfile.ZipFile(str(tmp_path / "samples.zip"), "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("java/Main.java", "class Main {}\n")
+        archive.writestr("README.md", "skip me\n")
+    _write(str(tmp_path / "src" / "two.php"), "<?php echo 2;\n")
+    with tarfile.open(str(tmp_path / "more.tar.gz"), "w:gz") as archive:
+        archive.add(str(tmp_path / "src" / "two.php"), arcname="two.php")
+
+    corpus = CodeCorpus(str(tmp_path))
+    contents = {}
+    for entry in corpus.entries():
+        with open_code_text(entry.path) as f:
+            contents[os.path.relpath(entry.path, str(tmp_path))] = f.read()
+
+    assert contents == {
+        "one.py.gz": "print(1)\n",
+        "samples.zip!java/Main.java": "class Main {}\n",
+        "more.tar.gz!two.php": "<?php echo 2;\n",
+        os.path.join("src", "two.php"): "<?php echo 2;\n",
+    }
+
+
+def test_peek_next_reserves_the_next_pick(tmp_path):
+    """Peeking returns the file next_file hands out next, without skipping any."""
+    for name in ("a.txt", "b.txt", "c.txt"):
+        _write(str(tmp_path / name))
+    corpus = CodeCorpus(str(tmp_path), selection="shuffle")
+
+    first = corpus.next_file()
+    peeked = corpus.peek_next()
+    assert corpus.peek_next() == peeked
+    assert corpus.next_file() == peeked
+    assert {first, peeked, corpus.next_file()} == {str(tmp_path / n) for n in ("a.txt", "b.txt", "c.txt")}
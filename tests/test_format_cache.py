@@ -0,0 +1,44 @@
+import os
+
+from codesimulator.format_cache import FormattedOutputCache
+
+
+def test_formatted_output_is_cached(tmp_path):
+    """The second request for the same content is served from the cache."""
+    source = tmp_path / "Main.java"
+    source.write_text("class Main {\nvoid f(int a,int b) {\n}\n}\n")
+    cache = FormattedOutputCache(str(tmp_path / "cache"))
+
+    first = cache.get_formatted_path(str(source), "java", 4)
+    os.utime(first, (0, 0))
+    second = cache.get_formatted_path(str(source), "java", 4)
+
+    assert first == second
+    assert os.path.getatime(second) > 0
+    assert os.path.getmtime(second) == 0
+    assert open(second).read().splitlines()[1] == "    void f(int a, int b) {"
+    assert cache.get_formatted_path(str(source), "java", 2) != first
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Writing past max_bytes removes the oldest entries but keeps the newest."""
+    cache = FormattedOutputCache(str(tmp_path / "cache"), max_bytes=150)
+    paths = []
+    for i in range(3):
+        source = tmp_path / f"file{i}.py"
+        source.write_text(f"value_{i} = {'x' * 60!r}\n")
+        paths.append(cache.get_formatted_path(str(source), "python", 4))
+        os.utime(paths[-1], (i, i))
+
+    assert not os.path.exists(paths[0])
+    assert os.path.exists(paths[2])
+
+
+def test_content_hashes_are_kept_for_recent_file_versions_only(tmp_path):
+    source = tmp_path / "main.py"
+    cache = FormattedOutputCache(str(tmp_path / "cache"), max_digests=2)
+    for version in range(4):
+        source.write_text("x = 1\n" * (version + 1))
+        cache.lookup(str(source), "python", 4)
+
+    assert [size for _, size, _ in cache._digests] == [18, 24]
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from codesimulator.import_budget import (
+    DEFAULT_BUDGETS_MS, DEFERRED_APP_MODULES, ImportReport, check_budget, measure_imports, parse_importtime,
+)
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        300 |   json.decoder
+import time:       200 |        500 | json
+import time:      5000 |       5000 |   pyautogui
+import time:       100 |       5100 | codesimulator.slow
+"""
+
+
+def test_parses_and_aggregates_importtime_output():
+    report = ImportReport("codesimulator.slow", parse_importtime(SAMPLE.splitlines()))
+
+    assert [t.module for t in report.timings] == ["_io", "json.decoder", "json", "pyautogui", "codesimulator.slow"]
+    assert report.timings[1].depth == 1
+    assert report.total_ms == 5.1
+    assert report.by_package()["json"] == 0.5
+    assert check_budget(report, 10.0) == ["codesimulator.slow imports pyautogui at startup"]
+    assert len(check_budget(report, 1.0)) == 2
+
+
+def test_simulator_import_leaves_out_input_backends():
+    """The simulator must not load pyautogui or platform window APIs on import."""
+    report = measure_imports("codesimulator.actions")
+
+    assert report.imported("codesimulator.actions")
+    assert check_budget(report, None) == []
+
+
+def test_app_import_leaves_out_backends_and_on_demand_tools():
+    """Profiling, the log viewer, metrics and the watchdog load when first used."""
+    pytest.importorskip("toga")
+    report = measure_imports("codesimulator.app")
+
+    assert report.imported("codesimulator.app")
+    assert check_budget(report, None, DEFERRED_APP_MODULES) == []
+
+
+@pytest.mark.skipif(not os.environ.get("CODESIMULATOR_IMPORT_BUDGET"),
+                    reason="wall-clock budget; set CODESIMULATOR_IMPORT_BUDGET=1 to check it")
+@pytest.mark.parametrize("module", sorted(DEFAULT_BUDGETS_MS))
+def test_startup_modules_import_within_time_budget(module):
+    if module == "codesimulator.app":
+        pytest.importorskip("toga")
+    report = measure_imports(module)
+
+    assert check_budget(report, DEFAULT_BUDGETS_MS[module], ()) == []
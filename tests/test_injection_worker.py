@@ -0,0 +1,123 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from codesimulator.cancellation import CancellationToken
+from codesimulator.injection_worker import InjectionWorker, InputEvent, decode_event, encode_event, serve
+from codesimulator.ring_buffer import SharedRingBuffer
+
+
+@pytest.fixture
+def rings():
+    events, telemetry = SharedRingBuffer.create(64), SharedRingBuffer.create(64)
+    yield events, telemetry
+    events.close()
+    telemetry.close()
+
+
+def _serve_in_thread(typed, rings):
+    parent, child = multiprocessing.Pipe()
+    actions = {"press": lambda key: typed.append(f"<{key}>"), "write": typed.append}
+    thread = threading.Thread(target=serve, args=(child, actions, *rings), daemon=True)
+    thread.start()
+    return parent, thread
+
+
+def _send_batch(conn, events_ring, batch_id, events):
+    events_ring.push_many(encode_event(event) for event in events)
+    conn.send(("batch", batch_id, len(events)))
+
+
+def _fake_worker(conn, pause, events_name, telemetry_name):
+    # Runs in a spawned process; the events are only counted
+    events = SharedRingBuffer.attach(events_name)
+    telemetry = SharedRingBuffer.attach(telemetry_name)
+    serve(conn, {"press": lambda key: None, "write": lambda text: None}, events, telemetry, pause)
+    events.close()
+    telemetry.close()
+
+
+def test_events_survive_encoding():
+    events = [InputEvent("write", "é", 0.125, 1), InputEvent("press", "backspace", 0.1), InputEvent("press", "tab", 0.0, 1)]
+    assert [decode_event(encode_event(event)) for event in events] == events
+    with pytest.raises(ValueError):
+        encode_event(InputEvent("write", "ab", 0.0))
+
+
+def test_worker_runs_batches_in_order_and_reports_progress(rings):
+    typed = []
+    conn, thread = _serve_in_thread(typed, rings)
+    events = [InputEvent("write", c, 0.0, 1) for c in "x" * 20] + [InputEvent("press", "enter", 0.0)]
+
+    _send_batch(conn, rings[0], 1, events)
+    replies = [conn.recv(), conn.recv()]
+    conn.send(("stop",))
+    thread.join(1)
+
+    assert replies == [("progress", 1, 16), ("done", 1, 21)]
+    assert typed == ["x"] * 20 + ["<enter>"]
+    assert [index for index, _, _ in rings[1].pop_many()] == list(range(21))
+    assert not thread.is_alive()
+
+
+def test_cancel_interrupts_the_wait_and_empties_the_ring(rings):
+    typed = []
+    conn, thread = _serve_in_thread(typed, rings)
+    _send_batch(conn, rings[0], 1, [InputEvent("write", "a", 10.0, 1), InputEvent("write", "b", 0.0, 1)])
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    conn.send(("cancel", 1))
+    assert conn.recv() == ("done", 1, 1)
+    assert time.monotonic() - started < 1
+    assert typed == ["a"]
+    assert len(rings[0]) == 0
+    conn.send(("stop",))
+    thread.join(1)
+
+
+def test_injection_worker_process_stops_batch_on_token_cancel():
+    token = CancellationToken()
+    worker = InjectionWorker(cancel_token=token, target=_fake_worker, ring_capacity=4)
+    worker.start()
+    try:
+        async def main():
+            # Longer than the ring, so it is sent in several batches
+            assert await worker.run_batch([InputEvent("write", "a", 0.0, 1)] * 10) == 10
+            threading.Timer(0.2, token.cancel).start()
+            return await worker.run_batch([InputEvent("write", "a", 5.0, 1)] * 3)
+
+        started = time.monotonic()
+        assert asyncio.run(main()) == 1
+        assert worker.executed == 1
+        assert worker.timing["events"] == 11
+        assert time.monotonic() - started < 2
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(worker.run_batch([InputEvent("write", "a", 0.0, 1)]))
+    finally:
+        worker.close()
+    assert not worker.running
+
+
+def test_injection_worker_process_reports_progress_mid_batch():
+    token = CancellationToken()
+    worker = InjectionWorker(cancel_token=token, target=_fake_worker)
+    worker.start()
+    try:
+        async def main():
+            # The 16th event sends a progress reply and then waits
+            events = [InputEvent("write", "a", 0.0, 1)] * 15 + [InputEvent("write", "a", 5.0, 1)] * 3
+            batch = asyncio.create_task(worker.run_batch(events))
+            deadline = time.monotonic() + 5
+            while worker.executed < 16 and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            seen = worker.executed, batch.done()
+            token.cancel()
+            return seen, await batch
+
+        assert asyncio.run(main()) == ((16, False), 16)
+    finally:
+        worker.close()
@@ -0,0 +1,55 @@
+import asyncio
+
+from codesimulator.journal import ProgressJournal, ProgressRecord
+from codesimulator.language_formatter import FormatterFactory
+from codesimulator.pipeline import replay_prefix, typing_pipeline
+
+
+def test_positions_survive_a_restart(tmp_path):
+    """The last record per stream is reloaded, finished streams are forgotten and torn records skipped."""
+    path = str(tmp_path / "progress.jsonl")
+    journal = ProgressJournal(path)
+    journal.record("a", 10, 1)
+    journal.record("a", 30, 3, 5)
+    journal.record("b", 0, 0)
+    journal.complete("b")
+    with open(path, "a") as f:
+        f.write('{"id": "c", "off')
+
+    reloaded = ProgressJournal(path)
+    assert reloaded.position("a") == ProgressRecord(30, 3, 5)
+    assert reloaded.position("b") is None
+    assert reloaded.position("c") is None
+
+
+def test_journal_is_compacted(tmp_path):
+    """Past compact_after records the file is rewritten with only the live positions."""
+    path = tmp_path / "progress.jsonl"
+    journal = ProgressJournal(str(path), compact_after=5)
+    for line in range(12):
+        journal.record("a", line * 10, line)
+
+    assert len(path.read_text().splitlines()) <= 5
+    assert ProgressJournal(str(path)).position("a") == ProgressRecord(110, 11, 0)
+
+
+def test_resumed_pipeline_seeks_and_restores_indent_state(tmp_path):
+    """Typing resumes at the recorded offset with the indent model where a full run would have it."""
+    path = tmp_path / "Main.java"
+    path.write_text("class Main {\n    void f() {\n        int x;\n    }\n}\n")
+    full = asyncio.run(_collect(typing_pipeline(str(path), lambda: 50,
+                                                indent_model=FormatterFactory.create_formatter("java", 4))))
+
+    model = FormatterFactory.create_formatter("java", 4)
+    replay_prefix(str(path), full[2].offset, indent_model=model)
+    resumed = asyncio.run(_collect(typing_pipeline(str(path), lambda: 50, indent_model=model,
+                                                   start_offset=full[2].offset, start_line=2)))
+
+    def keystrokes(plans):
+        return [(p.number, p.offset, p.backspaces, p.text) for p in plans]
+
+    assert keystrokes(resumed) == keystrokes(full[2:])
+
+
+async def _collect(plans):
+    return [plan async for plan in plans]
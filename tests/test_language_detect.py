@@ -0,0 +1,35 @@
+from codesimulator.language_detect import LanguageDetector
+
+
+def test_extension_shebang_and_content(tmp_path):
+    """Extensions win, then shebangs, then content heuristics, then the default."""
+    files = {
+        "Main.java": "x",
+        "script": "#!/usr/bin/env python3\nprint(1)\n",
+        "workflow.txt": "name: Release\non:\n  push:\njobs:\n  build:\n",
+        "notes.txt": "plain words only\n",
+        "setup_env": "try:\n    import yaml\nexcept ImportError:\n    yaml = None\nelse:\n    pass\nfinally:\n    pass\n",
+    }
+    detector = LanguageDetector()
+    detected = {}
+    for name, content in files.items():
+        path = tmp_path / name
+        path.write_text(content)
+        detected[name] = detector.detect(str(path), "php")
+
+    assert detected == {"Main.java": "java", "script": "python", "workflow.txt": "yaml", "notes.txt": "php",
+                        "setup_env": "python"}
+
+
+def test_result_is_cached_by_file_identity(tmp_path):
+    """A file is only sniffed again once it changes."""
+    path = tmp_path / "code.txt"
+    path.write_text("<?php\necho 1;\n")
+    detector = LanguageDetector()
+
+    assert detector.detect(str(path), "java") == "php"
+    detector._resolve = lambda file_path: "python"
+    assert detector.detect(str(path), "java") == "php"
+
+    path.write_text("<?php\necho 12;\n")
+    assert detector.detect(str(path), "java") == "python"
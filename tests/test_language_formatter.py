@@ -0,0 +1,72 @@
+from codesimulator.language_formatter import FormatterFactory
+
+
+def test_auto_indent_types_only_the_delta():
+    """Lines inside a block reuse the indentation the editor already inserted."""
+    formatter = FormatterFactory.create_formatter("java", indent_size=4)
+
+    assert formatter.plan_indentation("class Foo {") == (0, 0)
+    assert formatter.plan_indentation("    int x = 1;") == (0, 0)
+    assert formatter.plan_indentation("        continued();") == (0, 4)
+
+
+def test_auto_indent_leaves_closers_to_the_editor():
+    """Closing braces are dedented by the editor and nothing is typed for them."""
+    formatter = FormatterFactory.create_formatter("java", indent_size=4)
+    for line in ["class Foo {", "    void run() {", "        go();"]:
+        formatter.plan_indentation(line)
+
+    assert formatter.plan_indentation("    }") == (0, 0)
+    assert formatter.editor_indent == 4
+    assert formatter.plan_indentation("}") == (0, 0)
+    assert formatter.editor_indent == 0
+
+
+def test_auto_indent_dedents_with_backspaces():
+    """Python blocks end without a closer, so the planner presses backspace per level."""
+    formatter = FormatterFactory.create_formatter("python", indent_size=4)
+    for line in ["def run():", "    if ready:", "        go()"]:
+        formatter.plan_indentation(line)
+
+    assert formatter.plan_indentation("") == (0, 0)
+    assert formatter.plan_indentation("    return") == (1, 0)
+    assert formatter.plan_indentation("print(run())") == (1, 0)
+
+
+def test_java_blocks_are_indented_once():
+    """Each brace level adds exactly one indent, and commas get a trailing space."""
+    formatter = FormatterFactory.create_formatter("java", indent_size=4)
+    lines = ["class A {", "void f(int a,int b) {", "} else {", "g(a,b);", "}", "}"]
+
+    assert [formatter.format_line(line) for line in lines] == [
+        "class A {",
+        "    void f(int a, int b) {",
+        "    } else {",
+        "        g(a, b);",
+        "    }",
+        "}",
+    ]
+
+
+def test_rules_skip_strings_and_comments():
+    """Brackets and commas inside literals or comments do not change the output."""
+    formatter = FormatterFactory.create_formatter("php", indent_size=2)
+
+    assert formatter.format_line('$s="a,b {";  // x=y {') == '$s = "a,b {";  // x=y {'
+    assert formatter.format_line("if ($a==1&&$b!==2 ) {") == "if ($a == 1 && $b !== 2) {"
+    assert formatter.indent_level == 1
+
+
+def test_python_colons_and_docstrings():
+    """Missing colons are added to block headers but never inside docstrings."""
+    formatter = FormatterFactory.create_formatter("python", indent_size=4)
+    lines = ["def f(a)", '    """Docs', "    if this is prose", '    """', "    if a: return 1", "    else"]
+
+    assert [formatter.format_line(line) for line in lines] == [
+        "def f(a):",
+        '    """Docs',
+        "    if this is prose",
+        '    """',
+        "    if a: return 1",
+        "    else:",
+    ]
@@ -0,0 +1,83 @@
+import logging
+import logging.handlers
+
+from codesimulator.log_viewer import LogFilter, LogFollower, LogReader, levels_from, rotation_set
+from codesimulator.logging_config import formatter
+
+
+def _logger(path, max_bytes=0):
+    log = logging.getLogger(f"test_log_viewer.{path}")
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=2)
+    handler.setFormatter(formatter)
+    log.handlers = [handler]
+    return log, handler
+
+
+def test_tail_reads_across_the_rotation_set_with_filters(tmp_path):
+    path = str(tmp_path / "codesimulator.log")
+    log, handler = _logger(path, max_bytes=4096)
+    for number in range(300):
+        log.info(f"line {number}")
+        if number == 250:
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                log.exception("typing failed")
+    handler.close()
+
+    assert rotation_set(path) == [path + ".2", path + ".1", path]
+    # Small windows make the backward scan cross window and file boundaries
+    reader = LogReader(path, stride=512, window=1024)
+
+    records = reader.tail(40)
+    assert [record.text.rsplit(" ", 1)[-1] for record in records[-3:]] == ["297", "298", "299"]
+    assert len(records) == 40 and len({record.path for record in records}) >= 2
+    assert [record.offset for record in records if record.path == path] == sorted(
+        record.offset for record in records if record.path == path)
+
+    errors = reader.tail(10, LogFilter("ERROR"))
+    assert len(errors) == 1 and errors[0].level == "ERROR"
+    assert "Traceback" in errors[0].text and errors[0].text.endswith("ValueError: boom")
+
+    assert [record.text.endswith("line 277") for record in reader.tail(10, LogFilter(text="LINE 277"))] == [True]
+    assert levels_from("WARNING") == ("WARNING", "ERROR", "CRITICAL")
+
+
+def test_since_uses_the_index_to_skip_older_records(tmp_path):
+    path = tmp_path / "codesimulator.log"
+    path.write_text("".join(f"2026-10-19 10:{minute:02d}:00,000 - codesimulator - INFO - minute {minute}\n"
+                            for minute in range(60)))
+    reader = LogReader(str(path), stride=256)
+
+    records = reader.tail(100, since="2026-10-19 10:55:00,000")
+    assert [record.text.rsplit(" ", 1)[-1] for record in records] == ["55", "56", "57", "58", "59"]
+    assert reader.time_range() == ("2026-10-19 10:00:00,000", "2026-10-19 10:59:00,000")
+
+
+def test_follow_survives_rotation_and_waits_for_tracebacks(tmp_path):
+    path = str(tmp_path / "codesimulator.log")
+    log, handler = _logger(path)
+    log.info("before following")
+    follower = LogFollower(path, LogFilter("INFO"))
+    assert follower.poll() == []
+
+    log.debug("hidden")
+    log.info("first")
+    with open(path, "a") as f:
+        f.write("2026-10-19 10:00:00,000 - codesimulator - ERROR - failed\nTraceback (most recent call last):\n")
+    # The error may still get more lines, so only the record before it is reported
+    assert [record.text.rsplit(" - ", 1)[-1] for record in follower.poll()] == ["first"]
+    with open(path, "a") as f:
+        f.write("ValueError: boom\n")
+    log.info("second")
+    polled = follower.poll()
+    assert polled[0].text.endswith("Traceback (most recent call last):\nValueError: boom")
+
+    log.info("before rotation")
+    handler.doRollover()
+    log.info("after rotation")
+    handler.close()
+    texts = [record.text.rsplit(" - ", 1)[-1] for record in polled[1:] + follower.poll() + follower.poll()]
+    assert texts == ["second", "before rotation", "after rotation"]
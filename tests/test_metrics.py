@@ -0,0 +1,84 @@
+import asyncio
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from codesimulator.metrics import MetricsRegistry, MetricsServer, SimulatorMetrics
+from codesimulator.telemetry import KeysInjected, Mistake, Stall, Switched, TelemetryBus
+
+
+def _simulator():
+    return SimpleNamespace(
+        app_switcher=SimpleNamespace(focus_stats={"attempted": 3, "succeeded": 2}),
+        mouse_controller=SimpleNamespace(moves=4, distance=1234.5),
+        telemetry=TelemetryBus(),
+        text_box=SimpleNamespace(value="hello\n"),
+    )
+
+
+def _samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry("test")
+    histogram = registry.histogram("latency_seconds", "Latency", (0.1, 0.5))
+    for value in (0.05, 0.1, 0.3, 2.0):
+        histogram.observe(value)
+
+    text = registry.render()
+    assert "# TYPE test_latency_seconds histogram" in text
+    samples = _samples(text)
+    assert samples['test_latency_seconds_bucket{le="0.1"}'] == "2"
+    assert samples['test_latency_seconds_bucket{le="0.5"}'] == "3"
+    assert samples['test_latency_seconds_bucket{le="+Inf"}'] == "4"
+    assert samples["test_latency_seconds_count"] == "4"
+    assert samples["test_latency_seconds_sum"] == "2.45"
+    with pytest.raises(ValueError):
+        registry.counter("latency_seconds", "Duplicate")
+
+
+def test_simulator_metrics_follow_events_and_components():
+    simulator = _simulator()
+    metrics = SimulatorMetrics(simulator)
+    bus = simulator.telemetry
+    bus.subscribe(metrics)
+    bus.publish(KeysInjected(0, 12, 10, 2.0))
+    bus.publish(Mistake(0, 1))
+    bus.publish(Switched("Editor", 0.2))
+    bus.publish(Stall("typing", 0.9))
+    bus.dispatch()
+
+    samples = _samples(metrics.registry.render())
+    assert samples["codesimulator_keystrokes_total"] == "12"
+    assert samples["codesimulator_typed_chars_total"] == "10"
+    assert samples["codesimulator_chars_per_second"] == "5"
+    assert samples["codesimulator_mistakes_total"] == "1"
+    assert samples["codesimulator_switches_attempted_total"] == "3"
+    assert samples["codesimulator_switches_succeeded_total"] == "2"
+    assert samples["codesimulator_focus_latency_seconds_count"] == "1"
+    assert samples["codesimulator_mouse_distance_pixels_total"] == "1234.5"
+    assert samples["codesimulator_stalls_total"] == "1"
+    assert samples["codesimulator_console_buffer_chars"] == "6"
+
+
+def test_server_answers_a_plain_http_client():
+    metrics = SimulatorMetrics(_simulator())
+
+    async def main():
+        server = MetricsServer(metrics.registry, port=0)
+        await server.start()
+        url = f"http://127.0.0.1:{server.port}"
+        try:
+            body = await asyncio.to_thread(lambda: urllib.request.urlopen(f"{url}/metrics", timeout=5).read())
+            with pytest.raises(urllib.error.HTTPError) as missing:
+                await asyncio.to_thread(urllib.request.urlopen, f"{url}/other", timeout=5)
+        finally:
+            await server.close()
+        return body.decode(), missing.value.code
+
+    body, missing_status = asyncio.run(main())
+    assert "codesimulator_keystrokes_total 0" in body
+    assert missing_status == 404
@@ -0,0 +1,31 @@
+import os
+from types import SimpleNamespace
+
+from codesimulator import path_utils
+from codesimulator.path_utils import ResolvedPaths, get_paths, get_resource_path
+
+
+def test_paths_are_resolved_once_and_again_for_the_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(path_utils, "_paths", None)
+    paths = get_paths()
+    assert get_paths() is paths
+    assert get_resource_path(None, "config.json") == os.path.join(paths.resources, "config.json")
+
+    app = SimpleNamespace(paths=SimpleNamespace(resources=str(tmp_path)))
+    app_paths = get_paths(app)
+    assert app_paths is not paths
+    assert app_paths.code == os.path.join(str(tmp_path), "code")
+    assert get_paths(app) is app_paths
+    assert get_paths() is app_paths
+
+
+def test_cache_dirs_are_created_on_first_request(tmp_path):
+    paths = ResolvedPaths(str(tmp_path / "res"), str(tmp_path / "cache"), str(tmp_path / "logs"))
+
+    formatted = paths.cache_dir("formatted")
+    assert os.path.isdir(formatted)
+    os.rmdir(formatted)
+    # Memoized: no second makedirs
+    assert paths.cache_dir("formatted") == formatted
+    assert not os.path.exists(formatted)
+    assert paths.log_file == os.path.join(str(tmp_path / "logs"), "codesimulator.log")
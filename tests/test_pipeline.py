@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+from codesimulator.language_formatter import FormatterFactory
+from codesimulator.pipeline import bounded, typing_pipeline
+
+
+async def _collect(plans):
+    return [plan async for plan in plans]
+
+
+def test_plans_are_chunked_with_offsets(tmp_path):
+    """Lines keep their byte offsets and are grouped into chunks of the requested size."""
+    path = tmp_path / "code.py"
+    path.write_bytes(b"def f():\n\n    return 1\n")
+
+    plans = asyncio.run(_collect(typing_pipeline(str(path), lambda: 2)))
+
+    assert [(p.number, p.offset, p.chunk, p.chunk_start, p.text) for p in plans] == [
+        (0, 0, 0, True, "def f():"),
+        (1, 9, 0, False, ""),
+        (2, 10, 1, True, "    return 1"),
+    ]
+
+
+def test_auto_indent_model_is_applied(tmp_path):
+    """With an indent model only the indentation delta is left to type."""
+    path = tmp_path / "Main.java"
+    path.write_text("class Main {\n    int x;\n}\n")
+    model = FormatterFactory.create_formatter("java", 4)
+
+    plans = asyncio.run(_collect(typing_pipeline(str(path), lambda: 50, indent_model=model)))
+
+    assert [p.text for p in plans] == ["class Main {", "int x;", "}"]
+
+
+def test_bounded_stage_applies_backpressure():
+    """The upstream stage never runs more than maxsize items ahead."""
+    produced = []
+
+    async def numbers():
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    async def consume():
+        stage = bounded(numbers(), maxsize=2)
+        first = await stage.__anext__()
+        await asyncio.sleep(0.01)
+        ahead = len(produced)
+        await stage.aclose()
+        return first, ahead
+
+    first, ahead = asyncio.run(consume())
+    assert first == 0
+    assert ahead <= 4
+
+
+def test_bounded_stage_closes_its_source_after_the_read_in_flight():
+    """Closing waits for a worker thread read instead of closing the stream under it."""
+    log = []
+
+    def read(number):
+        log.append(("read", number))
+        time.sleep(0.05)
+        log.append(("done", number))
+
+    async def lines():
+        try:
+            for number in range(10):
+                await asyncio.to_thread(read, number)
+                yield number
+        finally:
+            log.append("closed")
+
+    async def consume():
+        stage = bounded(lines(), maxsize=1)
+        assert await stage.__anext__() == 0
+        await asyncio.sleep(0.07)
+        await stage.aclose()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(consume())
+    assert log[-1] == "closed"
@@ -0,0 +1,93 @@
+from codesimulator.corpus import CorpusEntry
+from codesimulator.planner import SessionPlanner
+
+
+def _entries(*sizes):
+    return [CorpusEntry(f"file{number}.py", size, 0) for number, size in enumerate(sizes)]
+
+
+def _estimate(entry):
+    # One second per byte, ten bytes per line
+    return float(entry.size), entry.size // 10
+
+
+def test_chunks_fit_the_remaining_budget():
+    """Chunks aim for the target duration but never run past the budget."""
+    planner = SessionPlanner(budget_seconds=60, target_chunk_seconds=20, clock=lambda: 0.0)
+    planner.start()
+    planner.begin_file(estimated_seconds=100, lines=100)
+
+    assert planner.chunk_size() == 20
+
+    planner.budget_seconds = 0
+    assert planner.chunk_size() == 0
+    assert planner.expired and planner.cut_short
+
+
+def test_drift_shrinks_chunks_when_typing_runs_slow():
+    """Chunks that took twice their estimate halve the following chunk sizes."""
+    clock = [0.0]
+    planner = SessionPlanner(budget_seconds=3600, target_chunk_seconds=20, smoothing=1.0, clock=lambda: clock[0])
+    planner.start()
+    planner.begin_file(estimated_seconds=100, lines=100)
+
+    size = planner.chunk_size()
+    for _ in range(size):
+        planner.line_typed()
+    clock[0] += size * 2.0
+
+    assert planner.drift == 1.0
+    assert planner.chunk_size() == size // 2
+    assert planner.drift == 2.0
+
+
+def test_plan_takes_whole_files_that_fit_and_a_range_of_the_first_one_passed_over():
+    planner = SessionPlanner(budget_seconds=1000, clock=lambda: 0.0)
+    planner.start()
+
+    plan = planner.plan(_entries(600, 800, 300, 200), _estimate)
+
+    # 600 + 300 fit; 800 is passed over and fills the last 100 seconds with 10 of its lines
+    assert [(planned.path, planned.lines) for planned in plan] == [
+        ("file0.py", None), ("file2.py", None), ("file1.py", 10)]
+    assert sum(planned.estimated_seconds for planned in plan) == 1000
+
+
+def test_files_are_not_repeated_and_the_planned_range_limits_typing():
+    clock = [0.0]
+    planner = SessionPlanner(budget_seconds=1000, target_chunk_seconds=50, clock=lambda: clock[0])
+    planner.start()
+    entries = _entries(600, 800)
+
+    assert planner.next_file(entries, _estimate).path == "file0.py"
+    assert planner.peek_file(entries, _estimate).path == "file1.py"
+    clock[0] += 600
+
+    planned = planner.next_file(entries, _estimate)
+    assert (planned.path, planned.lines) == ("file1.py", 40)
+    planner.begin_file(800, 80, planned.path)
+    typed = 0
+    while (size := planner.chunk_size()):
+        for _ in range(size):
+            planner.line_typed()
+        typed += size
+    assert typed == 40 and planner.cut_short
+
+
+def test_peek_does_not_restart_the_rotation_and_a_full_budget_runs_out_of_files():
+    planner = SessionPlanner(budget_seconds=1000, clock=lambda: 0.0)
+    planner.start()
+    entries = _entries(100, 200)
+    for path in ("file0.py", "file1.py"):
+        assert planner.next_file(entries, _estimate).path == path
+
+    # Every file is used; a peek shows the restart without making it
+    assert planner.peek_file(entries, _estimate).path == "file0.py"
+    assert planner._used == {"file0.py", "file1.py"}
+    assert planner.next_file(entries, _estimate).path == "file0.py"
+    assert planner._used == {"file0.py"}
+
+    assert not planner.expired
+    # A single 5000 second line fits neither whole nor as a range
+    assert planner.next_file(_entries(5000), lambda entry: (5000.0, 1)) is None
+    assert planner.out_of_files and planner.expired
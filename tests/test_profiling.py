@@ -0,0 +1,47 @@
+import threading
+import time
+
+import pytest
+
+from codesimulator.profiling import ProfileSession, SamplingProfiler
+
+
+def _busy_work(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(1000))
+
+
+def test_sampling_profiler_finds_the_busy_function():
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001)
+    profiler.start()
+    _busy_work(0.2)
+    profiler.stop()
+
+    assert profiler.samples > 10
+    busy = next(name for name in profiler.total if name.startswith("_busy_work"))
+    assert profiler.total[busy] / profiler.samples > 0.5
+    assert "_busy_work" in profiler.report(5)
+
+
+@pytest.mark.parametrize("mode", ["sampling", "cprofile"])
+def test_session_writes_cpu_and_memory_report(tmp_path, mode):
+    session = ProfileSession(mode, str(tmp_path), top=5, interval=0.001)
+    session.start()
+    kept = [bytearray(1024) for _ in range(2000)]
+    _busy_work(0.1)
+    session.stop()
+    report = session.write_report()
+
+    assert not session.running
+    text = open(report.path).read()
+    assert "_busy_work" in text
+    assert "test_profiling.py" in text.split("Memory growth")[1]
+    assert report.summary.startswith("Profiled ") and "Memory growth:" in report.summary
+    assert bool(report.stats_path) == (mode == "cprofile")
+    assert len(kept) == 2000
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ProfileSession("perf", str(tmp_path))
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from codesimulator.rate_limiter import InputRateLimiter, TokenBucket
+
+
+def test_token_bucket_refills_at_its_rate():
+    clock = [0.0]
+    bucket = TokenBucket(rate=10, burst=2, clock=lambda: clock[0])
+
+    bucket.take(2)
+    assert bucket.wait_time() == pytest.approx(0.1)
+    clock[0] += 0.1
+    assert bucket.wait_time() == 0
+
+
+def test_limiter_applies_backpressure_instead_of_dropping():
+    """Every event gets through, paced by the class rate and the global cap, and waits are counted."""
+    limiter = InputRateLimiter(rates={"key": (200.0, 5), "scroll": (1000.0, 5)}, global_rate=(400.0, 5))
+
+    async def produce(event_class, count):
+        for _ in range(count):
+            await limiter.acquire(event_class)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(produce("key", 25), produce("scroll", 25))
+        return loop.time() - start
+
+    elapsed = asyncio.run(main())
+    stats = limiter.snapshot()
+
+    assert stats["key"]["events"] == 25 and stats["scroll"]["events"] == 25
+    # 20 keys beyond the burst at 200/s, and 45 events beyond the global burst at 400/s
+    assert elapsed >= 0.1
+    assert stats["key"]["throttled"] > 0 and stats["key"]["throttled_seconds"] > 0
@@ -0,0 +1,50 @@
+import multiprocessing
+
+import pytest
+
+from codesimulator.ring_buffer import SharedRingBuffer
+
+
+def _consume(name, count):
+    ring = SharedRingBuffer.attach(name)
+    received = 0
+    while received < count:
+        record = ring.pop()
+        if record is not None:
+            received += 1
+    ring.close()
+
+
+def test_records_wrap_around_in_order():
+    ring = SharedRingBuffer.create(4)
+    try:
+        for round_number in range(3):
+            assert ring.push_many((n, round_number, n * 1000) for n in range(6)) == 4
+            assert ring.free() == 0
+            assert not ring.push(99, 0, 0)
+            assert ring.pop() == (0, round_number, 0)
+            assert ring.pop_many() == [(1, round_number, 1000), (2, round_number, 2000), (3, round_number, 3000)]
+            assert ring.pop() is None
+    finally:
+        ring.close()
+
+
+def test_capacity_must_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        SharedRingBuffer.create(100)
+
+
+def test_consumer_in_another_process_drains_the_ring():
+    ring = SharedRingBuffer.create(8)
+    try:
+        process = multiprocessing.get_context("spawn").Process(target=_consume, args=(ring.name, 100))
+        process.start()
+        sent = 0
+        while sent < 100:
+            if ring.push(sent, 0, sent):
+                sent += 1
+        process.join(10)
+        assert process.exitcode == 0
+        assert len(ring) == 0
+    finally:
+        ring.close()
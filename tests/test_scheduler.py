@@ -0,0 +1,129 @@
+import asyncio
+import time
+
+from codesimulator.scheduler import FOCUS, KEYBOARD, POINTER, ActionScheduler, ActionSource, IntervalSource, TypingSource
+from codesimulator.telemetry import Stall, TelemetryBus
+
+
+class _Recorder(ActionSource):
+    def __init__(self, name, devices, log, fires, duration=0.01, delay=0.0, **kwargs):
+        super().__init__(name, devices, **kwargs)
+        self.log, self.fires, self.duration, self.delay = log, fires, duration, delay
+
+    async def fire(self):
+        self.log.append((self.name, "start"))
+        await asyncio.sleep(self.duration)
+        self.log.append((self.name, "end"))
+        self.fires -= 1
+        return self.delay if self.fires else None
+
+
+def test_sources_sharing_a_device_never_overlap():
+    """Sources on the same device take turns; other devices run concurrently."""
+    log = []
+    scheduler = ActionScheduler()
+    scheduler.add(_Recorder("typing", [KEYBOARD], log, fires=3, priority=0))
+    scheduler.add(_Recorder("focus", [KEYBOARD], log, fires=2))
+    scheduler.add(_Recorder("mouse", [POINTER], log, fires=1, duration=0.05))
+
+    asyncio.run(scheduler.run())
+
+    keyboard = [event for event in log if event[0] != "mouse"]
+    assert all(keyboard[i][1] == "start" and keyboard[i + 1] == (keyboard[i][0], "end")
+               for i in range(0, len(keyboard), 2))
+    assert log[0] == ("typing", "start")
+    assert log.index(("mouse", "end")) > log.index(("typing", "end"))
+    assert log.count(("typing", "end")) == 3 and log.count(("focus", "end")) == 2
+
+
+def test_file_devices_keep_window_switches_between_files():
+    """A source claiming a file device waits for the typed file to end, even between its lines."""
+    log = []
+
+    async def steps(name, lines):
+        for line in range(lines):
+            log.append((name, line))
+            yield 0.01
+
+    files = iter([("a", 4), ("b", 4), ("c", 4)])
+
+    async def next_steps():
+        return steps(*next(files))
+
+    async def switch():
+        log.append("switch")
+
+    scheduler = ActionScheduler()
+    scheduler.add(TypingSource(next_steps, file_devices=[FOCUS]))
+    scheduler.add(IntervalSource("focus", [KEYBOARD, FOCUS], switch, (0.005, 0.005)), delay=0.005)
+    asyncio.run(scheduler.run(lambda: log.count(("c", 3)) == 0))
+
+    assert "switch" in log
+    for i, event in enumerate(log):
+        if event == "switch" and 0 < i < len(log) - 1:
+            assert log[i - 1] == "switch" or log[i - 1][1] == 3
+            assert log[i + 1] == "switch" or log[i + 1][1] == 0
+
+
+def test_min_interval_limits_the_fire_rate():
+    """A source firing with no delay is still held to its minimum interval."""
+    times = []
+    loop_time = []
+
+    async def action():
+        times.append(loop_time[0]())
+
+    async def main():
+        loop_time.append(asyncio.get_running_loop().time)
+        scheduler = ActionScheduler()
+        scheduler.add(IntervalSource("scroll", [POINTER], action, (0, 0), min_interval=0.05), delay=0)
+        await scheduler.run(lambda: len(times) < 3)
+
+    asyncio.run(main())
+    assert times[2] - times[0] >= 0.09
+
+
+def test_typing_source_moves_through_files_and_closes_steps():
+    """The typing source asks for the next file when one is done and closes the open one on stop."""
+    typed, closed = [], []
+
+    async def steps(name, lines):
+        try:
+            for line in range(lines):
+                typed.append((name, line))
+                yield 0
+        finally:
+            closed.append(name)
+
+    files = iter([("a", 2), ("b", 5)])
+
+    async def next_steps():
+        return steps(*next(files))
+
+    scheduler = ActionScheduler()
+    scheduler.add(TypingSource(next_steps))
+    asyncio.run(scheduler.run(lambda: len(typed) < 4))
+
+    assert typed == [("a", 0), ("a", 1), ("b", 0), ("b", 1)]
+    assert closed == ["a", "b"]
+
+
+def test_late_start_is_published_as_a_stall():
+    """A source held up by a blocked event loop reports a stall; one waiting for a device does not."""
+    bus = TelemetryBus()
+    scheduler = ActionScheduler(telemetry=bus)
+    log = []
+    scheduler.add(_Recorder("typing", [KEYBOARD], log, fires=1, duration=0.7))
+    scheduler.add(_Recorder("focus", [KEYBOARD], log, fires=1), delay=0.01)
+
+    async def main():
+        scheduler.add(_Recorder("mouse", [POINTER], log, fires=1), delay=0.0)
+        # Block the loop before the scheduler gets to run
+        time.sleep(0.6)
+        await scheduler.run()
+
+    asyncio.run(main())
+
+    stalls = [event for _, event in bus._queue if isinstance(event, Stall)]
+    assert {stall.source for stall in stalls} == {"mouse", "typing"}
+    assert all(stall.seconds > 0.5 for stall in stalls)
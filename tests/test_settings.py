@@ -0,0 +1,81 @@
+import json
+import os
+from decimal import Decimal
+
+import pytest
+
+from codesimulator.settings import ConfigError, ConfigStore, SimulatorConfig
+
+
+def _write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def test_values_are_validated_and_coerced():
+    # Number inputs of the settings view hand over Decimals
+    config = SimulatorConfig.from_dict({"code": {"indent_size": Decimal("2"), "max_line_length": 100.0},
+                                        "typing_speed": {"line_break": [1, 2]}})
+    assert config.code.indent_size == 2 and type(config.code.indent_size) is int
+    assert config.code.max_line_length == 100
+    assert config.typing_speed.line_break == (1.0, 2.0)
+    assert config.corpus.selection == "sequential"
+
+    for bad in ({"typing_speed": {"min": 0.5, "max": 0.1}},
+                {"typing_speed": {"mistake_rate": 2}},
+                {"corpus": {"selection": "random"}},
+                {"code": {"indent_size": "wide"}},
+                {"code": {"indent_size": "2"}},
+                {"code": {"indent_size": 2.7}},
+                {"metrics": {"port": True}},
+                {"code": {"auto_indent": "false"}},
+                {"metrics": {"enabled": "no"}},
+                {"watchdog": {"enabled": 1}},
+                {"session": []}):
+        with pytest.raises(ConfigError):
+            SimulatorConfig.from_dict(bad)
+
+
+def test_unknown_sections_survive_a_round_trip():
+    data = {"code": {"language": "java"}, "plugins": {"enabled": True}}
+    config = SimulatorConfig.from_dict(data)
+
+    assert config.to_dict()["plugins"] == {"enabled": True}
+    assert SimulatorConfig.from_dict(config.to_dict()) == config
+
+
+def test_store_swaps_in_changes_and_keeps_settings_on_invalid_file(tmp_path):
+    path = str(tmp_path / "config.json")
+    _write(path, {"typing_speed": {"min": 0.1, "max": 0.2}})
+    store = ConfigStore(path)
+    seen = []
+    store.subscribe(seen.append)
+    first = store.config
+
+    assert not store.reload_if_changed()
+
+    _write(path, {"typing_speed": {"min": 0.3, "max": 0.4, "mistake_rate": 0.01}})
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert store.reload_if_changed()
+    assert store.config is not first
+    assert store.config.typing_speed.min == 0.3
+    assert seen == [store.config]
+
+    _write(path, {"typing_speed": {"min": 0.9, "max": 0.1}})
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2_000_000))
+    assert not store.reload_if_changed()
+    assert store.config.typing_speed.min == 0.3
+
+
+def test_save_replaces_the_file_atomically(tmp_path):
+    path = str(tmp_path / "config.json")
+    _write(path, {})
+    store = ConfigStore(path)
+
+    store.save(SimulatorConfig.from_dict({"session": {"budget_minutes": 30}}))
+
+    assert os.listdir(tmp_path) == ["config.json"]
+    with open(path) as f:
+        assert json.load(f)["session"] == {"budget_minutes": 30}
+    assert store.config.session.budget_minutes == 30
+    assert not store.reload_if_changed()
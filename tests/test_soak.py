@@ -0,0 +1,63 @@
+from codesimulator.soak import run_soak
+from codesimulator.telemetry import Message, Sink, TelemetryBus
+from codesimulator.watchdog import MemoryGuard, MemoryWatchdog
+
+MiB = 2 ** 20
+
+
+def test_guard_ignores_warmup_and_spikes_but_trips_on_sustained_growth():
+    guard = MemoryGuard(10 * MiB, warmup_samples=2, window_samples=2)
+    # Warmup may grow freely
+    assert guard.add(0) is None and guard.add(100 * MiB) is None
+    assert guard.add(100 * MiB) is None
+    assert guard.baseline == 100 * MiB
+    # A spike that is freed again is not growth
+    assert guard.add(150 * MiB) is None
+    assert guard.add(101 * MiB) is None
+    assert guard.growth == 1 * MiB
+    assert guard.add(120 * MiB) is None
+    assert "grew 20.0MiB" in guard.add(120 * MiB)
+    assert guard.count == 7 and list(guard.samples) == [120 * MiB, 120 * MiB]
+
+
+class _Messages(Sink):
+    kinds = (Message.kind,)
+
+    def __init__(self):
+        self.texts = []
+
+    def handle(self, events):
+        self.texts.extend(event.text for _, event in events)
+
+
+def test_watchdog_reports_once_through_telemetry():
+    values = iter([100, 100, 100, 100, 200, 200, 300, 400])
+    bus = TelemetryBus()
+    sink = _Messages()
+    bus.subscribe(sink)
+    watchdog = MemoryWatchdog(50, telemetry=bus, sample=lambda: next(values))
+
+    results = [watchdog.check() for _ in range(8)]
+    bus.dispatch()
+
+    assert [result is not None for result in results] == [False] * 6 + [True, False]
+    assert len(sink.texts) == 1 and "Memory watchdog" in sink.texts[0]
+
+
+def test_simulated_half_hour_runs_in_virtual_time_without_growth(tmp_path):
+    corpus = tmp_path / "code"
+    corpus.mkdir()
+    for number in range(3):
+        (corpus / f"module{number}.py").write_text(
+            "".join(f"def function_{line}(value):\n    return value + {line}\n\n" for line in range(40)))
+    work_dir = tmp_path / "work"
+
+    report = run_soak(duration=1800, sample_interval=120, work_dir=str(work_dir), corpus_dir=str(corpus))
+
+    assert report.passed, report.format()
+    assert report.simulated_seconds >= 1800
+    assert len(report.samples) >= 10
+    assert report.input_events > 0
+    assert report.switches > 0
+    # Caches and the journal stay in the work directory
+    assert (work_dir / "cache" / "progress.jsonl").exists()
@@ -0,0 +1,130 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from codesimulator.telemetry import (ConsoleSink, KeysInjected, Message, Mistake, Sink, Stall, Status, TelemetryBus,
+                                     TraceSink)
+from codesimulator.tracing import Tracer
+
+
+class _Collector(Sink):
+    def __init__(self, kinds=None):
+        self.kinds = kinds
+        self.batches = []
+
+    def handle(self, events):
+        self.batches.append([event for _, event in events])
+
+
+class _Failing(Sink):
+    def handle(self, events):
+        raise RuntimeError("sink is broken")
+
+
+def test_publish_is_bounded_and_counts_drops():
+    bus = TelemetryBus(capacity=3)
+    sink = _Collector()
+    bus.subscribe(sink)
+    for line in range(5):
+        bus.publish(KeysInjected(line, 1, 1, 0.0))
+
+    assert bus.dropped == 2
+    assert bus.dispatch() == 3
+    assert [event.line for event in sink.batches[0]] == [2, 3, 4]
+    assert bus.dispatch() == 0
+
+
+def test_console_text_survives_an_overflow_of_structured_events():
+    bus = TelemetryBus(capacity=3, clock=iter(range(100)).__next__)
+    sink = _Collector()
+    bus.subscribe(sink)
+    bus.message("stale\n")
+    bus.message("Starting\n", replace=True)
+    bus.status("Typing")
+    for line in range(5):
+        bus.publish(KeysInjected(line, 1, 1, 0.0))
+    bus.status("Paused")
+    bus.message("done\n")
+
+    assert bus.dropped == 2
+    bus.dispatch()
+    assert sink.batches[0][0] == Message("Starting\n", replace=True)
+    assert [event.line for event in sink.batches[0] if event.kind == KeysInjected.kind] == [2, 3, 4]
+    assert sink.batches[0][-2:] == [Status("Paused"), Message("done\n")]
+
+
+def test_sinks_get_their_kinds_and_a_failing_sink_does_not_stop_the_others():
+    bus = TelemetryBus()
+    stalls = _Collector(frozenset({Stall.kind}))
+    everything = _Collector()
+    bus.subscribe(_Failing())
+    bus.subscribe(stalls)
+    bus.subscribe(everything)
+    bus.publish(Mistake(1, 2))
+    bus.publish(Stall("typing", 0.8))
+    bus.message("hello\n")
+    bus.dispatch()
+
+    assert stalls.batches == [[Stall("typing", 0.8)]]
+    assert len(everything.batches[0]) == 3
+
+
+def test_console_sink_writes_once_per_batch_and_trims_old_lines():
+    writes = []
+
+    class TextBox:
+        value = ""
+
+        def __setattr__(self, name, value):
+            writes.append(value)
+            object.__setattr__(self, name, value)
+
+    text_box, status = TextBox(), SimpleNamespace(text="")
+    bus = TelemetryBus()
+    bus.subscribe(ConsoleSink(text_box, status, max_chars=12))
+    bus.message("old line\n")
+    bus.message("start\n", replace=True)
+    bus.message("abc\n")
+    bus.status("Running")
+    bus.message("defgh\n")
+    bus.dispatch()
+
+    assert writes == ["abc\ndefgh\n"]
+    assert status.text == "Running"
+
+
+def test_run_dispatches_until_cancelled():
+    bus = TelemetryBus()
+    sink = _Collector()
+    bus.subscribe(sink)
+
+    async def main():
+        task = asyncio.create_task(bus.run(interval=0.01))
+        bus.publish(KeysInjected(0, 10, 8, 0.5))
+        await asyncio.sleep(0.05)
+        bus.publish(Mistake(0, 1))
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    # The second event arrives with the final dispatch on cancellation
+    assert sink.batches == [[KeysInjected(0, 10, 8, 0.5)], [Mistake(0, 1)]]
+
+
+def test_trace_sink_adds_events_only_while_recording(tmp_path):
+    clock = iter(range(100)).__next__
+    tracer = Tracer(clock=lambda: float(clock()))
+    bus = TelemetryBus(clock=tracer.clock)
+    bus.subscribe(TraceSink(tracer))
+    bus.publish(Stall("focus", 0.75))
+    bus.dispatch()
+
+    path = tmp_path / "trace.json"
+    tracer.start(str(path))
+    bus.publish(Stall("typing", 0.5))
+    bus.dispatch()
+    tracer.stop()
+
+    events = [event for event in json.loads(path.read_text()) if event["ph"] != "M"]
+    assert [event["ph"] for event in events] == ["C", "i"]
+    assert events[1]["name"] == "stall" and events[1]["args"] == {"source": "typing", "seconds": 0.5}
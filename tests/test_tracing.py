@@ -0,0 +1,63 @@
+import asyncio
+import json
+import threading
+
+from codesimulator.tracing import TRACKS, TYPING_TRACK, Tracer
+
+
+def _load(path):
+    # The closed file must be plain JSON, as chrome://tracing and Perfetto expect
+    return json.loads(path.read_text())
+
+
+def test_spans_nest_on_their_track_and_the_file_is_valid_json(tmp_path):
+    path = tmp_path / "trace.json"
+    tracer = Tracer(flush_interval=0.01)
+    tracer.start(str(path))
+    tracer.begin("cycle", TYPING_TRACK)
+    with tracer.span("line", TYPING_TRACK, line=1):
+        pass
+    tracer.end(TYPING_TRACK)
+    tracer.counter("injection_ring", events=12)
+    tracer.stop()
+
+    events = [event for event in _load(path) if event["ph"] != "M"]
+    assert [(event["ph"], event.get("name")) for event in events] == [
+        ("B", "cycle"), ("X", "line"), ("E", None), ("C", "injection_ring")]
+    assert {event["tid"] for event in events[:3]} == {TRACKS[TYPING_TRACK]}
+    assert events[1]["args"] == {"line": 1}
+    assert events[0]["ts"] <= events[1]["ts"] <= events[2]["ts"]
+
+
+def test_blocking_calls_appear_on_their_worker_thread(tmp_path):
+    path = tmp_path / "trace.json"
+    tracer = Tracer()
+    tracer.start(str(path))
+    assert asyncio.run(tracer.to_thread("work", lambda value: threading.current_thread().ident + value, 0)) > 0
+    tracer.stop()
+
+    events = _load(path)
+    span = next(event for event in events if event["ph"] == "X")
+    assert span["name"] == "work"
+    names = {event["tid"]: event["args"]["name"] for event in events if event["name"] == "thread_name"}
+    assert span["tid"] in names and span["tid"] not in TRACKS.values()
+
+
+def test_nothing_is_recorded_or_written_when_not_recording(tmp_path):
+    tracer = Tracer()
+    with tracer.span("line", TYPING_TRACK):
+        pass
+    tracer.counter("injection_ring", events=1)
+    tracer.stop()
+    assert not tracer._queue
+
+    # Events from spans that end after a stop do not leak into the next trace
+    path = tmp_path / "trace.json"
+    tracer.start(str(path))
+    span = tracer.span("late", TYPING_TRACK)
+    span.__enter__()
+    tracer.stop()
+    span.__exit__(None, None, None)
+    tracer.start(str(path))
+    tracer.stop()
+    assert not [event for event in _load(path) if event["ph"] != "M"]